@@ -0,0 +1 @@
+# Performance benchmarks for solvers, boards and models
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import platform
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+# Records benchmarks/baseline.json from several runs of the throughput suite. Every run
+# scores a benchmark the way the check does, by the throughput of its fastest round; the
+# baseline keeps the median of those scores, so one unusually fast or slow run moves it
+# little and the check's tolerance is the only slack against it.
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+RUNS = 5
+
+def machine_info():
+    processor = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            processor = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), processor)
+    except OSError:
+        pass
+    return {
+        'python': platform.python_version(),
+        'system': platform.system(),
+        'architecture': platform.machine(),
+        'processor': processor,
+        'cpus': os.cpu_count(),
+    }
+
+def record_baseline(path=BASELINE_PATH, runs=RUNS):
+    scores = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(runs):
+            run_path = os.path.join(tmp, f"run{run}.json")
+            subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", os.path.dirname(__file__),
+                            "--benchmark-save", "--benchmark-baseline", run_path], check=True)
+            with open(run_path) as f:
+                for name, result in json.load(f)['benchmarks'].items():
+                    scores.setdefault(name, []).append(result)
+
+    benchmarks = {}
+    for name, results in sorted(scores.items()):
+        throughputs = [result['ops_per_sec'] for result in results]
+        benchmarks[name] = {
+            'ops_per_sec': float(np.median(throughputs)),
+            'runs_ops_per_sec': throughputs,
+            'rounds': results[0]['rounds'],
+            'ops': results[0]['ops'],
+        }
+    with open(path, "w") as f:
+        json.dump({
+            'machine': machine_info(),
+            'method': f"median over {runs} runs of each run's fastest-round throughput (ops / fastest round)",
+            'benchmarks': benchmarks,
+        }, f, indent=2)
+    return benchmarks
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Record the throughput baseline from several runs of the suite')
+    parser.add_argument("--out", default=BASELINE_PATH, help="Baseline file to write")
+    parser.add_argument("--runs", type=int, default=RUNS, help="Runs of the suite to take the median over")
+    args = parser.parse_args()
+
+    benchmarks = record_baseline(args.out, args.runs)
+    print(f"Wrote {len(benchmarks)} benchmarks to {args.out}")
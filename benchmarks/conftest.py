@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import numpy as np
+import pytest
+from benchmarks.baseline import BASELINE_PATH, machine_info
+
+# Throughput regression checks: `python -m pytest benchmarks` times every benchmark
+# and fails one whose throughput drops more than the tolerance below its baseline.
+# `--benchmark-save` records the current run as the new baseline;
+# `python -m benchmarks.baseline` records the median of several runs instead.
+DEFAULT_TOLERANCE = 0.3
+
+# Results of this session, keyed by test name
+RESULTS = {}
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark")
+    group.addoption("--benchmark-save", action="store_true",
+                    help="Write this run's results as the new baseline instead of comparing")
+    group.addoption("--benchmark-baseline", default=BASELINE_PATH,
+                    help="Baseline results to compare against")
+    group.addoption("--benchmark-tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="Allowed fractional drop in throughput before a benchmark fails")
+
+class Benchmark:
+    def __init__(self, name, baseline, tolerance, results):
+        self.name = name
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.results = results
+
+    def __call__(self, fn, rounds=20, ops=1, setup=None, warmup=1):
+        # Times `rounds` calls of fn, each doing `ops` units of work; setup() runs
+        # untimed before every call. Throughput is taken from the fastest round: noise
+        # from GC or the scheduler only ever adds time, so the minimum is the most stable.
+        for _ in range(warmup):
+            if setup is not None:
+                setup()
+            fn()
+        timings = np.empty(rounds)
+        for i in range(rounds):
+            if setup is not None:
+                setup()
+            start_time = time.perf_counter()
+            fn()
+            timings[i] = time.perf_counter() - start_time
+
+        result = {
+            'ops_per_sec': ops / float(timings.min()),
+            'median_s': float(np.median(timings)),
+            'min_s': float(timings.min()),
+            'rounds': rounds,
+            'ops': ops,
+        }
+        self.results[self.name] = result
+
+        reference = self.baseline.get(self.name)
+        if reference is not None:
+            floor = reference['ops_per_sec'] * (1 - self.tolerance)
+            assert result['ops_per_sec'] >= floor, (
+                f"{self.name}: {result['ops_per_sec']:.1f} ops/s is below the baseline "
+                f"{reference['ops_per_sec']:.1f} ops/s by more than {self.tolerance:.0%}")
+        return result
+
+@pytest.fixture(scope="session")
+def benchmark_baseline(request):
+    path = request.config.getoption("--benchmark-baseline")
+    if request.config.getoption("--benchmark-save") or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['benchmarks']
+
+@pytest.fixture
+def benchmark(request, benchmark_baseline):
+    return Benchmark(request.node.name, benchmark_baseline, request.config.getoption("--benchmark-tolerance"), RESULTS)
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if not config.getoption("--benchmark-save") or not RESULTS:
+        return
+    with open(config.getoption("--benchmark-baseline"), "w") as f:
+        json.dump({
+            'machine': machine_info(),
+            'method': "one run's fastest-round throughput (ops / fastest round)",
+            'benchmarks': dict(sorted(RESULTS.items())),
+        }, f, indent=2)
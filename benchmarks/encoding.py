@@ -0,0 +1,59 @@
+import time
+import argparse
+import numpy as np
+from utils.encoding import NUM_CHANNELS, encode_board, encode_boards
+from benchmarks.inference import make_midgame_board
+from eval import STANDARD_CONFIGS
+
+def loop_encoding(board):
+    # The per-value comparison loop the shared encoder replaced
+    inputs = np.zeros((board.height, board.width, NUM_CHANNELS), dtype=np.float32)
+    inputs[:, :, 0] = board.visible
+    inputs[:, :, 1] = board.flags
+    for i in range(9):
+        inputs[:, :, i + 2] = board.board == i
+    return inputs
+
+def time_call(fn, repeats):
+    fn()
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start_time = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start_time
+    return timings
+
+def run_benchmark(repeats=500, batch_size=256):
+    results = {}
+    for config in STANDARD_CONFIGS:
+        boards = [make_midgame_board(config['width'], config['height'], config['mines']) for _ in range(batch_size)]
+        board = boards[0]
+        single_buffer = np.zeros((config['height'], config['width'], NUM_CHANNELS), dtype=np.float32)
+        batch_buffer = np.zeros((batch_size, config['height'], config['width'], NUM_CHANNELS), dtype=np.float32)
+
+        cases = {
+            'loop': lambda: loop_encoding(board),
+            'single': lambda: encode_board(board),
+            'single_buffer': lambda: encode_board(board, out=single_buffer),
+            # Batched cases are reported per board
+            'loop_batch': lambda: np.stack([loop_encoding(b) for b in boards]),
+            'batch_buffer': lambda: encode_boards(boards, out=batch_buffer),
+        }
+        for name, fn in cases.items():
+            per_board = batch_size if 'batch' in name else 1
+            timings = time_call(fn, max(repeats // per_board, 5)) / per_board
+            results[(config['name'], name)] = timings
+            print(f"{config['name']:>12} {name:>13}: "
+                  f"mean {timings.mean() * 1e6:8.2f}us/board  "
+                  f"p50 {np.percentile(timings, 50) * 1e6:8.2f}us/board")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Board encoding cost for the loop, single and batched encoders')
+    parser.add_argument("--repeats", type=int, default=500,
+                       help="Number of timed single-board encodings per case")
+    parser.add_argument("--batch-size", type=int, default=256,
+                       help="Boards per batched encoding")
+    args = parser.parse_args()
+
+    run_benchmark(args.repeats, args.batch_size)
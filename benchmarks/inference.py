@@ -0,0 +1,54 @@
+import time
+import argparse
+import numpy as np
+from game.board import MinesweeperBoard
+from solvers.cnn import CNNSolver, INFERENCE_MODES, INTERACTIVE_INFERENCE
+from models.registry import QUANTIZATIONS
+from eval import STANDARD_CONFIGS
+
+def make_midgame_board(width, height, num_mines, reveals=5, seed=None):
+    board = MinesweeperBoard(width, height, num_mines, seed=seed)
+    board.reveal_cell(width // 2, height // 2)
+    for _ in range(reveals):
+        if board.game_won():
+            break
+        board.reveal_cell(*board.get_random_safe_cell())
+    return board
+
+def time_moves(solver, board, repeats):
+    # One untimed call so lazy work (graph tracing, allocations) is excluded
+    solver.get_move(board)
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start_time = time.perf_counter()
+        solver.get_move(board)
+        timings[i] = time.perf_counter() - start_time
+    return timings
+
+def run_benchmark(repeats=200, modes=INFERENCE_MODES, quantization=INTERACTIVE_INFERENCE['quantization']):
+    # quantization selects the TFLite export; it defaults to the one interactive play uses
+    results = {}
+    for config in STANDARD_CONFIGS:
+        board = make_midgame_board(config['width'], config['height'], config['mines'])
+        for mode in modes:
+            solver = CNNSolver(difficulty=config['name'], inference=mode, quantization=quantization)
+            timings = time_moves(solver, board, repeats)
+            results[(config['name'], mode)] = timings
+            label = f"{mode} {quantization}" if mode == 'tflite' else mode
+            print(f"{config['name']:>12} {label:>12}: "
+                  f"mean {timings.mean() * 1e6:8.1f}us  "
+                  f"p50 {np.percentile(timings, 50) * 1e6:8.1f}us  "
+                  f"p99 {np.percentile(timings, 99) * 1e6:8.1f}us")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Per-move CNN latency for each inference mode')
+    parser.add_argument("--repeats", type=int, default=200,
+                       help="Number of timed moves per difficulty and mode")
+    parser.add_argument("--modes", nargs="+", choices=INFERENCE_MODES, default=list(INFERENCE_MODES),
+                       help="Inference modes to compare")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default=INTERACTIVE_INFERENCE['quantization'],
+                       help="TFLite export to time in tflite mode")
+    args = parser.parse_args()
+
+    run_benchmark(args.repeats, args.modes, args.quantization)
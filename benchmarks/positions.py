@@ -0,0 +1,41 @@
+import os
+import argparse
+import numpy as np
+from game.board import MinesweeperBoard
+from benchmarks.inference import make_midgame_board
+from eval import STANDARD_CONFIGS
+
+# The positions the throughput suite measures, stored as fixtures so that changes to
+# board generation or RNG use cannot silently change the work a baseline refers to.
+# `python -m benchmarks.positions` rebuilds them; re-record the baseline afterwards.
+POSITIONS_PATH = os.path.join(os.path.dirname(__file__), "positions.npz")
+SEED = 0
+REVEALS = 5
+
+def freeze_positions(path=POSITIONS_PATH, seed=SEED, reveals=REVEALS):
+    arrays = {}
+    for config in STANDARD_CONFIGS:
+        board = make_midgame_board(config['width'], config['height'], config['mines'], reveals, seed=seed)
+        arrays[f"{config['name']}_board"] = board.board.astype(np.int8)
+        arrays[f"{config['name']}_visible"] = board.visible
+        arrays[f"{config['name']}_flags"] = board.flags
+    np.savez_compressed(path, **arrays)
+
+def load_position(config, board_class=MinesweeperBoard, path=POSITIONS_PATH):
+    # A fresh board of the given backend holding the frozen position for this difficulty
+    with np.load(path) as data:
+        board = board_class(config['width'], config['height'], config['mines'])
+        board.board = data[f"{config['name']}_board"].astype(int)
+        board.visible = data[f"{config['name']}_visible"]
+        board.flags = data[f"{config['name']}_flags"]
+    board.first_move = False
+    return board
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Rebuild the frozen positions used by the throughput suite')
+    parser.add_argument("--out", default=POSITIONS_PATH, help="Output .npz file")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    freeze_positions(args.out, args.seed)
+    print(f"Wrote {len(STANDARD_CONFIGS)} positions to {args.out}")
@@ -0,0 +1,70 @@
+import os
+import argparse
+import numpy as np
+from solvers.cnn import CNNSolver
+from models.registry import resolve_model_path
+from utils.batch_generation import generate_training_batch
+from eval import STANDARD_CONFIGS, run_batched_simulation, aggregate_metrics
+from benchmarks.inference import make_midgame_board, time_moves
+
+# (label, inference mode, quantization); the first entry is the reference every other one is scored against
+VARIANTS = [
+    ('keras', 'compiled', None),
+    ('tflite-float32', 'tflite', 'float32'),
+    ('tflite-float16', 'tflite', 'float16'),
+    ('tflite-int8', 'tflite', 'int8'),
+]
+
+def chosen_cells(predictions, inputs):
+    # The cell each prediction would reveal: lowest score among hidden, unflagged cells
+    masked = np.where((inputs[..., 0] > 0) | (inputs[..., 1] > 0), np.inf, predictions[..., 0])
+    return masked.reshape(len(masked), -1).argmin(axis=1)
+
+def run_report(positions=1024, repeats=200, games=200, seed=0):
+    results = {}
+    for config in STANDARD_CONFIGS:
+        inputs, _ = generate_training_batch(positions, config['width'], config['height'], config['mines'], rng=seed)
+        board = make_midgame_board(config['width'], config['height'], config['mines'])
+        game_seeds = np.random.SeedSequence(seed).spawn(games)
+
+        reference = None
+        for label, inference, quantization in VARIANTS:
+            solver = CNNSolver(config['name'], inference=inference, quantization=quantization or 'float16')
+            predictions = solver._predict_batch(inputs)
+            if reference is None:
+                reference = predictions
+            timings = time_moves(solver, board, repeats)
+            metrics = aggregate_metrics(run_batched_simulation(
+                "cnn", config['width'], config['height'], config['mines'], games, config['name'],
+                seeds=game_seeds, inference=inference, quantization=quantization or 'float16'))
+
+            loaded = solver.loaded_model
+            size = loaded.size_bytes if inference == 'tflite' else os.path.getsize(resolve_model_path(config['name']))
+            results[(config['name'], label)] = row = {
+                'size_kib': size / 1024,
+                'move_us': np.percentile(timings, 50) * 1e6,
+                'move_p99_us': np.percentile(timings, 99) * 1e6,
+                'max_abs_error': float(np.abs(predictions - reference).max()),
+                'move_agreement': float(np.mean(chosen_cells(predictions, inputs) == chosen_cells(reference, inputs))),
+                'win_rate': metrics['win_rate'],
+            }
+            print(f"{config['name']:>12} {label:>15}: "
+                  f"{row['size_kib']:8.1f} KiB  "
+                  f"p50 {row['move_us']:7.1f}us  p99 {row['move_p99_us']:7.1f}us  "
+                  f"max err {row['max_abs_error']:.4f}  "
+                  f"same move {row['move_agreement']:6.1%}  "
+                  f"win {row['win_rate']:6.1%}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Accuracy and latency of the exported TFLite models against the Keras models')
+    parser.add_argument("--positions", type=int, default=1024,
+                       help="Generated positions used to compare predictions")
+    parser.add_argument("--repeats", type=int, default=200,
+                       help="Number of timed single moves per variant")
+    parser.add_argument("--games", type=int, default=200,
+                       help="Games played per variant, with the same seeds for every variant")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_report(args.positions, args.repeats, args.games, args.seed)
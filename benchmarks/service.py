@@ -0,0 +1,63 @@
+import time
+import asyncio
+import argparse
+from game.board import MinesweeperBoard
+from solvers.cnn import CNNSolver
+from solvers.service import MoveService
+from eval import STANDARD_CONFIGS
+
+async def play_session(get_move, config, seed, games):
+    moves = 0
+    for game in range(games):
+        board = MinesweeperBoard(config['width'], config['height'], config['mines'], seed=[seed, game])
+        while board.game_active and not board.game_won():
+            x, y, _ = await get_move(board)
+            board.reveal_cell(x, y)
+            moves += 1
+    return moves
+
+async def run_sessions(get_move, config, sessions, games):
+    start_time = time.perf_counter()
+    moves = await asyncio.gather(*(play_session(get_move, config, seed, games) for seed in range(sessions)))
+    return sum(moves) / (time.perf_counter() - start_time)
+
+def run_benchmark(sessions=64, games=2, batch_sizes=(16, 64), waits=(0.0005, 0.002)):
+    results = {}
+    for config in STANDARD_CONFIGS:
+        solver = CNNSolver(config['name'])
+
+        async def direct(board):
+            # Every session calls the solver on its own, one board per forward pass
+            return solver.get_move(board)
+
+        rate = asyncio.run(run_sessions(direct, config, sessions, games))
+        results[(config['name'], 'direct')] = {'moves_per_sec': rate}
+        print(f"{config['name']:>12} {'direct':>18}: {rate:8.1f} moves/s")
+
+        for max_batch_size in batch_sizes:
+            for max_wait in waits:
+                async def served():
+                    async with MoveService(solver, max_batch_size=max_batch_size, max_wait=max_wait) as service:
+                        rate = await run_sessions(service.get_move, config, sessions, games)
+                        return rate, service.stats()
+
+                rate, stats = asyncio.run(served())
+                label = f"batch {max_batch_size} wait {max_wait * 1e3:g}ms"
+                results[(config['name'], label)] = dict(stats, moves_per_sec=rate)
+                print(f"{config['name']:>12} {label:>18}: {rate:8.1f} moves/s  "
+                      f"mean batch {stats['mean_batch_size']:5.1f}  "
+                      f"p50 {stats['p50_latency'] * 1e3:6.2f}ms  p99 {stats['p99_latency'] * 1e3:6.2f}ms")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Move throughput of concurrent sessions with and without the batching MoveService')
+    parser.add_argument("--sessions", type=int, default=64,
+                       help="Concurrent game sessions")
+    parser.add_argument("--games", type=int, default=2,
+                       help="Games played by each session")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--waits", type=float, nargs="+", default=[0.0005, 0.002],
+                       help="Maximum time in seconds a request waits for its batch to fill")
+    args = parser.parse_args()
+
+    run_benchmark(args.sessions, args.games, args.batch_sizes, args.waits)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from game.board import MinesweeperBoard
+from solvers.cnn import CNNSolver
+from solvers.probabilistic import ProbabilisticSolver
+from benchmarks.positions import load_position
+from eval import STANDARD_CONFIGS, BOARD_BACKENDS, run_batched_simulation
+
+# Every workload is built from fixed seeds or the frozen positions in positions.npz, so
+# a baseline measures the same work on every run
+SEED = 0
+CONFIGS = {config['name']: config for config in STANDARD_CONFIGS}
+
+def zero_cell(board):
+    # A hidden cell without adjacent mines, so revealing it opens a cascade
+    ys, xs = np.nonzero(board.board == 0)
+    return int(xs[0]), int(ys[0])
+
+@pytest.mark.parametrize("difficulty", CONFIGS)
+def test_board_generation(benchmark, difficulty):
+    config = CONFIGS[difficulty]
+    boards = 200
+
+    def generate():
+        for seed in range(boards):
+            board = MinesweeperBoard(config['width'], config['height'], config['mines'], seed=seed)
+            board.place_mines(config['width'] // 2, config['height'] // 2)
+
+    benchmark(generate, rounds=10, ops=boards)
+
+@pytest.mark.parametrize("backend", BOARD_BACKENDS)
+@pytest.mark.parametrize("difficulty", CONFIGS)
+def test_reveal_cascade(benchmark, difficulty, backend):
+    config = CONFIGS[difficulty]
+    board = load_position(config, BOARD_BACKENDS[backend])
+    hidden = np.zeros((config['height'], config['width']), dtype=bool)
+    x, y = zero_cell(board)
+
+    def reset():
+        board.visible = hidden.copy()
+        board.game_active = True
+
+    benchmark(lambda: board.reveal_cell(x, y), rounds=200, setup=reset)
+    assert board.visible.sum() > 1
+
+@pytest.mark.parametrize("backend", BOARD_BACKENDS)
+@pytest.mark.parametrize("difficulty", CONFIGS)
+def test_probabilistic_analysis(benchmark, difficulty, backend):
+    # A full analysis of a frozen position from scratch; the solver flags mines on the
+    # board, so the position is restored before every round
+    board = load_position(CONFIGS[difficulty], BOARD_BACKENDS[backend])
+    visible, flags = board.visible.copy(), board.flags.copy()
+
+    def restore():
+        board.visible = visible.copy()
+        board.flags = flags.copy()
+
+    benchmark(lambda: ProbabilisticSolver(board), rounds=50, setup=restore)
+
+@pytest.mark.parametrize("difficulty", CONFIGS)
+def test_cnn_encode_infer(benchmark, difficulty):
+    solver = CNNSolver(difficulty)
+    board = load_position(CONFIGS[difficulty])
+    benchmark(lambda: solver.get_move(board), rounds=100)
+
+@pytest.mark.parametrize("solver_type", ["probabilistic", "hybrid"])
+def test_game_throughput(benchmark, solver_type):
+    config = CONFIGS['intermediate']
+    games = 32
+    seeds = np.random.SeedSequence(SEED).spawn(games)
+    benchmark(lambda: run_batched_simulation(solver_type, config['width'], config['height'], config['mines'], games,
+                                             config['name'], seeds=seeds),
+              rounds=3, ops=games)
@@ -9,4 +9,18 @@ EPOCHS = 100
 BATCH_SIZE = 32
 PATIENCE = 5
 
+# Stream freshly generated boards instead of materialising NUM_TRAIN_EXAMPLES up front
+STREAMING = True
+STEPS_PER_EPOCH = NUM_TRAIN_EXAMPLES // BATCH_SIZE
+DATA_WORKERS = 4
+
+# Train from shards written by `python -m utils.shards` instead (takes precedence over STREAMING)
+DATASET_DIR = None
+
 MODEL_SAVE_PATH = "models/cnn.keras"
+
+# Train one size-agnostic model on several board sizes instead (width, height, mines)
+UNIVERSAL = False
+MIXED_SIZES = [(9, 9, 10), (16, 16, 40), (30, 16, 99)]
+VALIDATION_STEPS = NUM_TEST_EXAMPLES // BATCH_SIZE
+UNIVERSAL_MODEL_SAVE_PATH = "models/cnn_universal.keras"
@@ -1,117 +1,217 @@
 import time
 import argparse
 import numpy as np
-from collections import defaultdict
-from solvers.cnn import CNNSolver
+import profiling
+from solvers.cnn import CNNSolver, INFERENCE_MODES
 from solvers.probabilistic import ProbabilisticSolver
+from solvers.exact import ExactSolver
+from solvers.hybrid import HybridSolver
+from models.registry import MODEL_PATHS, QUANTIZATIONS
 from game.board import MinesweeperBoard
+from game.bitboard import BitboardMinesweeperBoard
+from utils.metrics import SolverMetrics, MetricsAggregator, track_mine_locations
 
-class SolverMetrics:
-    def __init__(self):
-        self.reset()
-        
-    def reset(self):
-        self.wins = 0
-        self.losses = 0
-        self.total_moves = 0
-        self.decision_times = []
-        self.mine_predictions = defaultdict(list)
-        self.actual_mines = set()
-
-def track_mine_locations(board):
-    return set(zip(*np.where(board.board == -1)))
-
-def run_headless_simulation(solver_type, width, height, num_mines, iterations=1, difficulty="beginner"):
-    all_metrics = []
-    for _ in range(iterations):
-        board = MinesweeperBoard(width, height, num_mines)
+# Solvers that are bound to one board and expose next_move()
+BOARD_SOLVERS = {
+    "probabilistic": ProbabilisticSolver,
+    "exact": ExactSolver,
+}
+
+BOARD_BACKENDS = {
+    "numpy": MinesweeperBoard,
+    "bitboard": BitboardMinesweeperBoard,
+}
+
+def derive_solver_seed(seed):
+    # A game's seed drives its board directly; the solver's tie-breaking gets its own
+    # child stream, so neither depends on what other games ran in the same process
+    if seed is None:
+        return None
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (1,))
+
+def board_solver_moves(board, solver, metrics):
+    # All certain reveals of one analysis as (x, y, confidence); the flags it placed
+    # count as mine predictions but not as moves
+    reveals, flags = solver.next_moves()
+    for x, y in flags:
+        metrics.mine_predictions[(x, y)].append(1.0)
+    return [(x, y, 1.0 - board.probabilities[y][x]) for x, y in reveals]
+
+def run_headless_simulation(solver_type, width, height, num_mines, iterations=1, difficulty="beginner", board_backend="numpy", seeds=None,
+                            on_game=None):
+    # Returns a MetricsAggregator; on_game(game_index, metrics) sees each game's own record
+    aggregator = MetricsAggregator()
+    for game_index in range(iterations):
+        seed = seeds[game_index] if seeds is not None else None
+        board = BOARD_BACKENDS[board_backend](width, height, num_mines, seed=seed)
         metrics = SolverMetrics()
         metrics.reset()
-        metrics.actual_mines = track_mine_locations(board)
         
         if solver_type == "cnn":
             solver = CNNSolver(difficulty=difficulty)
+        elif solver_type == "hybrid":
+            solver = HybridSolver(board, difficulty)
         else:
-            solver = ProbabilisticSolver(board)
+            solver = BOARD_SOLVERS[solver_type](board, rng=derive_solver_seed(seed))
         
         while board.game_active and not board.game_won():
-            start_time = time.time()
+            start_time = time.perf_counter()
             if solver_type == "cnn":
-                x, y, confidence = solver.get_move(board)
+                if not board.first_move:
+                    metrics.model_calls += 1
+                moves = [solver.get_move(board)]
+            elif solver_type == "hybrid":
+                moves = solver.next_moves()
             else:
-                x, y = solver.next_move()
-                confidence = 1.0 - board.probabilities[y][x]
-            decision_time = time.time() - start_time
+                moves = board_solver_moves(board, solver, metrics)
+            decision_time = (time.perf_counter() - start_time) / len(moves)
             
-            mine_prediction = 1 - confidence
-            metrics.mine_predictions[(x, y)].append(mine_prediction)
-            metrics.decision_times.append(decision_time)
-            metrics.total_moves += 1
+            for x, y, confidence in moves:
+                mine_prediction = 1 - confidence
+                metrics.mine_predictions[(x, y)].append(mine_prediction)
+                metrics.decision_times.append(decision_time)
+                metrics.total_moves += 1
             
-            mine_hit = board.reveal_cell(x, y)
+            # Every certain reveal from one analysis lands in one board update
+            mine_hit = board.reveal_cells([(x, y) for x, y, _ in moves])
             if mine_hit:
-                metrics.losses += 1
                 break
         
+        if solver_type == "hybrid":
+            metrics.model_calls = solver.model_calls
         if board.game_won():
             metrics.wins += 1
         else:
             metrics.losses += 1
         
-        all_metrics.append(metrics)
+        # Mines are placed on the first reveal, so they are only known once the game has started
+        metrics.actual_mines = track_mine_locations(board)
+        aggregator.add_game(metrics)
+        if on_game is not None:
+            on_game(game_index, metrics)
     
-    return all_metrics
+    return aggregator
 
-def aggregate_metrics(all_metrics):
-    total_wins = sum(m.wins for m in all_metrics)
-    total_games = len(all_metrics)
-    win_rate = total_wins / total_games if total_games > 0 else 0
-    
-    total_correct = 0
-    total_preds = 0
-    for metrics in all_metrics:
-        for (x, y), preds in metrics.mine_predictions.items():
-            is_mine = (y, x) in metrics.actual_mines
-            avg_pred = np.mean(preds) if preds else 0
-            if (avg_pred > 0.5 and is_mine) or (avg_pred <= 0.5 and not is_mine):
-                total_correct += 1
-            total_preds += 1
-    mine_accuracy = total_correct / total_preds if total_preds > 0 else 0
-    
-    decision_times = []
-    for m in all_metrics:
-        decision_times.extend(m.decision_times)
-    avg_decision_time = np.mean(decision_times) if decision_times else 0
-    
-    total_moves = sum(m.total_moves for m in all_metrics)
-    moves_per_game = total_moves / total_games if total_games > 0 else 0
-    
-    return {
-        'win_rate': win_rate,
-        'mine_accuracy': mine_accuracy,
-        'avg_decision_time': avg_decision_time,
-        'moves_per_game': moves_per_game,
-        'total_games': total_games
-    }
-
-def compare_solvers(iterations=10):
-    standard_configs = [
-        {'name': 'beginner', 'width': 9, 'height': 9, 'mines': 10},
-        {'name': 'intermediate', 'width': 16, 'height': 16, 'mines': 40},
-        {'name': 'expert', 'width': 30, 'height': 16, 'mines': 99}
-    ]
-    
-    for config in standard_configs:
+def _play_moves(board, metrics, moves, decision_time):
+    for x, y, confidence in moves:
+        metrics.mine_predictions[(x, y)].append(1 - confidence)
+        metrics.decision_times.append(decision_time)
+        metrics.total_moves += 1
+
+    if board.reveal_cells([(x, y) for x, y, _ in moves]):
+        metrics.losses += 1
+        return True
+    if board.game_won():
+        metrics.wins += 1
+        return True
+    return False
+
+def run_batched_simulation(solver_type, width, height, num_mines, iterations=1, difficulty="beginner", batch_size=256, board_backend="numpy", seeds=None,
+                           inference="compiled", quantization="float16", on_game=None, on_position=None):
+    # Advance up to batch_size games in lockstep. CNN moves for every active board are
+    # scored with one forward pass per step; finished games are swapped for fresh ones.
+    # Hybrid games play their forced moves and share one forward pass for the guesses.
+    # on_position(game_index, board, move_number) sees every position before it is decided.
+    uses_cnn = solver_type in ("cnn", "hybrid")
+    cnn_solver = CNNSolver(difficulty=difficulty, inference=inference, quantization=quantization) if uses_cnn else None
+    aggregator = MetricsAggregator()
+    active = []
+    started = 0
+
+    while started < iterations or active:
+        while started < iterations and len(active) < batch_size:
+            seed = seeds[started] if seeds is not None else None
+            board = BOARD_BACKENDS[board_backend](width, height, num_mines, seed=seed)
+            metrics = SolverMetrics()
+            if solver_type == "cnn":
+                solver = cnn_solver
+            elif solver_type == "hybrid":
+                solver = HybridSolver(board, cnn_solver=cnn_solver)
+            else:
+                solver = BOARD_SOLVERS[solver_type](board, rng=derive_solver_seed(seed))
+            active.append((board, solver, metrics, started))
+            started += 1
+
+        if on_position is not None:
+            for board, _, metrics, game_index in active:
+                on_position(game_index, board, metrics.total_moves)
+
+        if solver_type == "cnn":
+            start_time = time.perf_counter()
+            for board, _, metrics, _ in active:
+                if not board.first_move:
+                    metrics.model_calls += 1
+            moves = cnn_solver.get_moves([board for board, _, _, _ in active])
+            decision_time = (time.perf_counter() - start_time) / len(active)
+            decisions = [([move], decision_time) for move in moves]
+        elif solver_type == "hybrid":
+            start_time = time.perf_counter()
+            moves = HybridSolver.next_moves_batch([solver for _, solver, _, _ in active])
+            decision_time = (time.perf_counter() - start_time) / sum(len(game_moves) for game_moves in moves)
+            decisions = [(game_moves, decision_time) for game_moves in moves]
+        else:
+            decisions = []
+            for board, solver, metrics, _ in active:
+                start_time = time.perf_counter()
+                moves = board_solver_moves(board, solver, metrics)
+                decisions.append((moves, (time.perf_counter() - start_time) / len(moves)))
+
+        still_active = []
+        for game, (moves, decision_time) in zip(active, decisions):
+            board, solver, metrics, game_index = game
+            if solver_type == "hybrid":
+                metrics.model_calls = solver.model_calls
+            if not _play_moves(board, metrics, moves, decision_time):
+                still_active.append(game)
+                continue
+            # Only the totals outlive the game
+            metrics.actual_mines = track_mine_locations(board)
+            aggregator.add_game(metrics)
+            if on_game is not None:
+                on_game(game_index, metrics)
+        active = still_active
+
+    return aggregator
+
+def aggregate_metrics(*aggregators):
+    # Summary of one or more MetricsAggregators, e.g. one per tournament shard, merged in the order given
+    merged = MetricsAggregator()
+    for aggregator in aggregators:
+        merged.merge(aggregator)
+    return merged.summary()
+
+STANDARD_CONFIGS = [
+    {'name': 'beginner', 'width': 9, 'height': 9, 'mines': 10},
+    {'name': 'intermediate', 'width': 16, 'height': 16, 'mines': 40},
+    {'name': 'expert', 'width': 30, 'height': 16, 'mines': 99}
+]
+
+def compare_solvers(iterations=10, batch_size=256, board_backend="numpy", inference="compiled", quantization="float16", cnn_model=None):
+    for config in STANDARD_CONFIGS:
         print(f"\n=== Testing {config['name']} ({config['width']}x{config['height']}, {config['mines']} mines) ===")
         
         print("Running CNN solver...")
         cnn_metrics = aggregate_metrics(
-            run_headless_simulation("cnn", config['width'], config['height'], config['mines'], iterations, config['name'])
+            run_batched_simulation("cnn", config['width'], config['height'], config['mines'], iterations, cnn_model or config['name'], batch_size, board_backend,
+                                   inference=inference, quantization=quantization)
+        )
+        
+        print("Running Hybrid solver...")
+        hybrid_metrics = aggregate_metrics(
+            run_batched_simulation("hybrid", config['width'], config['height'], config['mines'], iterations, cnn_model or config['name'], batch_size, board_backend,
+                                   inference=inference, quantization=quantization)
         )
         
         print("Running Probabilistic solver...")
         prob_metrics = aggregate_metrics(
-            run_headless_simulation("probabilistic", config['width'], config['height'], config['mines'], iterations, config['name'])
+            run_headless_simulation("probabilistic", config['width'], config['height'], config['mines'], iterations, config['name'], board_backend)
+        )
+
+        print("Running Exact solver...")
+        exact_metrics = aggregate_metrics(
+            run_headless_simulation("exact", config['width'], config['height'], config['mines'], iterations, config['name'], board_backend)
         )
         
         print(f"\n{config['name']} Results:")
@@ -120,18 +220,58 @@ def compare_solvers(iterations=10):
         print(f"  Mine Accuracy: {cnn_metrics['mine_accuracy']:.1%}")
         print(f"  Avg Decision Time: {cnn_metrics['avg_decision_time']:.4f}s")
         print(f"  Moves/Game: {cnn_metrics['moves_per_game']:.1f}")
+        print(f"  Model Calls/Game: {cnn_metrics['model_calls_per_game']:.1f}")
+        # The solver shares the process-wide model the simulation already loaded
+        loaded_model = CNNSolver(cnn_model or config['name'], inference=inference, quantization=quantization).loaded_model
+        print(f"  Model Load: {loaded_model.load_time:.3f}s (once per process)")
+        print(f"  Model Warm-up: {loaded_model.warmup_time:.3f}s (once per process)")
+        
+        print("\nHybrid Solver:")
+        print(f"  Win Rate: {hybrid_metrics['win_rate']:.1%}")
+        print(f"  Mine Accuracy: {hybrid_metrics['mine_accuracy']:.1%}")
+        print(f"  Avg Decision Time: {hybrid_metrics['avg_decision_time']:.4f}s")
+        print(f"  Moves/Game: {hybrid_metrics['moves_per_game']:.1f}")
+        print(f"  Model Calls/Game: {hybrid_metrics['model_calls_per_game']:.1f}")
         
         print("\nProbabilistic Solver:")
         print(f"  Win Rate: {prob_metrics['win_rate']:.1%}")
         print(f"  Mine Accuracy: {prob_metrics['mine_accuracy']:.1%}")
         print(f"  Avg Decision Time: {prob_metrics['avg_decision_time']:.4f}s")
         print(f"  Moves/Game: {prob_metrics['moves_per_game']:.1f}")
+
+        print("\nExact Solver:")
+        print(f"  Win Rate: {exact_metrics['win_rate']:.1%}")
+        print(f"  Mine Accuracy: {exact_metrics['mine_accuracy']:.1%}")
+        print(f"  Avg Decision Time: {exact_metrics['avg_decision_time']:.4f}s")
+        print(f"  Moves/Game: {exact_metrics['moves_per_game']:.1f}")
         print("\n" + "="*50)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Batch compare Minesweeper solvers across standard configurations')
     parser.add_argument("--iterations", type=int, default=9,
                        help="Number of games to run per configuration")
+    parser.add_argument("--batch-size", type=int, default=256,
+                       help="Number of CNN games advanced together per forward pass")
+    parser.add_argument("--board-backend", choices=sorted(BOARD_BACKENDS), default="numpy",
+                       help="Board implementation used for simulated games")
+    parser.add_argument("--cnn-inference", choices=INFERENCE_MODES, default="compiled",
+                       help="How the CNN solver runs its model; tflite uses an exported model")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default="float16",
+                       help="Exported TFLite model used with --cnn-inference tflite")
+    parser.add_argument("--cnn-model", choices=sorted(MODEL_PATHS), default=None,
+                       help="Play every configuration with this model instead of the matching difficulty, e.g. universal")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                       help="Time the instrumented hot paths and write p50/p95/p99 per span as JSON")
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                       help="Also write every span as a Chrome trace (chrome://tracing or Perfetto)")
     args = parser.parse_args()
-    
-    compare_solvers(args.iterations)
\ No newline at end of file
+
+    if args.profile or args.trace:
+        profiling.enable(trace=args.trace is not None)
+    compare_solvers(args.iterations, args.batch_size, args.board_backend, args.cnn_inference, args.quantization, args.cnn_model)
+    if args.profile or args.trace:
+        profiling.print_report()
+        if args.profile:
+            profiling.save_json(args.profile)
+        if args.trace:
+            profiling.save_chrome_trace(args.trace)
\ No newline at end of file
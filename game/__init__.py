@@ -1,3 +1,4 @@
 # Package for game logic and GUI components
 from .board import MinesweeperBoard
+from .bitboard import BitboardMinesweeperBoard
 from .gui import MinesweeperGUI
\ No newline at end of file
@@ -0,0 +1,285 @@
+import numpy as np
+import profiling
+from itertools import product
+from game.grid import place_mine_mask
+from game.board import ChangeLog
+
+class BitboardMinesweeperBoard:
+    # Drop-in alternative to MinesweeperBoard that keeps mines, visibility and flags as
+    # Python-int bitmasks. Cell (x, y) is bit y * stride + x; the spare column at
+    # x == width stays clear so horizontal shifts never wrap into the next row.
+    # The board/visible/flags arrays are only built when a caller asks for them, and
+    # every change patches just the cells it touched into arrays already built. They are
+    # writable as on MinesweeperBoard: each array keeps a shadow copy of what the masks
+    # hold, and every board operation first folds arrays that differ from their shadow
+    # back into the masks. Clues always follow the mines, so writing a -1 into board
+    # recomputes the clues around it.
+
+    def __init__(self, width=9, height=9, num_mines=10, seed=None, safe_zone=False):
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        self.rng = np.random.default_rng(seed)
+        self.safe_zone = safe_zone
+        self.stride = width + 1
+        self.game_active = True
+        self.first_move = True
+
+        row = (1 << width) - 1
+        self._full = 0
+        for y in range(height):
+            self._full |= row << (y * self.stride)
+
+        self._mines = 0
+        self._clue_planes = (0, 0, 0, 0)
+        self._zero_cells = 0
+        self._bits = {'visible': 0, 'flags': 0}
+        self._arrays = {}
+        self._shadows = {}
+        self._probabilities = None
+        # Same contract as MinesweeperBoard.change_log
+        self.change_log = ChangeLog(width)
+
+    def _bit(self, x, y):
+        return 1 << (int(y) * self.stride + int(x))
+
+    def _decode(self, bits):
+        num_bytes = (self.height * self.stride + 7) // 8
+        raw = np.frombuffer(bits.to_bytes(num_bytes, 'little'), dtype=np.uint8)
+        cells = np.unpackbits(raw, bitorder='little')[:self.height * self.stride]
+        return cells.reshape(self.height, self.stride)[:, :self.width].astype(bool)
+
+    def _cells(self, bits):
+        # Flat (y * width + x) indices of the set bits, lowest first
+        cells = []
+        while bits:
+            low = bits & -bits
+            y, x = divmod(low.bit_length() - 1, self.stride)
+            cells.append(y * self.width + x)
+            bits ^= low
+        return np.array(cells, dtype=np.intp)
+
+    def _encode(self, array):
+        padded = np.zeros((self.height, self.stride), dtype=bool)
+        padded[:, :self.width] = array
+        return int.from_bytes(np.packbits(padded, bitorder='little').tobytes(), 'little')
+
+    def _flip(self, name, bits):
+        # Flip cells of the visible or flags mask and log them; an array already handed
+        # out is patched in place at those cells only
+        if not bits:
+            return
+        self._bits[name] ^= bits
+        cells = self._cells(bits)
+        if name in self._arrays:
+            array = self._arrays[name]
+            array.ravel()[cells] ^= True
+            np.copyto(self._shadows[name], array)
+        self.change_log.append(cells)
+
+    def _array(self, name):
+        if name not in self._arrays:
+            self._adopt(name, self._decode(self._bits[name]))
+        return self._arrays[name]
+
+    def _adopt(self, name, array):
+        # Hand out this array for name; the shadow records what the masks hold
+        self._arrays[name] = array
+        self._shadows[name] = array.copy()
+
+    def _clues(self):
+        clues = np.zeros((self.height, self.width), dtype=int)
+        for weight, plane in zip((1, 2, 4, 8), self._clue_planes):
+            clues += weight * self._decode(plane)
+        clues[self._decode(self._mines)] = -1
+        return clues
+
+    def _sync(self):
+        # Fold in-place writes to handed-out arrays back into the masks. They cannot be
+        # logged cell by cell, so a change invalidates the log.
+        for name, array in self._arrays.items():
+            shadow = self._shadows[name]
+            if array.tobytes() == shadow.tobytes():
+                continue
+            if name == 'board':
+                self._set_mines(self._encode(array == -1))
+            else:
+                shadow[...] = array
+                self._bits[name] = self._encode(array)
+            self.change_log.invalidate()
+
+    def _shift(self, bits, offset):
+        return (bits << offset if offset >= 0 else bits >> -offset) & self._full
+
+    def _dilate(self, bits):
+        row = bits | (bits << 1) | (bits >> 1)
+        return (row | (row << self.stride) | (row >> self.stride)) & self._full
+
+    @property
+    def visible(self):
+        return self._array('visible')
+
+    @visible.setter
+    def visible(self, array):
+        # Invalidates the log, like MinesweeperBoard.visible; the array itself is kept,
+        # so later writes to it still reach the board
+        array = np.ascontiguousarray(array, dtype=bool)
+        self._adopt('visible', array)
+        self._bits['visible'] = self._encode(array)
+        self.change_log.invalidate()
+
+    @property
+    def flags(self):
+        return self._array('flags')
+
+    @flags.setter
+    def flags(self, array):
+        array = np.ascontiguousarray(array, dtype=bool)
+        self._adopt('flags', array)
+        self._bits['flags'] = self._encode(array)
+        self.change_log.invalidate()
+
+    @property
+    def board(self):
+        if 'board' not in self._arrays:
+            self._adopt('board', self._clues())
+        return self._arrays['board']
+
+    @board.setter
+    def board(self, array):
+        # Only the mines (-1) are taken from the array; the clues are recomputed from
+        # them and written back into it
+        array = np.ascontiguousarray(array)
+        self._adopt('board', array)
+        self._set_mines(self._encode(array == -1))
+        self.change_log.invalidate()
+
+    @property
+    def probabilities(self):
+        if self._probabilities is None:
+            self._probabilities = np.zeros((self.height, self.width))
+        return self._probabilities
+
+    @probabilities.setter
+    def probabilities(self, array):
+        self._probabilities = array
+
+    def _set_mines(self, mines):
+        self._mines = mines
+        # Bit-sliced ripple-carry add of the eight shifted mine masks into four count planes
+        planes = [0, 0, 0, 0]
+        for dx, dy in product([-1, 0, 1], repeat=2):
+            if dx == 0 and dy == 0:
+                continue
+            carry = self._shift(mines, -(dy * self.stride + dx))
+            for i in range(4):
+                planes[i], carry = planes[i] ^ carry, planes[i] & carry
+        self._clue_planes = tuple(planes)
+        self._zero_cells = self._full & ~mines & ~(planes[0] | planes[1] | planes[2] | planes[3])
+        if 'board' in self._arrays:
+            self._arrays['board'][...] = self._clues()
+            self._shadows['board'][...] = self._arrays['board']
+
+    def place_mines(self, safe_x, safe_y):
+        mines = place_mine_mask(self.rng, self.height, self.width, self.num_mines,
+                                safe_x, safe_y, self.safe_zone)
+        self._set_mines(self._encode(mines) | self._mines)
+
+    @profiling.profiled("bitboard.reveal_cell")
+    def reveal_cell(self, x, y):
+        self._sync()
+        bit = self._bit(x, y)
+        if not self.game_active or self._bits['flags'] & bit:
+            return False
+
+        if self.first_move:
+            self.place_mines(x, y)
+            self.first_move = False
+
+        visible = self._bits['visible']
+        if self._mines & bit:
+            self.game_active = False
+            self._flip('visible', bit & ~visible)
+            return True
+
+        if visible & bit:
+            return False
+
+        self._flip('visible', self._open(bit, visible))
+        return False
+
+    def _open(self, bits, visible):
+        # Grow the opening a ring at a time; only newly opened zero cells keep spreading
+        opened = bits
+        spreading = bits & self._zero_cells
+        while spreading:
+            grown = self._dilate(spreading) & ~self._mines & ~visible & ~opened
+            opened |= grown
+            spreading = grown & self._zero_cells
+        return opened
+
+    @profiling.profiled("bitboard.reveal_cells")
+    def reveal_cells(self, cells):
+        # Same contract as MinesweeperBoard.reveal_cells; every zero cell seeds one shared flood fill
+        self._sync()
+        if not self.game_active or len(cells) == 0:
+            return False
+
+        if self.first_move:
+            self.place_mines(*cells[0])
+            self.first_move = False
+
+        bits = 0
+        for x, y in cells:
+            bits |= self._bit(x, y)
+        bits &= ~self._bits['flags']
+        visible = self._bits['visible']
+        self._flip('visible', (self._open(bits & ~self._mines, visible) | (bits & self._mines)) & ~visible)
+
+        if bits & self._mines:
+            self.game_active = False
+            return True
+        return False
+
+    def toggle_flag(self, x, y):
+        self._sync()
+        bit = self._bit(x, y)
+        if self.game_active and not self._bits['visible'] & bit:
+            self._flip('flags', bit)
+
+    def flag_cells(self, cells):
+        # Same contract as MinesweeperBoard.flag_cells
+        self._sync()
+        bits = 0
+        for cell in np.asarray(cells, dtype=np.intp).tolist():
+            y, x = divmod(cell, self.width)
+            bits |= self._bit(x, y)
+        self._flip('flags', bits & ~self._bits['flags'] & ~self._bits['visible'])
+
+    def get_random_safe_cell(self):
+        self._sync()
+        safe = self._full & ~self._bits['visible'] & ~self._bits['flags'] & ~self._mines
+        if not safe:
+            raise ValueError("No safe cells remaining")
+        # Same row-major candidate order and RNG draw as MinesweeperBoard
+        index = self.rng.integers(safe.bit_count())
+        y, x = np.argwhere(self._decode(safe))[index]
+        return (int(x), int(y))
+
+    def game_won(self):
+        self._sync()
+        return self._bits['visible'].bit_count() == (self.width * self.height - self.num_mines)
+
+    def display(self, show_probabilities=False):
+        board, visible, flags = self.board, self.visible, self.flags
+        for y in range(self.height):
+            row = []
+            for x in range(self.width):
+                if flags[y, x]:
+                    row.append('F')
+                elif not visible[y, x]:
+                    row.append('.')
+                else:
+                    row.append(str(board[y, x]) if board[y, x] != -1 else '*')
+            print(' '.join(row))
+        print()
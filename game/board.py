@@ -1,42 +1,157 @@
+import weakref
 import numpy as np
-import random
-from itertools import product
+import profiling
+from scipy import ndimage
+from game.grid import place_mine_mask, clue_counts, neighbour_sum
+
+class ChangeLog:
+    # The cells each reveal or flag toggle changed, oldest first. Boards append entries
+    # in whatever form is cheapest for them: a flat index, an index array, the (window,
+    # opening) of a revealed zero region, or a list of those. entries_since() turns them
+    # into flat index arrays only when a solver reads them. An opened region lists every
+    # cell it opens, including ones that were already revealed; readers compare the
+    # logged cells with the board, so repeats are harmless.
+    #
+    # Positions count every entry ever appended. Readers register, which starts them
+    # at the end of the log, and report how far they have read; entries every reader
+    # has consumed are dropped, and with no reader nothing is kept at all. Assigning a
+    # whole array cannot be replayed, so the board calls invalidate(), which bumps
+    # epoch: a reader that sees a new epoch rebuilds from the board.
+
+    def __init__(self, width):
+        self.width = width
+        self.epoch = 0
+        self._entries = []
+        self._start = 0
+        self._readers = weakref.WeakKeyDictionary()
+
+    def __len__(self):
+        return self._start + len(self._entries)
+
+    def __getstate__(self):
+        # Readers of one board do not read a copy of it
+        state = self.__dict__.copy()
+        del state['_readers']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._readers = weakref.WeakKeyDictionary()
+
+    def append(self, entry):
+        if self._readers:
+            self._entries.append(entry)
+        else:
+            self._start += 1
+
+    def invalidate(self):
+        self.epoch += 1
+        self._start += len(self._entries)
+        self._entries.clear()
+
+    def register(self, reader):
+        # Returns the reader's starting position, the current end of the log
+        return self.consumed(reader, len(self))
+
+    def consumed(self, reader, index):
+        # Record that reader has read every entry before index and drop the entries no
+        # reader still needs
+        self._readers[reader] = index
+        oldest = min(self._readers.values())
+        if oldest > self._start:
+            del self._entries[:oldest - self._start]
+            self._start = oldest
+        return index
+
+    def entries_since(self, index):
+        # The entries from position index on, each as an array of flat cell indices
+        if index < self._start:
+            raise ValueError(f"Change log entries before {self._start} have been discarded")
+        return [self._cells(entry) for entry in self._entries[index - self._start:]]
+
+    def _cells(self, entry):
+        if isinstance(entry, list):
+            return np.unique(np.concatenate([self._cells(part) for part in entry]))
+        if isinstance(entry, tuple):
+            (rows, cols), opening = entry
+            ys, xs = np.nonzero(opening)
+            return (ys + rows.start) * self.width + xs + cols.start
+        return np.atleast_1d(np.asarray(entry, dtype=np.intp))
 
 class MinesweeperBoard:
-    def __init__(self, width=9, height=9, num_mines=10):
+    def __init__(self, width=9, height=9, num_mines=10, seed=None, safe_zone=False):
         self.width = width
         self.height = height
         self.num_mines = num_mines
-        self.board = np.zeros((height, width), dtype=int)
+        self.rng = np.random.default_rng(seed)
+        self.safe_zone = safe_zone
+        self._board = np.zeros((height, width), dtype=int)
+        self._zero_labels = None
+        # Cells each reveal or flag toggle changed, oldest first. Solvers replay the
+        # entries they have not seen instead of diffing whole boards.
+        self.change_log = ChangeLog(width)
         self.visible = np.full((height, width), False)
         self.flags = np.full((height, width), False)
         self.game_active = True
         self.first_move = True
         self.probabilities = np.zeros((self.height, self.width))
 
+    @property
+    def board(self):
+        return self._board
+
+    @board.setter
+    def board(self, array):
+        # A new layout needs its zero regions labelled again. They are labelled on the
+        # first cascade, so a layout edited in place after that has to be assigned again.
+        self._board = array
+        self._zero_labels = None
+        self.change_log.invalidate()
+
+    # Assigning visible or flags is not a change the log can replay, so it invalidates
+    # the log; writes into the arrays are not seen at all and need solver.reset()
+    @property
+    def visible(self):
+        return self._visible
+
+    @visible.setter
+    def visible(self, array):
+        self._visible = array
+        self.change_log.invalidate()
+
+    @property
+    def flags(self):
+        return self._flags
+
+    @flags.setter
+    def flags(self, array):
+        self._flags = array
+        self.change_log.invalidate()
 
     def place_mines(self, safe_x, safe_y):
-        positions = [(x, y) for x, y in product(range(self.width), range(self.height)) 
-                    if not (x == safe_x and y == safe_y)]
-        
-        mine_positions = random.sample(positions, self.num_mines)
-        for x, y in mine_positions:
-            self.board[y, x] = -1
+        mines = place_mine_mask(self.rng, self.height, self.width, self.num_mines,
+                                safe_x, safe_y, self.safe_zone)
+        # Mines already on the board are kept, as the cell-by-cell placement did
+        self.board[...] = clue_counts(mines | (self.board == -1))
+        self._label_zero_regions()
 
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.board[y, x] == -1:
-                    continue
-                self.board[y, x] = self._count_adjacent_mines(x, y)
-
-    def _count_adjacent_mines(self, x, y):
-        count = 0
-        for dx, dy in product([-1, 0, 1], repeat=2):
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.width and 0 <= ny < self.height:
-                count += self.board[ny, nx] == -1
-        return count
+    def _label_zero_regions(self):
+        # Label 8-connected regions of zero cells once per layout. Revealing any cell of a
+        # region opens the region plus its border, which is cached per region on first use.
+        self._zero_labels, _ = ndimage.label(self.board == 0, structure=np.ones((3, 3), dtype=int))
+        self._zero_slices = ndimage.find_objects(self._zero_labels)
+        self._region_openings = {}
 
+    def _region_opening(self, label):
+        if label not in self._region_openings:
+            rows, cols = self._zero_slices[label - 1]
+            window = (slice(max(rows.start - 1, 0), rows.stop + 1),
+                      slice(max(cols.start - 1, 0), cols.stop + 1))
+            region = self._zero_labels[window] == label
+            self._region_openings[label] = (window, neighbour_sum(region) > 0)
+        return self._region_openings[label]
+
+    @profiling.profiled("board.reveal_cell")
     def reveal_cell(self, x, y):
         if not self.game_active or self.flags[y, x]:
             return False
@@ -48,24 +163,68 @@ class MinesweeperBoard:
         if self.board[y, x] == -1:
             self.game_active = False
             self.visible[y, x] = True
+            self.change_log.append(y * self.width + x)
             return True
 
-        stack = [(x, y)]
-        while stack:
-            x, y = stack.pop()
-            if not self.visible[y, x]:
-                self.visible[y, x] = True
-                if self.board[y, x] == 0:
-                    for dx, dy in product([-1, 0, 1], repeat=2):
-                        nx, ny = x + dx, y + dy
-                        if 0 <= nx < self.width and 0 <= ny < self.height:
-                            if not (dx == 0 and dy == 0) and self.board[ny, nx] != -1:
-                                stack.append((nx, ny))
+        if self.visible[y, x]:
+            return False
+
+        if self.board[y, x] != 0:
+            self.visible[y, x] = True
+            self.change_log.append(y * self.width + x)
+            return False
+
+        if self._zero_labels is None:
+            self._label_zero_regions()
+        window, opening = self._region_opening(self._zero_labels[y, x])
+        self.change_log.append((window, opening))
+        self.visible[window] |= opening
+        return False
+
+    @profiling.profiled("board.reveal_cells")
+    def reveal_cells(self, cells):
+        # Reveal several (x, y) cells in one update, opening every zero region they touch.
+        # Returns True if any of them was a mine; the other cells are still revealed.
+        if not self.game_active or len(cells) == 0:
+            return False
+
+        xs, ys = np.array(cells, dtype=int).T
+        if self.first_move:
+            self.place_mines(xs[0], ys[0])
+            self.first_move = False
+
+        unflagged = ~self.flags[ys, xs]
+        xs, ys = xs[unflagged], ys[unflagged]
+        values = self.board[ys, xs]
+        opened = [(ys * self.width + xs)[~self.visible[ys, xs]]]
+        self.visible[ys, xs] = True
+
+        if self._zero_labels is None:
+            self._label_zero_regions()
+        for label in np.unique(self._zero_labels[ys, xs][values == 0]):
+            window, opening = self._region_opening(label)
+            opened.append((window, opening))
+            self.visible[window] |= opening
+        self.change_log.append(opened)
+
+        if (values == -1).any():
+            self.game_active = False
+            return True
         return False
 
     def toggle_flag(self, x, y):
         if self.game_active and not self.visible[y, x]:
             self.flags[y, x] = not self.flags[y, x]
+            self.change_log.append(y * self.width + x)
+
+    def flag_cells(self, cells):
+        # Flag the hidden cells at these flat indices; solvers place the mines they have
+        # proven this way so the change is logged
+        cells = np.unique(np.asarray(cells, dtype=np.intp))
+        cells = cells[~self.flags.flat[cells] & ~self.visible.flat[cells]]
+        if cells.size:
+            self.flags.flat[cells] = True
+            self.change_log.append(cells)
 
     def get_random_safe_cell(self):
         safe_cells = []
@@ -75,7 +234,7 @@ class MinesweeperBoard:
                     safe_cells.append((x, y))
         if not safe_cells:
             raise ValueError("No safe cells remaining")
-        return random.choice(safe_cells)
+        return safe_cells[self.rng.integers(len(safe_cells))]
 
     def game_won(self):
         return np.sum(self.visible) == (self.width * self.height - self.num_mines)
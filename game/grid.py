@@ -0,0 +1,46 @@
+import numpy as np
+
+def neighbour_sum(values, dtype=None):
+    # Sum over each cell's 3x3 neighbourhood (itself included) using padded shifted views.
+    # Terms are added in the same (dy, dx) order as a nested -1..1 loop, so float
+    # results match a cell-by-cell Python sum exactly. Leading axes are treated as a
+    # batch of independent boards.
+    height, width = values.shape[-2:]
+    if dtype is None:
+        dtype = np.int64 if values.dtype == bool else values.dtype
+    padded = np.pad(values, [(0, 0)] * (values.ndim - 2) + [(1, 1), (1, 1)])
+    total = np.zeros(values.shape, dtype=dtype)
+    for dy in range(3):
+        for dx in range(3):
+            total += padded[..., dy:dy + height, dx:dx + width]
+    return total
+
+def neighbour_any(mask):
+    # Boolean 3x3 dilation: True where the cell or any neighbour is set
+    height, width = mask.shape[-2:]
+    padded = np.pad(mask, [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)])
+    result = np.zeros(mask.shape, dtype=bool)
+    for dy in range(3):
+        for dx in range(3):
+            result |= padded[..., dy:dy + height, dx:dx + width]
+    return result
+
+def place_mine_mask(rng, height, width, num_mines, safe_x, safe_y, safe_zone=False):
+    # Sample mine positions without replacement, keeping the first click clear. With
+    # safe_zone the whole 3x3 block around it is kept clear so the click opens a zero,
+    # as long as the remaining cells can still hold every mine.
+    excluded = np.zeros((height, width), dtype=bool)
+    if safe_zone:
+        excluded[max(safe_y - 1, 0):safe_y + 2, max(safe_x - 1, 0):safe_x + 2] = True
+        if height * width - np.sum(excluded) < num_mines:
+            excluded[...] = False
+    excluded[safe_y, safe_x] = True
+
+    candidates = np.flatnonzero(~excluded)
+    mines = np.zeros((height, width), dtype=bool)
+    mines.flat[rng.choice(candidates, num_mines, replace=False)] = True
+    return mines
+
+def clue_counts(mines):
+    # Number of adjacent mines for every cell, with -1 marking the mines themselves
+    return np.where(mines, -1, neighbour_sum(mines))
@@ -2,8 +2,10 @@ import pygame
 import time
 import sys
 import argparse
-from solvers.cnn import CNNSolver
+from solvers.cnn import CNNSolver, INTERACTIVE_INFERENCE
 from solvers.probabilistic import ProbabilisticSolver
+from solvers.exact import ExactSolver
+from solvers.hybrid import HybridSolver
 from game.board import MinesweeperBoard
 from configs import WIDTH, HEIGHT, NUM_MINES
 from game.gui import MinesweeperGUI
@@ -16,9 +18,13 @@ def run_gui_game(solver_type):
     board = MinesweeperBoard(WIDTH, HEIGHT, NUM_MINES)
 
     if solver_type == "cnn":
-        solver = CNNSolver()
+        solver = CNNSolver(**INTERACTIVE_INFERENCE)
     elif solver_type == "probabilistic":
         solver = ProbabilisticSolver(board)
+    elif solver_type == "exact":
+        solver = ExactSolver(board)
+    elif solver_type == "hybrid":
+        solver = HybridSolver(board)
     else:
         print(f"Unknown solver type: {solver_type}")
         return
@@ -35,18 +41,24 @@ def run_gui_game(solver_type):
                 break
 
         if solver_type == "cnn":
-            x, y, confidence = solver.get_move(board)
-            print(f"Step {steps}: Trying ({x}, {y}) with confidence {confidence:.2f}")
+            moves = [solver.get_move(board)]
+        elif solver_type == "hybrid":
+            # Every forced move at once, revealed together in one board update
+            moves = solver.next_moves()
         else:
-            x, y = solver.next_move()
-            confidence = 1.0 - board.probabilities[y, x]
-            print(f"Step {steps}: Trying ({x}, {y}) with confidence {confidence:.2f}")
+            # Every safe reveal from one analysis; certain mines are already flagged
+            reveals, flags = solver.next_moves()
+            moves = [(x, y, 1.0 - board.probabilities[y, x]) for x, y in reveals]
+            for x, y in flags:
+                print(f"Step {steps}: Flagging ({x}, {y})")
 
-        gui.highlight_move(x, y, confidence)
+        for x, y, confidence in moves:
+            print(f"Step {steps}: Trying ({x}, {y}) with confidence {confidence:.2f}")
+            gui.highlight_move(x, y, confidence)
         gui.update_display()
         time.sleep(0.8)
 
-        mine_hit = board.reveal_cell(x, y)
+        mine_hit = board.reveal_cells([(x, y) for x, y, _ in moves])
         gui.update_board(board)
         gui.update_display()
         steps += 1
@@ -61,7 +73,7 @@ def run_gui_game(solver_type):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--solver", choices=["cnn", "probabilistic"], default="cnn", help="Choose which solver to use")
+    parser.add_argument("--solver", choices=["cnn", "probabilistic", "exact", "hybrid"], default="cnn", help="Choose which solver to use")
     args = parser.parse_args()
 
     run_gui_game(args.solver)
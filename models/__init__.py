@@ -1,2 +1,3 @@
 # Package for neural network models
-from .model import create_cnn
\ No newline at end of file
+from .model import create_cnn
+from .registry import get_model, get_tflite_model, LoadedModel, LoadedTFLiteModel
\ No newline at end of file
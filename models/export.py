@@ -0,0 +1,62 @@
+import os
+import argparse
+import tensorflow as tf
+from models.registry import QUANTIZATIONS, resolve_model_path, resolve_tflite_path
+from utils.batch_generation import generate_training_batch
+
+# Mine counts used to generate int8 calibration positions for each shipped model
+CALIBRATION_MINES = {
+    'beginner': 10,
+    'intermediate': 40,
+    'expert': 99,
+}
+
+def convert_to_tflite(model, quantization='float16', calibration_inputs=None):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization == 'float16':
+        # Weights stored as float16 and dequantized on load; activations stay float32
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        if calibration_inputs is None:
+            raise ValueError("int8 quantization needs calibration inputs")
+        # Full integer kernels with float32 input and output, so callers feed the usual encoding
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([inputs[None]] for inputs in calibration_inputs)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif quantization != 'float32':
+        raise ValueError(f"Unknown quantization: {quantization}")
+    return converter.convert()
+
+def export_tflite(difficulty='beginner', quantization='float16', model_path=None, out_path=None,
+                  num_calibration=512, seed=0):
+    model_path = model_path or resolve_model_path(difficulty)
+    out_path = out_path or resolve_tflite_path(difficulty, quantization)
+    model = tf.keras.models.load_model(model_path)
+
+    calibration_inputs = None
+    if quantization == 'int8':
+        _, height, width, _ = model.input_shape
+        calibration_inputs, _ = generate_training_batch(
+            num_calibration, width, height, CALIBRATION_MINES[difficulty.lower()], rng=seed)
+
+    flatbuffer = convert_to_tflite(model, quantization, calibration_inputs)
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(flatbuffer)
+    return out_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export trained CNN models as quantized TFLite models')
+    parser.add_argument("--difficulty", nargs="+", choices=sorted(CALIBRATION_MINES), default=sorted(CALIBRATION_MINES),
+                       help="Models to export")
+    parser.add_argument("--quantization", nargs="+", choices=QUANTIZATIONS, default=list(QUANTIZATIONS),
+                       help="Quantization schemes to export")
+    parser.add_argument("--calibration", type=int, default=512,
+                       help="Generated positions used to calibrate int8 activation ranges")
+    args = parser.parse_args()
+
+    for difficulty in args.difficulty:
+        for quantization in args.quantization:
+            path = export_tflite(difficulty, quantization, num_calibration=args.calibration)
+            print(f"{difficulty:>12} {quantization:>8}: {path} ({os.path.getsize(path) / 1024:.1f} KiB)")
@@ -1,13 +1,32 @@
 import tensorflow as tf
+from typing import Optional
 from tensorflow.keras import layers, models, losses
+from utils.encoding import NUM_CHANNELS, PADDED_CHANNELS
 
-def create_cnn(height: int, width: int) -> tf.keras.Model:
-    input_layer = layers.Input(shape=(height, width, 11))
+@tf.keras.utils.register_keras_serializable(package="minesweeper")
+class MaskPadding(layers.Layer):
+    # Zeroes features on padded cells, read from the in-board channel of the encoded input
+    def call(self, inputs):
+        features, encoded = inputs
+        return features * encoded[..., -1:]
+
+def create_cnn(height: Optional[int] = None, width: Optional[int] = None) -> tf.keras.Model:
+    # Every layer is a convolution, so leaving height and width as None gives a model
+    # that accepts any board size. That model takes boards padded to a bucketed canvas
+    # with the in-board channel, and masks the first layer's features on padding: the
+    # second 5x5 convolution then sees zeros there, just like its own zero padding at
+    # the edge of an unpadded board, so a board scores the same on any canvas.
+    variable_size = height is None and width is None
+    input_layer = layers.Input(shape=(height, width, PADDED_CHANNELS if variable_size else NUM_CHANNELS))
     x = layers.Conv2D(64, (5, 5), activation='relu', padding='same')(input_layer)
+    if variable_size:
+        x = MaskPadding()([x, input_layer])
     x = layers.Conv2D(64, (5, 5), activation='relu', padding='same')(x)
     x = layers.BatchNormalization()(x)
     x = layers.Dropout(0.5)(x)
     output_layer = layers.Conv2D(1, 1, padding='same')(x)
+    if variable_size:
+        output_layer = MaskPadding()([output_layer, input_layer])
 
     model = models.Model(inputs=input_layer, outputs=output_layer)
     model.compile(optimizer='adam', loss=losses.MeanSquaredError(), metrics=['accuracy'])
@@ -0,0 +1,153 @@
+import os
+import time
+import threading
+import numpy as np
+import tensorflow as tf
+from models.model import MaskPadding
+
+try:
+    # tf.lite.Interpreter is deprecated in favour of the standalone LiteRT package
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    Interpreter = tf.lite.Interpreter
+
+MODEL_PATHS = {
+    'beginner': 'models/cnn_beginner.keras',
+    'intermediate': 'models/cnn_intermediate.keras',
+    'expert': 'models/cnn_expert.keras',
+    # Size-agnostic model trained on all three sizes; serves any board size
+    'universal': 'models/cnn_universal.keras',
+}
+
+# Board size the graphs of a size-agnostic model are warmed up with
+WARMUP_SIZE = 16
+
+# TFLite exports live next to the Keras models, see models/export.py
+QUANTIZATIONS = ('float32', 'float16', 'int8')
+
+_models = {}
+_lock = threading.Lock()
+
+class LoadedModel:
+    def __init__(self, path):
+        self.path = path
+
+        start_time = time.perf_counter()
+        self.model = tf.keras.models.load_model(path, custom_objects={'MaskPadding': MaskPadding})
+        self.load_time = time.perf_counter() - start_time
+
+        self.input_shape = tuple(self.model.input_shape[1:])
+        self.infer = self._compile(None)
+        # A fully static signature lets single-move calls skip dynamic-shape handling, and
+        # calling its concrete function skips tf.function's per-call argument dispatch
+        self.infer_single = self._compile(1).get_concrete_function()
+
+        # Trace and run both graphs once so the first real move does not pay for it
+        start_time = time.perf_counter()
+        warmup_shape = tuple(WARMUP_SIZE if dim is None else dim for dim in self.input_shape)
+        warmup_input = np.zeros((1,) + warmup_shape, dtype=np.float32)
+        self.infer(warmup_input)
+        self.infer_single(warmup_input)
+        self.warmup_time = time.perf_counter() - start_time
+
+    def _compile(self, batch_size):
+        return tf.function(
+            lambda inputs: self.model(inputs, training=False),
+            input_signature=[tf.TensorSpec((batch_size,) + self.input_shape, tf.float32)],
+        )
+
+class LoadedTFLiteModel:
+    # Same infer/infer_single interface as LoadedModel, backed by the TFLite interpreter.
+    # Results come back as NumPy arrays. An interpreter is not thread-safe, so calls are
+    # serialised per model. Batches are padded up to the next power of two, so the
+    # shrinking tail of a lockstep simulation reuses a few allocated interpreters rather
+    # than reallocating for every new batch size.
+    def __init__(self, path, num_threads=1):
+        self.path = path
+        self.num_threads = num_threads
+        self._lock = threading.Lock()
+
+        start_time = time.perf_counter()
+        with open(path, "rb") as f:
+            self.model_content = f.read()
+        self.size_bytes = len(self.model_content)
+        self._single = self._interpreter(1)
+        self.input_shape = tuple(self._single.get_input_details()[0]['shape'][1:])
+        # Interpreter and padded input buffer per batch capacity
+        self._batches = {1: (self._single, np.zeros((1,) + self.input_shape, dtype=np.float32))}
+        self.load_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        self.infer_single(np.zeros((1,) + self.input_shape, dtype=np.float32))
+        self.warmup_time = time.perf_counter() - start_time
+
+    def _interpreter(self, batch_size):
+        interpreter = Interpreter(model_content=self.model_content, num_threads=self.num_threads)
+        input_details = interpreter.get_input_details()[0]
+        if input_details['shape'][0] != batch_size:
+            interpreter.resize_tensor_input(input_details['index'], (batch_size,) + tuple(input_details['shape'][1:]))
+        interpreter.allocate_tensors()
+        return interpreter
+
+    def _run(self, interpreter, inputs):
+        interpreter.set_tensor(interpreter.get_input_details()[0]['index'], inputs)
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+
+    def infer_single(self, inputs):
+        with self._lock:
+            return self._run(self._single, inputs)
+
+    def infer(self, inputs):
+        capacity = 1 << (len(inputs) - 1).bit_length()
+        with self._lock:
+            if capacity not in self._batches:
+                self._batches[capacity] = (self._interpreter(capacity),
+                                           np.zeros((capacity,) + self.input_shape, dtype=np.float32))
+            interpreter, padded = self._batches[capacity]
+            # Rows past the batch keep whatever an earlier call left; their outputs are dropped
+            padded[:len(inputs)] = inputs
+            return self._run(interpreter, padded)[:len(inputs)]
+
+def resolve_model_path(difficulty):
+    difficulty = difficulty.lower()
+    if difficulty not in MODEL_PATHS:
+        raise ValueError(f"Unknown difficulty level: {difficulty}")
+    return MODEL_PATHS[difficulty]
+
+def get_model(difficulty='beginner', path=None):
+    if path is None:
+        path = resolve_model_path(difficulty)
+    # Difficulties resolve to paths, so one entry serves both ways of asking
+    key = os.path.abspath(path)
+
+    with _lock:
+        if key not in _models:
+            _models[key] = LoadedModel(path)
+        return _models[key]
+
+def resolve_tflite_path(difficulty, quantization):
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization}")
+    root, _ = os.path.splitext(resolve_model_path(difficulty))
+    return f"{root}_{quantization}.tflite"
+
+def get_tflite_model(difficulty='beginner', quantization='float16', path=None):
+    if path is None:
+        path = resolve_tflite_path(difficulty, quantization)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No TFLite model at {path}; export it with `python -m models.export`")
+    key = os.path.abspath(path)
+
+    with _lock:
+        if key not in _models:
+            _models[key] = LoadedTFLiteModel(path)
+        return _models[key]
+
+def loaded_models():
+    with _lock:
+        return dict(_models)
+
+def clear_models():
+    with _lock:
+        _models.clear()
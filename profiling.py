@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import threading
+from functools import wraps
+
+# Opt-in timing of named spans. While disabled, span() hands back a shared no-op
+# context manager and @profiled functions make one flag check before calling through.
+# While enabled, each span adds its duration to a per-name histogram, and with
+# trace=True also records a Chrome trace event (chrome://tracing, Perfetto).
+
+SUB_BUCKETS = 8  # per power of two, so a bucket spans at most ~9% of its value
+
+_enabled = False
+_trace = False
+_max_events = 0
+_stats = {}
+_events = []
+_lock = threading.Lock()
+
+class SpanStats:
+    # Count, total and a log-linear histogram of durations in nanoseconds
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = {}
+
+    def add(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        index = _bucket(ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min((low + high) / 2, self.max_ns)
+        return float(self.max_ns)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ns / 1e6,
+            'mean_us': self.total_ns / self.count / 1e3 if self.count else 0.0,
+            'p50_us': self.percentile(50) / 1e3,
+            'p95_us': self.percentile(95) / 1e3,
+            'p99_us': self.percentile(99) / 1e3,
+            'max_us': self.max_ns / 1e3,
+        }
+
+def _bucket(ns):
+    # Values below SUB_BUCKETS get a bucket each; above that, each power of two is
+    # split into SUB_BUCKETS equal slices
+    if ns < SUB_BUCKETS:
+        return ns
+    shift = ns.bit_length() - SUB_BUCKETS.bit_length()
+    return (shift + 1) * SUB_BUCKETS + ((ns >> shift) - SUB_BUCKETS)
+
+def _bucket_bounds(index):
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    low = (SUB_BUCKETS + index % SUB_BUCKETS) << shift
+    return low, low + (1 << shift)
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def _record(name, start, end):
+    stats = _stats.get(name)
+    if stats is None:
+        with _lock:
+            stats = _stats.setdefault(name, SpanStats())
+    stats.add(end - start)
+    if _trace and len(_events) < _max_events:
+        _events.append((name, start, end - start, threading.get_ident()))
+
+def span(name):
+    return _Span(name) if _enabled else _NULL_SPAN
+
+def profiled(name):
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(name, start, time.perf_counter_ns())
+        return wrapper
+    return decorate
+
+def enable(trace=False, max_events=1_000_000):
+    global _enabled, _trace, _max_events
+    _enabled = True
+    _trace = trace
+    _max_events = max_events
+
+def disable():
+    global _enabled, _trace
+    _enabled = False
+    _trace = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+def stats():
+    return dict(_stats)
+
+def report():
+    return {name: stats.summary() for name, stats in sorted(_stats.items())}
+
+def print_report():
+    for name, summary in report().items():
+        print(f"{name:>36}: {summary['count']:8d} calls  "
+              f"total {summary['total_ms']:9.1f}ms  "
+              f"p50 {summary['p50_us']:8.1f}us  "
+              f"p95 {summary['p95_us']:8.1f}us  "
+              f"p99 {summary['p99_us']:8.1f}us")
+
+def save_json(path):
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2)
+
+def save_chrome_trace(path):
+    pid = os.getpid()
+    events = [
+        {'name': name, 'ph': 'X', 'ts': start / 1e3, 'dur': duration / 1e3, 'pid': pid, 'tid': tid}
+        for name, start, duration, tid in _events
+    ]
+    with open(path, "w") as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -1,3 +1,6 @@
 # Package containing Minesweeper solvers
 from .probabilistic import ProbabilisticSolver
-from .cnn import CNNSolver
\ No newline at end of file
+from .cnn import CNNSolver
+from .exact import ExactSolver
+from .hybrid import HybridSolver
+from .service import MoveService
\ No newline at end of file
@@ -1,31 +1,91 @@
 import tensorflow as tf
 import numpy as np
+import profiling
 from game.board import MinesweeperBoard
+from models.registry import get_model, get_tflite_model, resolve_model_path
+from utils.encoding import encode_board, encode_boards, encode_boards_padded, padded_shape
+
+INFERENCE_MODES = ('compiled', 'direct', 'predict', 'tflite')
+# 'compiled' removes the per-call overhead of predict, but a single expert move is then
+# bound by the float convolutions themselves and stays above a millisecond on one CPU
+# core (XLA compilation and frozen graphs are no faster). Interactive single-move play
+# therefore defaults to the int8 TFLite model, which answers well under a millisecond
+# for every difficulty; it picks a different cell among near-equal candidates more
+# often than the float modes do. Batched play and evaluation keep 'compiled'.
+INTERACTIVE_INFERENCE = {'inference': 'tflite', 'quantization': 'int8'}
 
 class CNNSolver:
-    def __init__(self, difficulty='beginner'):
-        model_path = self._get_model_path(difficulty)
-        self.model = tf.keras.models.load_model(model_path)
+    def __init__(self, difficulty='beginner', model_path=None, inference='compiled', quantization='float16'):
+        if inference not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {inference}")
+        # Models are loaded and warmed once per process and shared between solvers
+        if inference == 'tflite':
+            # model_path then points at an exported .tflite file, see models/export.py
+            self.loaded_model = get_tflite_model(difficulty, quantization, model_path)
+            self.model = None
+        else:
+            self.loaded_model = get_model(difficulty, model_path)
+            self.model = self.loaded_model.model
+        self.inference = inference
+        # A model without a fixed board size takes boards padded to a bucketed shape
+        self.variable_size = self.loaded_model.input_shape[0] is None
+        # Reusable encoding buffers keyed by board shape
+        self._buffers = {}
 
     def _get_model_path(self, difficulty):
-        difficulty = difficulty.lower()
-        if difficulty == 'beginner':
-            return 'models/cnn_beginner.keras'
-        elif difficulty == 'intermediate':
-            return 'models/cnn_intermediate.keras'
-        elif difficulty == 'expert':
-            return 'models/cnn_expert.keras'
-        else:
-            raise ValueError(f"Unknown difficulty level: {difficulty}")
+        return resolve_model_path(difficulty)
 
+    @profiling.profiled("cnn.get_move")
     def get_move(self, board: MinesweeperBoard):
         if board.first_move:
             # Make a safe first move
             return board.width // 2, board.height // 2, 0.0
 
-        input_tensor = self._create_input_tensor(board)
-        prediction = self.model.predict(tf.expand_dims(input_tensor, axis=0), verbose=0)[0, :, :, 0]
+        with profiling.span("cnn.encode"):
+            inputs = self._encode([board])
+        with profiling.span("cnn.forward"):
+            prediction = self._predict_single(inputs)[0, :board.height, :board.width, 0]
+        with profiling.span("cnn.choose"):
+            return self._choose_move(board, prediction)
+
+    def _predict_single(self, inputs):
+        if self.inference == 'tflite':
+            return self.loaded_model.infer_single(inputs)
+        if self.inference == 'compiled':
+            return self.loaded_model.infer_single(inputs).numpy()
+        if self.inference == 'direct':
+            return self.model(inputs, training=False).numpy()
+        # Keras predict builds a dataset and runs callbacks on every call
+        return self.model.predict(inputs, verbose=0)
+
+    @profiling.profiled("cnn.get_moves")
+    def get_moves(self, boards):
+        # Score every board that needs the network in a single forward pass
+        moves = [None] * len(boards)
+        pending = []
+        for i, board in enumerate(boards):
+            if board.first_move:
+                moves[i] = (board.width // 2, board.height // 2, 0.0)
+            else:
+                pending.append(i)
+
+        if pending:
+            with profiling.span("cnn.encode"):
+                inputs = self._encode([boards[i] for i in pending])
+            with profiling.span("cnn.forward"):
+                predictions = self._predict_batch(inputs)[:, :, :, 0]
+            with profiling.span("cnn.choose"):
+                for prediction, i in zip(predictions, pending):
+                    board = boards[i]
+                    moves[i] = self._choose_move(board, prediction[:board.height, :board.width])
+        return moves
 
+    def _predict_batch(self, inputs):
+        if self.inference == 'tflite':
+            return self.loaded_model.infer(inputs)
+        return self.loaded_model.infer(inputs).numpy()
+
+    def _choose_move(self, board: MinesweeperBoard, prediction):
         # Mask already visible or flagged cells
         masked_prediction = np.copy(prediction)
         masked_prediction[board.visible] = np.inf
@@ -36,17 +96,26 @@ class CNNSolver:
         confidence = np.clip(1 + float(masked_prediction[y, x]), 0.001, 0.999)
         return x, y, confidence
 
-    def _create_input_tensor(self, board: MinesweeperBoard) -> tf.Tensor:
-        channels = np.zeros((board.height, board.width, 11), dtype=np.float32)
-
-        # Channel 0: Visible
-        channels[:, :, 0] = board.visible.astype(float)
+    def _encode(self, boards):
+        if self.variable_size:
+            # Mixed sizes share one canvas, so they still run as a single forward pass
+            height, width = padded_shape(max(board.height for board in boards), max(board.width for board in boards))
+            return encode_boards_padded(boards, out=self._buffer(height, width, len(boards)))
+        first = boards[0]
+        inputs = self._buffer(first.height, first.width, len(boards))
+        if len(boards) == 1:
+            encode_board(first, out=inputs[0])
+            return inputs
+        return encode_boards(boards, out=inputs)
 
-        # Channel 1: Flags
-        channels[:, :, 1] = board.flags.astype(float)
+    def _buffer(self, height, width, batch_size):
+        buffer = self._buffers.get((height, width))
+        if buffer is None or len(buffer) < batch_size:
+            # Padded encodings of a size-agnostic model carry the extra in-board channel
+            channels = self.loaded_model.input_shape[-1]
+            buffer = np.zeros((batch_size, height, width, channels), dtype=np.float32)
+            self._buffers[(height, width)] = buffer
+        return buffer[:batch_size]
 
-        # Channels 2-10: One-hot numbers
-        for i in range(9):
-            channels[:, :, 2+i] = (board.board == i).astype(float)
-
-        return tf.convert_to_tensor(channels, dtype=tf.float32)
+    def _create_input_tensor(self, board: MinesweeperBoard) -> tf.Tensor:
+        return tf.convert_to_tensor(encode_board(board), dtype=tf.float32)
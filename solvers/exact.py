@@ -0,0 +1,318 @@
+import numpy as np
+from math import comb
+from collections import OrderedDict, defaultdict
+from game.grid import neighbour_sum
+from solvers.propagation import ConstraintPropagator
+
+class _SearchLimitReached(Exception):
+    pass
+
+class ExactSolver:
+    # Enumerating a component's layouts grows exponentially with its size. A component
+    # whose search takes more than max_search_steps steps is estimated instead: cells
+    # constraint propagation settles get 0 or 1, the rest the mean of remaining mines over
+    # hidden cells of the clues around them, as in ProbabilisticSolver. Its expected mine
+    # count is then taken off the mines the exact components and the interior share.
+    def __init__(self, board, cache_size=4096, rng=None, max_search_steps=20_000):
+        self.board = board
+        self.rng = np.random.default_rng(rng)
+        self.probabilities = np.zeros((board.height, board.width))
+        self.hidden = ~board.visible & ~board.flags
+        self.max_search_steps = max_search_steps
+        self.estimated_components = 0
+        self.cache_size = cache_size
+        self._component_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.update_probabilities()
+
+    def update_probabilities(self):
+        board = self.board
+        self.hidden = ~board.visible & ~board.flags
+        self.probabilities.fill(0.0)
+        board.probabilities.fill(0.0)
+
+        total_hidden = int(np.sum(self.hidden))
+        remaining_mines = board.num_mines - int(np.sum(board.flags))
+        if total_hidden == 0:
+            return
+
+        constraints = self._frontier_constraints()
+        components = self._split_components(constraints)
+        solved = [self._solve_component(component) for component in components]
+
+        estimated = [cells for (cells, _), result in zip(components, solved) if result is None]
+        estimates = self._estimate([cell for cells in estimated for cell in cells]) if estimated else {}
+        solved = [result for result in solved if result is not None]
+        shared_mines = remaining_mines - round(sum(estimates.values()))
+
+        frontier_size = sum(len(cells) for cells, _ in components)
+        interior_size = total_hidden - frontier_size
+        cell_probs, interior_prob = self._combine(solved, interior_size, shared_mines)
+
+        if cell_probs is None:
+            # Contradictory flags leave no consistent layout; fall back to the mine density
+            density = min(max(remaining_mines / total_hidden, 0.0), 1.0)
+            self.probabilities[self.hidden] = density
+            board.probabilities[self.hidden] = density
+            return
+
+        self.probabilities[self.hidden] = interior_prob
+        for (y, x), prob in {**cell_probs, **estimates}.items():
+            self.probabilities[y, x] = prob
+        board.probabilities[self.hidden] = self.probabilities[self.hidden]
+
+    def _frontier_constraints(self):
+        board = self.board
+        hidden_adj = neighbour_sum(self.hidden)
+        remaining = board.board - neighbour_sum(board.flags)
+        clue_cells = np.argwhere(board.visible & (board.board >= 0) & (hidden_adj > 0))
+
+        constraints = []
+        for y, x in clue_cells:
+            y0, y1 = max(y - 1, 0), min(y + 2, board.height)
+            x0, x1 = max(x - 1, 0), min(x + 2, board.width)
+            cells = tuple((int(y0 + dy), int(x0 + dx)) for dy, dx in np.argwhere(self.hidden[y0:y1, x0:x1]))
+            constraints.append((cells, int(remaining[y, x])))
+        return constraints
+
+    def _split_components(self, constraints):
+        # Union-find over frontier cells that share a constraint
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cells, _ in constraints:
+            for cell in cells:
+                parent.setdefault(cell, cell)
+            root = find(cells[0])
+            for cell in cells[1:]:
+                other = find(cell)
+                if other != root:
+                    parent[other] = root
+
+        grouped = defaultdict(list)
+        for constraint in constraints:
+            grouped[find(constraint[0][0])].append(constraint)
+
+        components = []
+        for root, component_constraints in grouped.items():
+            cells = sorted({cell for cells, _ in component_constraints for cell in cells})
+            components.append((cells, component_constraints))
+        return components
+
+    def _solve_component(self, component):
+        cells, constraints = component
+        key = tuple(sorted(set(constraints)))
+        if key in self._component_cache:
+            self._component_cache.move_to_end(key)
+            self.cache_hits += 1
+            return self._component_cache[key]
+
+        self.cache_misses += 1
+        try:
+            result = self._enumerate(cells, constraints)
+        except _SearchLimitReached:
+            # Cached as well, so the same oversized component is not searched again
+            result = None
+            self.estimated_components += 1
+        self._component_cache[key] = result
+        if len(self._component_cache) > self.cache_size:
+            self._component_cache.popitem(last=False)
+        return result
+
+    def _enumerate(self, cells, constraints):
+        # Cells covered by exactly the same constraints are interchangeable, so the
+        # search assigns a mine count per group and weights it by the binomial.
+        unique_constraints = sorted(set(constraints))
+        membership = defaultdict(list)
+        for index, (constraint_cells, _) in enumerate(unique_constraints):
+            for cell in constraint_cells:
+                membership[cell].append(index)
+
+        groups = defaultdict(list)
+        for cell in cells:
+            groups[tuple(sorted(membership[cell]))].append(cell)
+        group_keys = self._search_order(list(groups))
+        group_cells = [groups[key] for key in group_keys]
+        sizes = [len(members) for members in group_cells]
+
+        targets = [count for _, count in unique_constraints]
+        assigned = [0] * len(unique_constraints)
+        capacity = [0] * len(unique_constraints)
+        group_constraints = [list(key) for key in group_keys]
+        for key, size in zip(group_keys, sizes):
+            for index in key:
+                capacity[index] += size
+
+        # weights[k] = number of layouts with k mines; group_mines[k][g] = mines in group g summed over them
+        weights = defaultdict(int)
+        group_mines = defaultdict(lambda: [0] * len(group_keys))
+        values = [0] * len(group_keys)
+        steps = 0
+
+        def search(position, mines, weight):
+            nonlocal steps
+            steps += 1
+            if steps > self.max_search_steps:
+                raise _SearchLimitReached
+            if position == len(group_keys):
+                weights[mines] += weight
+                totals = group_mines[mines]
+                for g, value in enumerate(values):
+                    if value:
+                        totals[g] += weight * value
+                return
+
+            size = sizes[position]
+            indices = group_constraints[position]
+            for index in indices:
+                capacity[index] -= size
+            for value in range(size + 1):
+                if all(assigned[i] + value <= targets[i] and
+                       assigned[i] + value + capacity[i] >= targets[i] for i in indices):
+                    for index in indices:
+                        assigned[index] += value
+                    values[position] = value
+                    search(position + 1, mines + value, weight * comb(size, value))
+                    for index in indices:
+                        assigned[index] -= value
+            values[position] = 0
+            for index in indices:
+                capacity[index] += size
+
+        search(0, 0, 1)
+        return group_cells, dict(weights), dict(group_mines)
+
+    def _estimate(self, cells):
+        # Mine probabilities of cells in components too large to enumerate
+        board = self.board
+        safe, mines = ConstraintPropagator(board).propagate()
+        hidden_adj = neighbour_sum(self.hidden)
+        remaining = board.board - neighbour_sum(board.flags)
+        contributing = board.visible & (board.board >= 0) & (hidden_adj > 0)
+        clue_probs = np.zeros(remaining.shape)
+        np.divide(remaining, hidden_adj, out=clue_probs, where=contributing)
+        estimate = neighbour_sum(clue_probs) / np.maximum(neighbour_sum(contributing), 1)
+        estimate = np.where(mines, 1.0, np.where(safe, 0.0, np.clip(estimate, 0.0, 1.0)))
+        return {cell: float(estimate[cell]) for cell in cells}
+
+    def _search_order(self, group_keys):
+        # Breadth-first over shared constraints so each constraint is closed soon after it opens
+        by_constraint = defaultdict(list)
+        for key in group_keys:
+            for index in key:
+                by_constraint[index].append(key)
+
+        ordered = []
+        seen = set()
+        for start in sorted(group_keys, key=len, reverse=True):
+            if start in seen:
+                continue
+            queue = [start]
+            seen.add(start)
+            while queue:
+                key = queue.pop(0)
+                ordered.append(key)
+                for index in key:
+                    for neighbour in by_constraint[index]:
+                        if neighbour not in seen:
+                            seen.add(neighbour)
+                            queue.append(neighbour)
+        return ordered
+
+    def _combine(self, solved, interior_size, remaining_mines):
+        # Binomials of a big interior are huge integers, and the same few are asked for
+        # over and over
+        ways = {}
+
+        def interior_ways(mines):
+            rest = remaining_mines - mines
+            if rest not in ways:
+                ways[rest] = comb(interior_size, rest) if 0 <= rest <= interior_size else 0
+            return ways[rest]
+
+        def convolve(distributions):
+            total = {0: 1}
+            for distribution in distributions:
+                combined = defaultdict(int)
+                for a, wa in total.items():
+                    for b, wb in distribution.items():
+                        if a + b <= remaining_mines:
+                            combined[a + b] += wa * wb
+                total = combined
+            return total
+
+        # Running convolutions from either end give every "all but one component"
+        # distribution with two convolutions each instead of one per other component
+        distributions = [weights for _, weights, _ in solved]
+        before = [{0: 1}]
+        for distribution in distributions:
+            before.append(convolve([before[-1], distribution]))
+        after = [{0: 1}]
+        for distribution in reversed(distributions):
+            after.append(convolve([after[-1], distribution]))
+        after.reverse()
+
+        everything = before[-1]
+        total_weight = sum(w * interior_ways(k) for k, w in everything.items())
+        if total_weight == 0:
+            return None, None
+
+        interior_mines = sum(w * interior_ways(k) * (remaining_mines - k) for k, w in everything.items())
+        interior_prob = interior_mines / (total_weight * interior_size) if interior_size else 0.0
+
+        cell_probs = {}
+        for i, (group_cells, weights, group_mines) in enumerate(solved):
+            others = convolve([before[i], after[i + 1]])
+            # Weight of every way the rest of the board can hold remaining_mines - k
+            rest_weight = {
+                k: sum(w * interior_ways(k + j) for j, w in others.items())
+                for k in weights
+            }
+            for g, members in enumerate(group_cells):
+                expected = sum(mines[g] * rest_weight[k] for k, mines in group_mines.items())
+                prob = expected / (total_weight * len(members))
+                for cell in members:
+                    cell_probs[cell] = prob
+        return cell_probs, interior_prob
+
+    def next_moves(self, update=True):
+        # Same contract as ProbabilisticSolver.next_moves: every certain reveal and flag at once
+        flags_before = self.board.flags.copy()
+        if update:
+            self.update_probabilities()
+        certain_mines = self.hidden & (self.probabilities >= 1.0)
+        self.board.flag_cells(np.flatnonzero(certain_mines))
+        self.hidden &= ~certain_mines
+        flags = [(int(x), int(y)) for y, x in np.argwhere(self.board.flags & ~flags_before)]
+
+        reveals = [(int(x), int(y)) for y, x in np.argwhere(self.hidden & (self.probabilities <= 0.0))]
+        if not reveals:
+            x, y = self._guess()
+            reveals = [(int(x), int(y))]
+        return reveals, flags
+
+    def next_move(self):
+        self.update_probabilities()
+        board = self.board
+
+        # Flag every certain mine, then reveal the safest hidden cell
+        certain_mines = self.hidden & (self.probabilities >= 1.0)
+        board.flag_cells(np.flatnonzero(certain_mines))
+        self.hidden &= ~certain_mines
+
+        return self._guess()
+
+    def _guess(self):
+        candidates = np.argwhere(self.hidden)
+        if len(candidates) == 0:
+            return (0, 0)
+        probs = self.probabilities[self.hidden]
+        best = candidates[probs == probs.min()]
+        y, x = best[self.rng.integers(len(best))]
+        return (x, y)
@@ -0,0 +1,46 @@
+import numpy as np
+from solvers.cnn import CNNSolver
+from solvers.propagation import ConstraintPropagator
+
+class HybridSolver:
+    # Plays every move the clues force and only asks the CNN when it has to guess
+    def __init__(self, board, difficulty='beginner', cnn_solver=None):
+        self.board = board
+        self.cnn_solver = cnn_solver or CNNSolver(difficulty)
+        self.propagator = ConstraintPropagator(board)
+        self.model_calls = 0
+        self.forced_moves_played = 0
+
+    def deduce(self):
+        # Masks of hidden cells that are certainly safe and certainly mines
+        return self.propagator.propagate()
+
+    def forced_moves(self):
+        # Flags every certain mine and returns every certain safe reveal as (x, y, confidence)
+        safe, mines = self.deduce()
+        self.board.flag_cells(np.flatnonzero(mines))
+        moves = [(int(x), int(y), 1.0) for y, x in np.argwhere(safe)]
+        self.forced_moves_played += len(moves)
+        return moves
+
+    def next_moves(self):
+        moves = self.forced_moves()
+        if moves:
+            return moves
+        if not self.board.first_move:
+            self.model_calls += 1
+        return [self.cnn_solver.get_move(self.board)]
+
+    @staticmethod
+    def next_moves_batch(solvers):
+        # next_moves() for several boards sharing one CNNSolver: every board that has to
+        # guess is scored in a single forward pass
+        moves = [solver.forced_moves() for solver in solvers]
+        guessing = [i for i, forced in enumerate(moves) if not forced]
+        if guessing:
+            guesses = solvers[guessing[0]].cnn_solver.get_moves([solvers[i].board for i in guessing])
+            for i, guess in zip(guessing, guesses):
+                if not solvers[i].board.first_move:
+                    solvers[i].model_calls += 1
+                moves[i] = [guess]
+        return moves
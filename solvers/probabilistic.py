@@ -1,13 +1,292 @@
 import numpy as np
+import profiling
+from game.grid import neighbour_sum
+from solvers.propagation import ConstraintPropagator
+
+BACKENDS = ('numpy', 'python')
+
+# 3x3 neighbourhood offsets in the same row-major order as the nested loops
+NEIGHBOUR_DY = np.repeat(np.arange(-1, 2), 3)
+NEIGHBOUR_DX = np.tile(np.arange(-1, 2), 3)
 
 class ProbabilisticSolver:
-    def __init__(self, board):
+    def __init__(self, board, backend='numpy', incremental=True, propagation=True, rng=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
         self.board = board
+        self.rng = np.random.default_rng(rng)
+        self.backend = backend
+        self.incremental = incremental and backend == 'numpy'
+        self.propagator = ConstraintPropagator(board) if propagation else None
         self.probabilities = np.zeros((board.height, board.width))
         self.hidden = ~board.visible & ~board.flags
+        self.reset()
         self.update_probabilities()
 
+    def reset(self):
+        # Drop the incremental state; the next update rebuilds it from the whole board.
+        # Assigning board arrays invalidates the change log, but writes into them are not
+        # logged, so call this after writing into board.visible or board.flags.
+        self._seen_log = None
+
+    @profiling.profiled("probabilistic.update_probabilities")
     def update_probabilities(self):
+        with profiling.span("probabilistic.estimate"):
+            if self.incremental:
+                self._update_probabilities_incremental()
+            elif self.backend == 'numpy':
+                self._update_probabilities_numpy()
+            else:
+                self._update_probabilities_python()
+        if self.propagator is not None:
+            with profiling.span("probabilistic.propagate"):
+                self._apply_propagation()
+
+    def _apply_propagation(self):
+        # The per-clue rules above miss anything that needs two clues together; the
+        # propagator settles those cells exactly
+        safe, mines = self.propagator.propagate_cells()
+        self.probabilities.ravel()[safe] = 0.0
+        self.board.probabilities.ravel()[safe] = 0.0
+        if self.incremental:
+            self._safe_cells.update(safe.tolist())
+            self._mine_cells.difference_update(safe.tolist())
+        if not mines.size:
+            return
+        if self.incremental:
+            self._flag_incremental(mines)
+            # Estimates next to these flags predate them; refresh them on the next call
+            self._stale_cells = mines
+            if self.board.num_mines == self._num_flags:
+                self._rebuild_incremental_state()
+        else:
+            self.board.flag_cells(mines)
+            self.hidden.ravel()[mines] = False
+            self.probabilities.ravel()[mines] = 1.0
+            self.board.probabilities.ravel()[mines] = 1.0
+            if self.board.num_mines == np.sum(self.board.flags):
+                # With every mine flagged the interior density above is stale: all hidden cells are safe
+                self.probabilities[self.hidden] = 0.0
+                self.board.probabilities[self.hidden] = 0.0
+
+    def _neighbour_indices(self, cells):
+        # Flat indices of the 3x3 neighbourhood of each flat cell index, plus a validity mask
+        ys, xs = np.divmod(cells, self.board.width)
+        ny = ys[:, np.newaxis] + NEIGHBOUR_DY
+        nx = xs[:, np.newaxis] + NEIGHBOUR_DX
+        valid = (ny >= 0) & (ny < self.board.height) & (nx >= 0) & (nx < self.board.width)
+        return np.where(valid, ny * self.board.width + nx, 0), valid
+
+    def _neighbourhood(self, cells):
+        indices, valid = self._neighbour_indices(cells)
+        return np.unique(indices[valid])
+
+    def _apply_count_deltas(self, cells, hidden_delta, flag_delta):
+        indices, valid = self._neighbour_indices(cells)
+        np.add.at(self._hidden_adj, indices[valid], np.broadcast_to(hidden_delta[:, np.newaxis], valid.shape)[valid])
+        np.add.at(self._flagged_adj, indices[valid], np.broadcast_to(flag_delta[:, np.newaxis], valid.shape)[valid])
+        self._num_hidden += int(np.sum(hidden_delta))
+        self._num_flags += int(np.sum(flag_delta))
+
+    def _forget(self, cells):
+        # Drop cells from the safe, certain-mine and frontier sets until they are re-estimated
+        cells = cells.tolist()
+        self._safe_cells.difference_update(cells)
+        self._mine_cells.difference_update(cells)
+        self._frontier_cells.difference_update(cells)
+
+    def _rebuild_incremental_state(self):
+        board = self.board
+        new_flags = self._update_probabilities_numpy()
+
+        self._seen_log = board.change_log
+        self._log_epoch = board.change_log.epoch
+        self._log_position = board.change_log.register(self)
+        self._seen_flags = board.flags.ravel().copy()
+        self._hidden_adj = neighbour_sum(self.hidden).ravel()
+        self._flagged_adj = neighbour_sum(board.flags).ravel()
+        contributing = board.visible & (board.board > 0) & (self._hidden_adj.reshape(self.hidden.shape) > 0)
+        self._frontier = (neighbour_sum(contributing) > 0).ravel()
+        self._num_hidden = int(np.sum(self.hidden))
+        self._num_flags = int(np.sum(board.flags))
+        self._last_new_flags = np.flatnonzero(new_flags) if new_flags is not None else np.empty(0, dtype=np.intp)
+        self._stale_cells = np.empty(0, dtype=np.intp)
+
+        hidden = self.hidden.ravel()
+        probabilities = self.probabilities.ravel()
+        self._frontier_cells = set(np.flatnonzero(hidden & self._frontier).tolist())
+        self._safe_cells = set(np.flatnonzero(hidden & (probabilities == 0.0)).tolist())
+        self._mine_cells = set(np.flatnonzero(hidden & (probabilities == 1.0)).tolist())
+        remaining_mines = board.num_mines - self._num_flags
+        # The end-game shortcuts leave no density to track, so the next call starts over
+        self._endgame = self._num_hidden == remaining_mines or remaining_mines == 0
+        self.density = remaining_mines / self._num_hidden if self._num_hidden else 0.0
+
+    def _flag_incremental(self, new_flags):
+        # Flag flat cells and fold them into the neighbour counts right away. Flags set
+        # by the solver keep a probability of 1.0 until the next call.
+        self.board.flag_cells(new_flags)
+        self.hidden.ravel()[new_flags] = False
+        self._seen_flags[new_flags] = True
+        self._apply_count_deltas(
+            new_flags,
+            np.full(new_flags.size, -1, dtype=np.int64),
+            np.ones(new_flags.size, dtype=np.int64),
+        )
+        self._forget(new_flags)
+        self.probabilities.ravel()[new_flags] = 1.0
+        self.board.probabilities.ravel()[new_flags] = 1.0
+        self._last_new_flags = np.union1d(self._last_new_flags, new_flags)
+
+    def _update_probabilities_incremental(self):
+        # Keeps per-cell hidden/flag neighbour counts, the per-clue estimates, the
+        # frontier and the safe and certain-mine cells between calls, and only revisits
+        # clues within reach of the cells the board logged as revealed or (un)flagged
+        # since the previous call. Interior cells share one density, so apart from one
+        # masked write of it the cost of a call follows the size of the change.
+        board = self.board
+        log = board.change_log
+        if self._seen_log is not log or self._log_epoch != log.epoch or self._endgame:
+            self._rebuild_incremental_state()
+            return
+
+        flags = board.flags.ravel()
+        clues = board.board.ravel()
+        hidden = self.hidden.ravel()
+        probabilities = self.probabilities.ravel()
+        board_probabilities = board.probabilities.ravel()
+
+        entries = log.entries_since(self._log_position)
+        self._log_position = log.consumed(self, self._log_position + len(entries))
+        changed = np.unique(np.concatenate([self._stale_cells, *entries]))
+        self._stale_cells = np.empty(0, dtype=np.intp)
+        now_hidden = ~board.visible.ravel()[changed] & ~flags[changed]
+        self._apply_count_deltas(
+            changed,
+            now_hidden.astype(np.int64) - hidden[changed],
+            flags[changed].astype(np.int64) - self._seen_flags[changed],
+        )
+        hidden[changed] = now_hidden
+        self._seen_flags[changed] = flags[changed]
+        self._forget(changed)
+
+        # Only cells flagged by the previous call keep a probability of 1.0
+        probabilities[self._last_new_flags] = 0.0
+        board_probabilities[self._last_new_flags] = 0.0
+        probabilities[changed] = 0.0
+        board_probabilities[changed] = 0.0
+        self._last_new_flags = np.empty(0, dtype=np.intp)
+
+        remaining_mines = board.num_mines - self._num_flags
+        if self._num_hidden == remaining_mines or remaining_mines == 0:
+            # End-game shortcuts touch the whole board anyway
+            self._rebuild_incremental_state()
+            return
+
+        visible = board.visible.ravel()
+        dirty = self._neighbourhood(changed)
+        saturated = dirty[
+            visible[dirty] & (clues[dirty] > 0) & (self._hidden_adj[dirty] > 0) &
+            (clues[dirty] - self._flagged_adj[dirty] == self._hidden_adj[dirty])
+        ]
+        new_flags = self._neighbourhood(saturated)
+        new_flags = new_flags[hidden[new_flags]]
+        if new_flags.size:
+            self._flag_incremental(new_flags)
+            changed = np.union1d(changed, new_flags)
+            if self._num_flags == board.num_mines:
+                # Those flags were the last mines, so every hidden cell is safe
+                self._rebuild_incremental_state()
+                return
+
+        if self._num_hidden == 0:
+            return
+
+        # Clue estimates change only next to changed cells, and cell estimates only next to those clues
+        cells = self._neighbourhood(self._neighbourhood(changed))
+        cells = cells[hidden[cells]]
+        indices, valid = self._neighbour_indices(cells)
+        contributing = valid & visible[indices] & (clues[indices] > 0) & (self._hidden_adj[indices] > 0)
+        clue_probs = np.zeros(indices.shape)
+        np.divide(clues[indices] - self._flagged_adj[indices], self._hidden_adj[indices], out=clue_probs, where=contributing)
+
+        prob_sum = np.zeros(cells.size)
+        for k in range(indices.shape[1]):
+            prob_sum += clue_probs[:, k]
+        weight_sum = np.sum(contributing, axis=1)
+        on_frontier = weight_sum > 0
+        self._frontier[cells] = on_frontier
+
+        frontier_cells = cells[on_frontier]
+        frontier_probs = np.minimum(prob_sum[on_frontier] / weight_sum[on_frontier], 1.0)
+        probabilities[frontier_cells] = frontier_probs
+        board_probabilities[frontier_cells] = frontier_probs
+
+        self._forget(cells)
+        self._frontier_cells.update(frontier_cells.tolist())
+        self._safe_cells.update(frontier_cells[frontier_probs == 0.0].tolist())
+        self._mine_cells.update(frontier_cells[frontier_probs == 1.0].tolist())
+
+        # Interior cells (hidden, no clue next to them) all share the new density
+        self.density = (board.num_mines - self._num_flags) / self._num_hidden
+        interior = hidden & ~self._frontier
+        probabilities[interior] = self.density
+        board_probabilities[interior] = self.density
+
+    def _update_probabilities_numpy(self):
+        board = self.board
+        self.hidden = ~board.visible & ~board.flags
+        remaining_mines = board.num_mines - np.sum(board.flags)
+
+        self.probabilities.fill(0.0)
+        board.probabilities.fill(0.0)
+
+        total_hidden = np.sum(self.hidden)
+        if total_hidden == remaining_mines:
+            self.probabilities[self.hidden] = 1.0
+            board.probabilities[self.hidden] = 1.0
+            return None
+
+        if remaining_mines == 0:
+            return None
+
+        # Flagging a neighbour of a clue lowers its remaining count and its hidden count
+        # by one each, so every clue that is saturated now stays saturated and a single
+        # pass reaches the same flags as repeated sweeps.
+        clue_cells = board.visible & (board.board > 0)
+        hidden_adj = neighbour_sum(self.hidden)
+        remaining = board.board - neighbour_sum(board.flags)
+        saturated = clue_cells & (hidden_adj > 0) & (remaining == hidden_adj)
+        new_flags = self.hidden & (neighbour_sum(saturated) > 0)
+        board.flag_cells(np.flatnonzero(new_flags))
+        self.probabilities[new_flags] = 1.0
+        board.probabilities[new_flags] = 1.0
+
+        self.hidden = ~board.visible & ~board.flags
+        total_hidden = np.sum(self.hidden)
+        remaining_mines = board.num_mines - np.sum(board.flags)
+
+        if total_hidden == 0:
+            return new_flags
+
+        # Average remaining / hidden over the clues around each hidden cell
+        hidden_adj = neighbour_sum(self.hidden)
+        remaining = board.board - neighbour_sum(board.flags)
+        contributing = clue_cells & (hidden_adj > 0)
+        clue_probs = np.zeros(remaining.shape)
+        np.divide(remaining, hidden_adj, out=clue_probs, where=contributing)
+
+        prob_sum = neighbour_sum(clue_probs)
+        weight_sum = neighbour_sum(contributing)
+        probs = np.full(prob_sum.shape, remaining_mines / total_hidden)
+        np.divide(prob_sum, weight_sum, out=probs, where=weight_sum > 0)
+        np.minimum(probs, 1.0, out=probs, where=weight_sum > 0)
+
+        self.probabilities[self.hidden] = probs[self.hidden]
+        board.probabilities[self.hidden] = probs[self.hidden]
+        return new_flags
+
+    def _update_probabilities_python(self):
         self.hidden = ~self.board.visible & ~self.board.flags
         mine_count = np.sum(self.board.flags)
         remaining_mines = self.board.num_mines - mine_count
@@ -58,7 +337,7 @@ class ProbabilisticSolver:
                     if remaining == len(hidden_adj) and len(hidden_adj) > 0:
                         for ny, nx in hidden_adj:
                             if not self.board.flags[ny, nx]:
-                                self.board.flags[ny, nx] = True
+                                self.board.flag_cells([ny * self.board.width + nx])
                                 if self.probabilities[ny, nx] != 1.0:
                                     self.probabilities[ny, nx] = 1.0
                                     self.board.probabilities[ny, nx] = 1.0
@@ -123,6 +402,8 @@ class ProbabilisticSolver:
 
     def next_move(self):
         self.update_probabilities()
+        if self.incremental:
+            return self._next_move_incremental()
 
         # print("Current board with probabilities:")
         # self.board.display(show_probabilities=True)
@@ -138,30 +419,84 @@ class ProbabilisticSolver:
         for move in mine_moves:
             y, x = move
             if not self.board.flags[y, x]:
-                self.board.flags[y, x] = True
+                self.board.flag_cells([y * self.board.width + x])
                 # print(f"Flagging mine at {(x, y)}")
                 return (x, y)
 
-        revealed_tiles = np.argwhere(self.board.visible)
-        adjacent_tiles = set()
-        for tile in revealed_tiles:
-            y, x = tile
-            for dy in [-1, 0, 1]:
-                for dx in [-1, 0, 1]:
-                    ny, nx = y + dy, x + dx
-                    if 0 <= ny < self.board.height and 0 <= nx < self.board.width:
-                        if self.hidden[ny, nx]:
-                            adjacent_tiles.add((nx, ny))
-
-        adjacent_tiles = list(adjacent_tiles)
+        return self._guess()
+
+    def _next_move_incremental(self):
+        # Same choices as the scans above, read off the sets the update keeps
+        if self._safe_cells:
+            return self._xy(min(self._safe_cells))
+        if self._mine_cells:
+            cell = min(self._mine_cells)
+            self._flag_new_mines(np.array([cell]))
+            return self._xy(cell)
+        return self._guess()
+
+    def _flag_new_mines(self, cells):
+        self._flag_incremental(cells)
+        self._stale_cells = np.union1d(self._stale_cells, cells)
+
+    def _xy(self, cell):
+        y, x = divmod(int(cell), self.board.width)
+        return (x, y)
+
+    def next_moves(self, update=True):
+        # Everything one analysis proves: every safe reveal plus every mine flagged
+        # along the way, as lists of (x, y). Without a safe cell the single best guess
+        # is the only reveal. update=False reads the moves off the last analysis, e.g.
+        # the one the constructor ran, instead of analysing the board again.
+        if self.incremental:
+            if update:
+                self.update_probabilities()
+            if self._mine_cells:
+                self._flag_new_mines(np.array(sorted(self._mine_cells)))
+            flags = [self._xy(cell) for cell in self._last_new_flags]
+            reveals = [self._xy(cell) for cell in sorted(self._safe_cells)]
+            if not reveals:
+                reveals = [self._guess()]
+            return reveals, flags
+
+        flags_before = self.board.flags.copy()
+        if update:
+            self.update_probabilities()
+
+        self.board.flag_cells(np.flatnonzero((self.probabilities == 1.0) & self.hidden))
+        flags = [(int(x), int(y)) for y, x in np.argwhere(self.board.flags & ~flags_before)]
+
+        reveals = [(int(x), int(y)) for y, x in np.argwhere((self.probabilities == 0.0) & self.hidden & ~self.board.flags)]
+        if not reveals:
+            reveals = [self._guess()]
+        return reveals, flags
+
+    def _guess(self):
+        if self.incremental:
+            # The frontier is exactly the hidden cells next to a revealed clue
+            adjacent_tiles = [self._xy(cell) for cell in sorted(self._frontier_cells)]
+        else:
+            revealed_tiles = np.argwhere(self.board.visible)
+            adjacent_tiles = set()
+            for tile in revealed_tiles:
+                y, x = tile
+                for dy in [-1, 0, 1]:
+                    for dx in [-1, 0, 1]:
+                        ny, nx = y + dy, x + dx
+                        if 0 <= ny < self.board.height and 0 <= nx < self.board.width:
+                            if self.hidden[ny, nx]:
+                                adjacent_tiles.add((nx, ny))
+            adjacent_tiles = list(adjacent_tiles)
+
         if adjacent_tiles:
             min_prob = min(self.probabilities[y, x] for x, y in adjacent_tiles)
             candidates = [(x, y) for x, y in adjacent_tiles if self.probabilities[y, x] == min_prob]
             if candidates:
-                move = candidates[np.random.choice(len(candidates))]
+                move = candidates[self.rng.integers(len(candidates))]
                 # print(f"Choosing lowest-risk move at {move} (probability: {min_prob:.0%})")
                 return move
 
+        # Only reached while no clue borders a hidden cell, e.g. before the first reveal
         hidden_cells = np.argwhere(self.hidden)
         if len(hidden_cells) > 0:
             for y, x in hidden_cells:
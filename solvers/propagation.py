@@ -0,0 +1,211 @@
+import numpy as np
+import profiling
+from collections import defaultdict, deque
+from game.grid import neighbour_sum
+
+class ConstraintPropagator:
+    # Every frontier clue becomes a constraint "these hidden cells hold this many mines",
+    # with the cells as a Python-int bitmask over flat board indices. A constraint whose
+    # cells are a strict subset of another's splits the larger one into the difference
+    # and its count; two that only partly overlap bound the mines in their shared cells,
+    # which can settle the cells only one of them covers. Constraints of all-safe or
+    # all-mine cells resolve those cells.
+    # Constraints and resolved cells persist between calls. Each call replays the cells
+    # the board logged as revealed or flagged since the last one, so only constraints
+    # touching them are queued; the board is only swept again when a flag is removed or
+    # the board is replaced.
+
+    def __init__(self, board):
+        self.board = board
+        self.reset()
+
+    def reset(self):
+        # The next call rebuilds every constraint from the board, e.g. after writes into
+        # board.visible or board.flags, which the change log does not see
+        self._seen_log = None
+
+    def _bits(self, mask):
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def _decode(self, mask):
+        cells = self.board.width * self.board.height
+        raw = np.frombuffer(mask.to_bytes((cells + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder='little')[:cells].reshape(self.board.height, self.board.width).astype(bool)
+
+    def _encode(self, array):
+        return int.from_bytes(np.packbits(array.ravel(), bitorder='little').tobytes(), 'little')
+
+    def _frontier_constraints(self):
+        board = self.board
+        hidden = ~board.visible & ~board.flags
+        remaining = board.board - neighbour_sum(board.flags)
+        clues = board.visible & (board.board >= 0) & (neighbour_sum(hidden) > 0)
+
+        constraints = []
+        for y, x in zip(*np.nonzero(clues)):
+            y0, x0 = max(y - 1, 0), max(x - 1, 0)
+            mask = 0
+            for dy, dx in zip(*np.nonzero(hidden[y0:y + 2, x0:x + 2])):
+                mask |= 1 << int((y0 + dy) * board.width + x0 + dx)
+            constraints.append((mask, int(remaining[y, x])))
+        return constraints
+
+    def _clue_constraint(self, cell):
+        # The constraint of a newly revealed clue over its still undecided neighbours
+        board = self.board
+        y, x = divmod(cell, board.width)
+        mines = self._flagged | self.mines
+        settled = self._visible | self.safe
+        mask = 0
+        count = int(board.board[y, x])
+        for ny in range(max(y - 1, 0), min(y + 2, board.height)):
+            for nx in range(max(x - 1, 0), min(x + 2, board.width)):
+                bit = 1 << (ny * board.width + nx)
+                if mines & bit:
+                    count -= 1
+                elif not settled & bit:
+                    mask |= bit
+        return mask, count
+
+    def _add(self, mask, count):
+        if mask == 0 or mask in self.constraints:
+            return
+        self.constraints[mask] = count
+        for cell in self._bits(mask):
+            self.containing[cell].add(mask)
+        self.queue.append(mask)
+
+    def _remove(self, mask):
+        del self.constraints[mask]
+        for cell in self._bits(mask):
+            self.containing[cell].discard(mask)
+
+    def _overlapping(self, mask):
+        found = set()
+        for cell in self._bits(mask):
+            found |= self.containing[cell]
+        found.discard(mask)
+        return found
+
+    def _resolve(self, mask, is_mine):
+        mask &= ~(self.safe | self.mines)
+        if is_mine:
+            self.mines |= mask
+        else:
+            self.safe |= mask
+        self._strip(mask, is_mine)
+
+    def _strip(self, mask, is_mine):
+        # Strip settled cells out of every constraint that mentions them
+        affected = self._overlapping(mask)
+        if mask in self.constraints:
+            affected.add(mask)
+        for other in affected:
+            count = self.constraints[other]
+            self._remove(other)
+            self._add(other & ~mask, count - ((other & mask).bit_count() if is_mine else 0))
+
+    def _overlap(self, mask, count, other, other_count):
+        # The shared cells hold at least what neither constraint can fit into its own
+        # cells and at most what both allow; when that leaves the cells only one of them
+        # covers no choice, they become an all-safe or all-mine constraint
+        only_mask, only_other = mask & ~other, other & ~mask
+        low = max(count - only_mask.bit_count(), other_count - only_other.bit_count(), 0)
+        high = min((mask & other).bit_count(), count, other_count)
+        for only, total in ((only_mask, count), (only_other, other_count)):
+            if total == low:
+                self._add(only, 0)
+            elif total - high == only.bit_count():
+                self._add(only, total - high)
+
+    def _rebuild(self):
+        board = self.board
+        self.constraints = {}
+        self.containing = defaultdict(set)
+        self.queue = deque()
+        self.safe = 0
+        self.mines = 0
+        self._visible = self._encode(board.visible)
+        self._flagged = self._encode(board.flags)
+        self._seen_log = board.change_log
+        self._log_epoch = board.change_log.epoch
+        self._log_position = board.change_log.register(self)
+        for mask, count in self._frontier_constraints():
+            self._add(mask, count)
+
+    def _replay(self, cells):
+        # Fold logged cells into the constraints. Returns False when that cannot be done
+        # incrementally: a flag was removed or contradicts a cell proven safe, or a
+        # proven mine was revealed.
+        visible = self.board.visible.ravel()
+        flags = self.board.flags.ravel()
+        opened = []
+        for cell in cells.tolist():
+            bit = 1 << cell
+            if visible[cell] and not self._visible & bit:
+                if self.mines & bit:
+                    return False
+                self._visible |= bit
+                self.safe &= ~bit
+                self._strip(bit, False)
+                opened.append(cell)
+            elif bool(flags[cell]) != bool(self._flagged & bit):
+                if not flags[cell] or self.safe & bit:
+                    return False
+                self._flagged |= bit
+                if self.mines & bit:
+                    self.mines &= ~bit
+                else:
+                    self._strip(bit, True)
+
+        # Clues are read once every change is in, so they only cover undecided cells
+        for cell in opened:
+            if self.board.board.flat[cell] >= 0:
+                self._add(*self._clue_constraint(cell))
+        return True
+
+    @profiling.profiled("propagation.propagate")
+    def _propagate(self):
+        board = self.board
+        log = board.change_log
+        if self._seen_log is not log or self._log_epoch != log.epoch:
+            self._rebuild()
+        else:
+            entries = log.entries_since(self._log_position)
+            self._log_position = log.consumed(self, self._log_position + len(entries))
+            if entries and not self._replay(np.unique(np.concatenate(entries))):
+                self._rebuild()
+
+        while self.queue:
+            mask = self.queue.popleft()
+            if mask not in self.constraints:
+                continue
+            count = self.constraints[mask]
+            if count == 0:
+                self._resolve(mask, False)
+                continue
+            if count == mask.bit_count():
+                self._resolve(mask, True)
+                continue
+            for other in self._overlapping(mask):
+                other_count = self.constraints[other]
+                if mask & other == mask:
+                    self._add(other & ~mask, other_count - count)
+                elif mask & other == other:
+                    self._add(mask & ~other, count - other_count)
+                else:
+                    self._overlap(mask, count, other, other_count)
+
+    def propagate(self):
+        # Returns boolean masks of hidden cells that are certainly safe and certainly mines
+        self._propagate()
+        return self._decode(self.safe), self._decode(self.mines)
+
+    def propagate_cells(self):
+        # Same as propagate(), as arrays of flat cell indices rather than whole-board masks
+        self._propagate()
+        return (np.fromiter(self._bits(self.safe), dtype=np.intp),
+                np.fromiter(self._bits(self.mines), dtype=np.intp))
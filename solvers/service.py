@@ -0,0 +1,151 @@
+import time
+import asyncio
+from collections import deque
+from solvers.cnn import CNNSolver
+from utils.metrics import LatencyHistogram
+
+class MoveService:
+    # Answers get_move() calls from many concurrent game sessions in micro-batches. A
+    # batch goes to the model as soon as it holds max_batch_size boards or max_wait
+    # seconds after its first board arrived; each caller's future gets its own move.
+    # The forward pass runs in a worker thread, so new requests keep queueing meanwhile.
+    # Queueing, deadlines and latencies all read one clock: the event loop's, unless a
+    # clock function returning seconds is given.
+    def __init__(self, solver=None, difficulty='beginner', max_batch_size=64, max_wait=0.002, clock=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.solver = solver or CNNSolver(difficulty)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.clock = clock
+        self._pending = deque()
+        self._arrived = None
+        self._stopping = False
+        self._worker = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.latencies = LatencyHistogram()
+        self._started_at = time.perf_counter()
+
+    async def start(self):
+        if self._worker is not None:
+            return
+        self._pending = deque()
+        self._arrived = asyncio.Event()
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Requests already queued are still answered and new ones are refused; any
+        # request the worker leaves unanswered fails with RuntimeError
+        if self._worker is None:
+            return
+        self._stopping = True
+        self._arrived.set()
+        try:
+            await self._worker
+        finally:
+            self._worker = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def _now(self):
+        return self.clock() if self.clock is not None else asyncio.get_running_loop().time()
+
+    async def get_move(self, board):
+        # The board must not change until the move comes back
+        if self._worker is None:
+            raise RuntimeError("MoveService is not running; call start() or use it as an async context manager")
+        if self._stopping:
+            raise RuntimeError("service stopped")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((board, future, self._now()))
+        self._arrived.set()
+        return await future
+
+    async def _wait_for_request(self, timeout=None):
+        # Requests sit in a plain deque and only an event is awaited, so a wait that
+        # times out or is cancelled can never take a request with it
+        self._arrived.clear()
+        try:
+            async with asyncio.timeout(timeout):
+                await self._arrived.wait()
+        except TimeoutError:
+            pass
+
+    async def _run(self):
+        batch = []
+        try:
+            while self._pending or not self._stopping:
+                if not self._pending:
+                    await self._wait_for_request()
+                    continue
+                # A board that queued while the previous batch ran has already waited
+                batch = [self._pending.popleft()]
+                deadline = batch[0][2] + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    if self._pending:
+                        batch.append(self._pending.popleft())
+                        continue
+                    timeout = deadline - self._now()
+                    if timeout <= 0 or self._stopping:
+                        break
+                    await self._wait_for_request(timeout)
+                    if not self._pending:
+                        break
+                await self._process(batch)
+                batch = []
+        finally:
+            # Empty after a clean stop; a cancelled or failed worker fails what it still holds
+            error = RuntimeError("service stopped")
+            for _, future, _ in [*batch, *self._pending]:
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def _process(self, batch):
+        boards = [board for board, _, _ in batch]
+        start_time = self._now()
+        try:
+            moves = await asyncio.to_thread(self.solver.get_moves, boards)
+        except Exception as error:
+            moves = None
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+        finished = self._now()
+
+        self.requests += len(batch)
+        self.batches += 1
+        self.busy_time += finished - start_time
+        if moves is None:
+            self.errors += len(batch)
+            return
+        self.latencies.add([finished - queued_at for _, _, queued_at in batch])
+        for (_, future, _), move in zip(batch, moves):
+            if not future.done():
+                future.set_result(move)
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started_at
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'errors': self.errors,
+            'mean_batch_size': self.requests / self.batches if self.batches else 0,
+            'moves_per_sec': self.requests / elapsed if elapsed > 0 else 0,
+            'busy_fraction': self.busy_time / elapsed if elapsed > 0 else 0,
+            'p50_latency': self.latencies.percentile(50),
+            'p95_latency': self.latencies.percentile(95),
+            'p99_latency': self.latencies.percentile(99),
+        }
@@ -0,0 +1,16 @@
+import pytest
+import numpy as np
+from game.board import MinesweeperBoard
+
+@pytest.fixture
+def one_two_one_board():
+    # Bottom row hidden under a revealed 1-2-1 pattern; mines sit under both 1s. Neither
+    # clue alone decides anything: the 1 inside the 2 places the right-hand mine.
+    board = MinesweeperBoard(width=3, height=2, num_mines=2)
+    board.first_move = False
+    board.board = np.array([
+        [1, 2, 1],
+        [-1, 2, -1]
+    ])
+    board.visible[0, :] = True
+    return board
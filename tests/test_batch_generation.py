@@ -0,0 +1,32 @@
+import numpy as np
+from game.grid import neighbour_sum
+from utils.batch_generation import generate_board_batch, generate_training_batch
+from utils.dataset import create_input_array
+from game.board import MinesweeperBoard
+
+def test_board_batch_invariants():
+    mines, clues, visible = generate_board_batch(200, 16, 16, 40, rng=0)
+    assert mines.shape == clues.shape == visible.shape == (200, 16, 16)
+    assert (mines.reshape(200, -1).sum(axis=1) == 40).all()
+    assert np.array_equal(clues == -1, mines)
+    assert np.array_equal(clues[~mines], neighbour_sum(mines)[~mines])
+    assert not (visible & mines).any()
+    # Every revealed zero has its whole neighbourhood revealed
+    assert ((neighbour_sum(visible & (clues == 0)) > 0) <= visible).all()
+    assert (visible.reshape(200, -1).sum(axis=1) >= 5).all()
+
+def test_batch_generation_is_seeded():
+    first = generate_board_batch(20, 9, 9, 10, rng=3)
+    second = generate_board_batch(20, 9, 9, 10, rng=3)
+    for a, b in zip(first, second):
+        assert np.array_equal(a, b)
+
+def test_batch_encoding_matches_board_encoding():
+    inputs, targets = generate_training_batch(5, 9, 9, 10, rng=1)
+    mines, clues, visible = generate_board_batch(5, 9, 9, 10, rng=1)
+    for i in range(5):
+        board = MinesweeperBoard(9, 9, 10)
+        board.board = clues[i].astype(int)
+        board.visible = visible[i]
+        assert np.array_equal(inputs[i], create_input_array(board))
+        assert np.array_equal(targets[i, :, :, 0], mines[i])
@@ -0,0 +1,145 @@
+import pytest
+import numpy as np
+from game.board import MinesweeperBoard
+from game.bitboard import BitboardMinesweeperBoard
+from solvers.probabilistic import ProbabilisticSolver
+
+@pytest.mark.parametrize("seed", range(10))
+def test_bitboard_matches_numpy_board(seed):
+    x, y = np.random.default_rng(seed).integers(16, size=2)
+    board = MinesweeperBoard(16, 16, 40, seed=seed)
+    board.reveal_cell(x, y)
+    moves = [board.get_random_safe_cell() for _ in range(3)]
+
+    bitboard = BitboardMinesweeperBoard(16, 16, 40, seed=seed)
+    bitboard.reveal_cell(x, y)
+    assert [bitboard.get_random_safe_cell() for _ in range(3)] == moves
+
+    np.testing.assert_array_equal(bitboard.board, board.board)
+    np.testing.assert_array_equal(bitboard.visible, board.visible)
+    for x, y in moves:
+        assert bitboard.reveal_cell(x, y) == board.reveal_cell(x, y)
+        np.testing.assert_array_equal(bitboard.visible, board.visible)
+    assert bitboard.game_won() == board.game_won()
+
+def test_bitboard_mine_hit_and_flags():
+    board = BitboardMinesweeperBoard(3, 3, 1)
+    board.first_move = False
+    board.board = np.array([
+        [-1, 1, 0],
+        [1, 1, 0],
+        [0, 0, 0]
+    ])
+    board.toggle_flag(0, 0)
+    assert board.flags[0, 0]
+    assert board.reveal_cell(0, 0) is False
+
+    board.reveal_cell(2, 2)
+    assert board.game_won()
+    assert board.visible.sum() == 8
+
+    board.toggle_flag(0, 0)
+    assert board.reveal_cell(0, 0) is True
+    assert not board.game_active
+
+def test_solver_writes_through_to_bitboard():
+    board = BitboardMinesweeperBoard(9, 9, 10, seed=0)
+    solver = ProbabilisticSolver(board)
+    while board.game_active and not board.game_won():
+        x, y = solver.next_move()
+        board.reveal_cell(x, y)
+    # Flags placed by the solver are part of the bitboard state
+    assert board._bits['flags'] == board._encode(board.flags)
+
+def test_bitboard_arrays_are_patched_in_place():
+    board = BitboardMinesweeperBoard(16, 16, 40, seed=1)
+    visible, flags = board.visible, board.flags
+    board.reveal_cell(8, 8)
+    x, y = board.get_random_safe_cell()
+    board.toggle_flag(x, y)
+    board.flag_cells([0])
+
+    assert board.visible is visible and board.flags is flags
+    np.testing.assert_array_equal(visible, board._decode(board._bits['visible']))
+    np.testing.assert_array_equal(flags, board._decode(board._bits['flags']))
+
+@pytest.mark.parametrize("board_class", [MinesweeperBoard, BitboardMinesweeperBoard])
+def test_in_place_writes_reach_the_board(board_class):
+    board = board_class(3, 3, 1)
+    board.first_move = False
+    board.board = np.zeros((3, 3), dtype=int)
+    board.board[0, 0] = -1
+    board.board[0:2, 0:2] += np.array([[0, 1], [1, 1]])
+    board.reveal_cell(2, 2)
+    assert board.visible.sum() == 8 and board.game_won()
+
+    board = board_class(9, 9, 10, seed=0)
+    board.reveal_cell(4, 4)
+    x, y = board.get_random_safe_cell()
+    board.flags[y, x] = True
+    assert board.reveal_cell(x, y) is False and not board.visible[y, x]
+
+    # An assigned array stays the board's, so later writes to it count too
+    flags = np.zeros((9, 9), dtype=bool)
+    board.flags = flags
+    x, y = board.get_random_safe_cell()
+    flags[y, x] = True
+    assert board.reveal_cell(x, y) is False and not board.visible[y, x]
+
+class Reader:
+    pass
+
+@pytest.mark.parametrize("board_class", [MinesweeperBoard, BitboardMinesweeperBoard])
+def test_change_log_records_each_changed_cell(board_class):
+    board = board_class(16, 16, 40, seed=3)
+    reader = Reader()
+    start = board.change_log.register(reader)
+    board.reveal_cell(8, 8)
+    assert sorted(board.change_log.entries_since(start)[0].tolist()) == np.flatnonzero(board.visible).tolist()
+
+    # Opened regions may also list cells an earlier reveal already opened
+    visible = board.visible.copy()
+    moves = [board.get_random_safe_cell() for _ in range(4)]
+    board.reveal_cells(moves)
+    logged = set(board.change_log.entries_since(start)[1].tolist())
+    assert set(np.flatnonzero(board.visible & ~visible).tolist()) <= logged
+    assert logged <= set(np.flatnonzero(board.visible).tolist())
+
+    hidden = np.flatnonzero(~board.visible)[0]
+    board.toggle_flag(hidden % 16, hidden // 16)
+    assert board.change_log.entries_since(start)[2].tolist() == [hidden]
+    assert len(board.change_log) == start + 3
+
+@pytest.mark.parametrize("board_class", [MinesweeperBoard, BitboardMinesweeperBoard])
+def test_change_log_drops_consumed_entries(board_class):
+    board = board_class(16, 16, 40, seed=3)
+    log = board.change_log
+    board.reveal_cell(8, 8)
+    # Nothing is kept while no reader is registered
+    assert log.entries_since(len(log)) == []
+
+    first, second = Reader(), Reader()
+    start = log.register(first)
+    log.register(second)
+    for _ in range(3):
+        board.reveal_cell(*board.get_random_safe_cell())
+    log.consumed(first, start + 3)
+    assert len(log.entries_since(start)) == 3
+    log.consumed(second, start + 2)
+    assert len(log.entries_since(start + 2)) == 1
+    with pytest.raises(ValueError):
+        log.entries_since(start)
+
+    del second
+    board.reveal_cell(*board.get_random_safe_cell())
+    log.consumed(first, len(log))
+    assert log.entries_since(len(log)) == []
+
+@pytest.mark.parametrize("board_class", [MinesweeperBoard, BitboardMinesweeperBoard])
+@pytest.mark.parametrize("name", ["board", "visible", "flags"])
+def test_assigning_an_array_invalidates_the_change_log(board_class, name):
+    board = board_class(16, 16, 40, seed=3)
+    board.reveal_cell(8, 8)
+    epoch = board.change_log.epoch
+    setattr(board, name, getattr(board, name).copy())
+    assert board.change_log.epoch > epoch
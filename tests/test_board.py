@@ -1,6 +1,7 @@
 import pytest
 import numpy as np
 from game.board import MinesweeperBoard
+from game.grid import clue_counts
 
 @pytest.fixture
 def test_board():
@@ -33,4 +34,69 @@ def test_flood_fill_reveal(test_board):
 def test_win_condition(test_board):
     test_board.flags = test_board.board == -1
     test_board.visible = ~test_board.flags
-    assert test_board.game_won() == True
\ No newline at end of file
+    assert test_board.game_won() == True
+
+def test_seeded_mine_placement_is_reproducible():
+    first = MinesweeperBoard(16, 16, 40, seed=7)
+    second = MinesweeperBoard(16, 16, 40, seed=7)
+    first.reveal_cell(3, 3)
+    second.reveal_cell(3, 3)
+    assert np.array_equal(first.board, second.board)
+    assert np.sum(first.board == -1) == 40
+    assert first.board[3, 3] != -1
+
+def test_safe_zone_opens_a_zero():
+    for seed in range(20):
+        board = MinesweeperBoard(9, 9, 10, seed=seed, safe_zone=True)
+        board.reveal_cell(0, 4)
+        assert board.board[4, 0] == 0
+        assert np.sum(board.board == -1) == 10
+        assert np.sum(board.visible) > 1
+
+def test_clues_count_adjacent_mines():
+    board = MinesweeperBoard(30, 16, 99, seed=1)
+    board.reveal_cell(0, 0)
+    np.testing.assert_array_equal(board.board, clue_counts(board.board == -1))
+
+def flood_fill_reference(board, x, y):
+    # Cell-by-cell cascade the region labels must reproduce
+    visible = board.visible.copy()
+    stack = [(x, y)]
+    while stack:
+        x, y = stack.pop()
+        if not visible[y, x]:
+            visible[y, x] = True
+            if board.board[y, x] == 0:
+                for dy in [-1, 0, 1]:
+                    for dx in [-1, 0, 1]:
+                        nx, ny = x + dx, y + dy
+                        if 0 <= nx < board.width and 0 <= ny < board.height and board.board[ny, nx] != -1:
+                            stack.append((nx, ny))
+    return visible
+
+def test_region_reveal_matches_flood_fill():
+    for seed in range(10):
+        board = MinesweeperBoard(40, 30, 120, seed=seed)
+        board.reveal_cell(20, 15)
+        rng = np.random.default_rng(seed)
+        for _ in range(15):
+            safe = np.argwhere((board.board != -1) & ~board.visible)
+            if len(safe) == 0:
+                break
+            y, x = safe[rng.integers(len(safe))]
+            expected = flood_fill_reference(board, x, y)
+            board.reveal_cell(x, y)
+            assert np.array_equal(board.visible, expected)
+
+def test_new_layout_is_labelled_again():
+    # Zero regions labelled for the first layout must not leak into the second
+    board = MinesweeperBoard(16, 16, 40, seed=0)
+    board.reveal_cell(8, 8)
+    other = MinesweeperBoard(16, 16, 40, seed=1)
+    other.place_mines(0, 0)
+    board.board = other.board.copy()
+    board.visible = np.zeros((16, 16), dtype=bool)
+    y, x = np.argwhere(board.board == 0)[0]
+    expected = flood_fill_reference(board, x, y)
+    board.reveal_cell(x, y)
+    assert np.array_equal(board.visible, expected)
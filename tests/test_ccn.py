@@ -12,23 +12,46 @@ def test_cnn_preprocessing():
     ])
     board.visible[0,1] = True  # Reveal a cell
     board.flags[0,0] = True    # Flag a mine
-    
-    solver = CNNSolver("dummy_path")
-    processed = solver.preprocess_board(board)
-    
+
+    solver = CNNSolver("beginner")
+    processed = solver._encode([board])
+
     # Test visible channel
     assert processed[0,:,:,0].tolist() == [
         [0, 1, 0],
         [0, 0, 0],
         [0, 0, 0]
     ]
-    
+
     # Test flags channel
     assert processed[0,:,:,1].tolist() == [
         [1, 0, 0],
         [0, 0, 0],
         [0, 0, 0]
     ]
-    
-    # Test numbers channel
-    assert processed[0,0,1,2] == 1.0/8  # Normalized number
\ No newline at end of file
+
+    # Test numbers channel: one-hot clue value in channels 2-10, none for the mine
+    assert processed[0,0,1,2 + 1] == 1.0
+    assert processed[0,0,1].sum() == 2.0
+    assert processed[0,2,2,2] == 1.0
+    assert processed[0,0,0,2:].sum() == 0.0
+
+@pytest.mark.parametrize("inference", ["compiled", "direct", "predict"])
+@pytest.mark.parametrize("difficulty, width, height, num_mines", [("beginner", 9, 9, 10), ("expert", 30, 16, 99)])
+def test_inference_modes_agree(inference, difficulty, width, height, num_mines):
+    reference = CNNSolver(difficulty, inference="compiled")
+    solver = CNNSolver(difficulty, inference=inference)
+    for seed in range(3):
+        board = MinesweeperBoard(width, height, num_mines, seed=seed)
+        board.reveal_cell(width // 2, height // 2)
+        for _ in range(3):
+            board.reveal_cell(*board.get_random_safe_cell())
+
+        inputs = reference._encode([board]).copy()
+        expected = reference._predict_single(inputs)
+        np.testing.assert_allclose(solver._predict_single(inputs), expected, atol=1e-5)
+        # Near-ties may break either way, but the move must be one of the best cells
+        x, y, _ = solver.get_move(board)
+        hidden = ~board.visible & ~board.flags
+        assert hidden[y, x]
+        assert expected[0, y, x, 0] <= expected[0, :, :, 0][hidden].min() + 1e-5
@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+from utils.corpus import PositionCorpus, record_corpus, replay, summarise
+
+def test_corpus_round_trip(tmp_path):
+    corpus = record_corpus("probabilistic", 9, 9, 10, games=6, seed=1, min_move=3)
+    assert len(corpus) > 0
+    assert corpus.moves.min() >= 3
+
+    path = tmp_path / "corpus.npz"
+    corpus.save(path)
+    loaded = PositionCorpus.load(path)
+    assert np.array_equal(loaded.records, corpus.records)
+    assert np.array_equal(loaded.moves, corpus.moves)
+    assert np.array_equal(loaded.games, corpus.games)
+
+    for original, board in zip(corpus.boards(), loaded.boards()):
+        assert np.array_equal(original.board, board.board)
+        assert np.array_equal(original.visible, board.visible)
+        assert not board.first_move
+
+@pytest.mark.parametrize("solver_type", ["probabilistic", "exact"])
+def test_replay_is_reproducible(solver_type):
+    corpus = record_corpus("probabilistic", 9, 9, 10, games=6, seed=2)
+    decisions, timings = replay(corpus, solver_type)
+    again, _ = replay(corpus, solver_type)
+    assert np.array_equal(decisions, again)
+
+    # Every decision reveals a hidden, unflagged cell of its position
+    for board, (x, y) in zip(corpus.boards(), decisions):
+        assert not board.visible[y, x] and not board.flags[y, x]
+
+    summary = summarise(corpus, decisions, timings, reference=again)
+    assert summary['positions'] == len(corpus)
+    assert summary['agreement'] == 1.0
+    assert 0.0 <= summary['safe_rate'] <= 1.0
+
+def test_empty_corpus(tmp_path):
+    # Recording from move 1000 on keeps no positions at all
+    corpus = record_corpus("probabilistic", 9, 9, 10, games=2, seed=3, min_move=1000)
+    assert len(corpus) == 0
+    assert corpus.records.shape == (0,)
+
+    path = tmp_path / "corpus.npz"
+    corpus.save(path)
+    loaded = PositionCorpus.load(path)
+    assert len(loaded) == 0 and loaded.boards() == []
+
+    decisions, timings = replay(loaded, "probabilistic")
+    summary = summarise(loaded, decisions, timings)
+    assert summary['positions'] == 0
+    assert summary['decisions_per_sec'] == 0
+    assert np.isnan(summary['safe_rate'])
+
+def test_summarise_rejects_non_reveals():
+    corpus = record_corpus("probabilistic", 9, 9, 10, games=2, seed=4, min_move=1)
+    decisions, timings = replay(corpus, "probabilistic")
+    y, x = np.argwhere(corpus.boards()[0].visible)[0]
+    decisions[0] = (x, y)
+    with pytest.raises(ValueError):
+        summarise(corpus, decisions, timings)
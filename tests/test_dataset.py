@@ -0,0 +1,22 @@
+import numpy as np
+from utils.dataset import make_streaming_dataset
+from utils.encoding import NUM_CHANNELS
+
+def take_batches(seed, count=3, num_workers=1):
+    dataset = make_streaming_dataset(9, 9, 10, batch_size=8, num_workers=num_workers, seed=seed)
+    return [(inputs.numpy(), targets.numpy()) for inputs, targets in dataset.take(count)]
+
+def test_streaming_batches_match_the_signature():
+    for inputs, targets in take_batches(0):
+        assert inputs.shape == (8, 9, 9, NUM_CHANNELS) and inputs.dtype == np.float32
+        assert targets.shape == (8, 9, 9, 1) and targets.dtype == np.float32
+        # Every board holds its mines
+        assert (targets.sum(axis=(1, 2, 3)) == 10).all()
+
+def test_seeded_streams_reproduce():
+    # Whatever the number of worker processes
+    first, again, other = take_batches(1), take_batches(1, num_workers=2), take_batches(2)
+    for (inputs, targets), (same_inputs, same_targets) in zip(first, again):
+        np.testing.assert_array_equal(inputs, same_inputs)
+        np.testing.assert_array_equal(targets, same_targets)
+    assert not np.array_equal(first[0][1], other[0][1])
@@ -0,0 +1,95 @@
+import pytest
+import numpy as np
+from game.board import MinesweeperBoard
+from solvers.cnn import CNNSolver
+from utils.encoding import NUM_CHANNELS, PADDED_CHANNELS, encode_board, encode_boards, encode_boards_padded, pad_inputs, padded_shape
+from utils.dataset import create_input_array
+
+def reference_encoding(board):
+    # The original per-value loop
+    inputs = np.zeros((board.height, board.width, NUM_CHANNELS), dtype=np.float32)
+    inputs[:, :, 0] = board.visible
+    inputs[:, :, 1] = board.flags
+    for i in range(9):
+        inputs[:, :, i + 2] = board.board == i
+    return inputs
+
+def midgame_board(seed, width=16, height=16, num_mines=40):
+    board = MinesweeperBoard(width, height, num_mines, seed=seed)
+    board.reveal_cell(width // 2, height // 2)
+    rng = np.random.default_rng(seed)
+    board.flags[(board.board == -1) & (rng.random((height, width)) < 0.5)] = True
+    return board
+
+def test_encoding_matches_reference():
+    for seed in range(5):
+        board = midgame_board(seed)
+        assert np.array_equal(encode_board(board), reference_encoding(board))
+        assert np.array_equal(create_input_array(board), reference_encoding(board))
+
+def test_batch_encoding_matches_single():
+    boards = [midgame_board(seed) for seed in range(4)]
+    batch = encode_boards(boards)
+    assert batch.shape == (4, 16, 16, NUM_CHANNELS)
+    for encoded, board in zip(batch, boards):
+        assert np.array_equal(encoded, encode_board(board))
+
+def test_encoding_reuses_buffer():
+    boards = [midgame_board(seed) for seed in range(3)]
+    buffer = np.full((8, 16, 16, NUM_CHANNELS), 7.0, dtype=np.float32)
+    encoded = encode_boards(boards, out=buffer)
+    assert encoded.shape == (3, 16, 16, NUM_CHANNELS)
+    assert np.shares_memory(encoded, buffer)
+    for encoded_board, board in zip(encoded, boards):
+        assert np.array_equal(encoded_board, reference_encoding(board))
+
+    single = encode_board(boards[0], out=buffer[5])
+    assert np.shares_memory(single, buffer)
+    assert np.array_equal(single, reference_encoding(boards[0]))
+
+def test_encoding_rejects_wrong_buffer():
+    board = midgame_board(0)
+    with pytest.raises(ValueError):
+        encode_board(board, out=np.zeros((9, 9, NUM_CHANNELS), dtype=np.float32))
+
+def test_solver_uses_shared_encoding():
+    solver = CNNSolver('beginner')
+    boards = [midgame_board(seed, 9, 9, 10) for seed in range(3)]
+    moves = solver.get_moves(boards)
+    for board, move in zip(boards, moves):
+        assert solver.get_move(board)[:2] == move[:2]
+    # Single moves reuse the first row of the batch buffer
+    assert np.array_equal(solver._buffers[(9, 9)][0], encode_board(boards[-1]))
+
+def test_padded_encoding_matches_unpadded():
+    boards = [midgame_board(0, 9, 9, 10), midgame_board(1, 30, 16, 99), midgame_board(2, 12, 20, 40)]
+    batch = encode_boards_padded(boards)
+    assert batch.shape == (3, 24, 32, PADDED_CHANNELS)
+    for encoded, board in zip(batch, boards):
+        assert np.array_equal(encoded[:board.height, :board.width, :NUM_CHANNELS], encode_board(board))
+        assert encoded[:board.height, :board.width, NUM_CHANNELS].all()
+        assert not encoded[board.height:].any() and not encoded[:, board.width:].any()
+    assert np.array_equal(pad_inputs(encode_boards(boards[:1]), padded_shape(9, 9)), encode_boards_padded(boards[:1]))
+
+def test_universal_solver_handles_mixed_sizes():
+    solver = CNNSolver('universal')
+    assert solver.variable_size
+    boards = [midgame_board(0, 9, 9, 10), midgame_board(1, 30, 16, 99), midgame_board(2, 12, 20, 40)]
+    moves = solver.get_moves(boards)
+    for board, (x, y, _) in zip(boards, moves):
+        assert 0 <= x < board.width and 0 <= y < board.height
+        assert not board.visible[y, x] and not board.flags[y, x]
+        assert solver.get_move(board)[:2] == (x, y)
+
+@pytest.mark.parametrize("width, height, num_mines", [(9, 9, 10), (16, 16, 40), (30, 16, 99), (12, 20, 40)])
+def test_universal_moves_do_not_depend_on_padding(width, height, num_mines):
+    # Bucket 1 is the board on its own; the in-board channel makes every larger canvas score it the same
+    solver = CNNSolver('universal')
+    for seed in range(3):
+        board = midgame_board(seed, width, height, num_mines)
+        unpadded = solver._predict_batch(encode_boards_padded([board], bucket=1))[0, ..., 0]
+        expected = solver._choose_move(board, unpadded)[:2]
+        for bucket in (8, 16, 32, 64):
+            padded = solver._predict_batch(encode_boards_padded([board], bucket=bucket))[0, :height, :width, 0]
+            np.testing.assert_allclose(padded, unpadded, atol=1e-5)
+            assert solver._choose_move(board, padded)[:2] == expected
@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+from eval import run_headless_simulation, run_batched_simulation
+from utils.dataset import create_random_field
+
+def play(run, *args, **kwargs):
+    # Each game's own record, in game order, and the aggregator the run returned
+    games = {}
+    num_mines = args[3]
+    def record(game_index, metrics):
+        games[game_index] = (metrics.wins, metrics.losses, metrics.total_moves, dict(metrics.mine_predictions))
+        # Mine locations are taken once the first reveal has placed the mines
+        assert len(metrics.actual_mines) == num_mines
+    aggregator = run(*args, on_game=record, **kwargs)
+    return [games[i] for i in sorted(games)], aggregator
+
+def test_seeded_games_do_not_depend_on_batching():
+    seeds = np.random.SeedSequence(7).spawn(12)
+    for solver_type in ("probabilistic", "exact"):
+        headless, _ = play(run_headless_simulation, solver_type, 16, 16, 40, 12, seeds=seeds)
+        batched, aggregator = play(run_batched_simulation, solver_type, 16, 16, 40, 12, batch_size=5, seeds=seeds)
+        # Running the second half on its own replays the same games
+        second_half, _ = play(run_batched_simulation, solver_type, 16, 16, 40, 6, batch_size=3, seeds=seeds[6:])
+        assert headless == batched
+        assert batched[6:] == second_half
+        assert aggregator.games == 12
+        assert aggregator.wins + aggregator.losses == 12
+        assert aggregator.moves.mean == pytest.approx(np.mean([moves for _, _, moves, _ in batched]))
+
+def test_random_fields_are_seeded():
+    first = create_random_field(16, 16, 40, rng=3)
+    second = create_random_field(16, 16, 40, rng=3)
+    assert np.array_equal(first.board, second.board)
+    assert np.array_equal(first.visible, second.visible)
+
+@pytest.mark.parametrize("solver_type", ["cnn", "hybrid"])
+def test_lockstep_cnn_games_match_sequential_play(solver_type):
+    # One shared forward pass per step must not change any game's moves or outcome
+    seeds = np.random.SeedSequence(11).spawn(10)
+    sequential, _ = play(run_headless_simulation, solver_type, 9, 9, 10, 10, "beginner", seeds=seeds)
+    for batch_size in (1, 4, 10):
+        batched, _ = play(run_batched_simulation, solver_type, 9, 9, 10, 10, "beginner", batch_size, seeds=seeds)
+        for (wins, losses, moves, predictions), expected in zip(batched, sequential):
+            assert (wins, losses, moves) == expected[:3]
+            assert predictions.keys() == expected[3].keys()
+            for cell, values in predictions.items():
+                assert values == pytest.approx(expected[3][cell], abs=1e-4)
@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+from itertools import combinations
+from game.board import MinesweeperBoard
+from game.grid import neighbour_sum
+from solvers.exact import ExactSolver
+
+def test_exact_probabilities(one_two_one_board):
+    solver = ExactSolver(one_two_one_board)
+    assert solver.probabilities[1].tolist() == [1.0, 0.0, 1.0]
+    assert one_two_one_board.probabilities[1].tolist() == [1.0, 0.0, 1.0]
+
+def test_exact_move_flags_mines_and_reveals_safe_cell(one_two_one_board):
+    solver = ExactSolver(one_two_one_board)
+    assert solver.next_move() == (1, 1)
+    assert one_two_one_board.flags[1].tolist() == [True, False, True]
+
+def test_interior_uses_global_mine_count():
+    board = MinesweeperBoard(width=4, height=1, num_mines=1)
+    board.first_move = False
+    board.board = np.array([[0, 1, -1, 1]])
+    board.visible[0, :2] = True
+    solver = ExactSolver(board)
+    # The 1 forces the mine into x=2, leaving the unconstrained x=3 safe
+    assert solver.probabilities[0, 2] == 1.0
+    assert solver.probabilities[0, 3] == 0.0
+
+def test_unchanged_components_hit_the_cache(one_two_one_board):
+    solver = ExactSolver(one_two_one_board)
+    solver.update_probabilities()
+    assert solver.cache_misses == 1
+    assert solver.cache_hits == 1
+
+def test_capped_component_falls_back_to_estimates(one_two_one_board):
+    # Too small a search budget for any component: propagation still settles the 1-2-1
+    solver = ExactSolver(one_two_one_board, max_search_steps=1)
+    assert solver.estimated_components == 1
+    assert solver.probabilities[1].tolist() == [1.0, 0.0, 1.0]
+    assert solver.next_move() == (1, 1)
+
+def test_capped_search_still_plays_legal_moves():
+    board = MinesweeperBoard(30, 16, 99, seed=2, safe_zone=True)
+    board.reveal_cell(15, 8)
+    solver = ExactSolver(board, rng=2, max_search_steps=5)
+    for _ in range(10):
+        if not board.game_active or board.game_won():
+            break
+        reveals, flags = solver.next_moves()
+        assert all(not board.visible[y, x] and not board.flags[y, x] for x, y in reveals)
+        assert all(0.0 <= p <= 1.0 for p in solver.probabilities[solver.hidden])
+        board.reveal_cells(reveals)
+    assert solver.estimated_components > 0
+
+def enumerated_probabilities(board):
+    # Mine probability of every hidden cell over all layouts of the remaining mines
+    # that agree with every revealed clue, flags counting as mines
+    hidden = np.flatnonzero(~board.visible & ~board.flags)
+    remaining = board.num_mines - int(board.flags.sum())
+    layouts = np.array(list(combinations(hidden, remaining)), dtype=np.intp).reshape(-1, remaining)
+    mines = np.zeros((len(layouts), board.height * board.width), dtype=bool)
+    mines[np.arange(len(layouts))[:, np.newaxis], layouts] = True
+    mines |= board.flags.ravel()
+    counts = neighbour_sum(mines.reshape(-1, board.height, board.width))
+    consistent = (counts[:, board.visible] == board.board[board.visible]).all(axis=1)
+    probabilities = mines[consistent].mean(axis=0).reshape(board.height, board.width)
+    return np.where(~board.visible & ~board.flags, probabilities, 0.0)
+
+@pytest.mark.parametrize("seed", range(30))
+def test_exact_probabilities_match_enumeration(seed):
+    rng = np.random.default_rng(seed)
+    board = MinesweeperBoard(5, 4, 5, seed=seed)
+    board.reveal_cell(*rng.integers((5, 4)))
+    for _ in range(rng.integers(3)):
+        if board.game_won():
+            break
+        board.reveal_cell(*board.get_random_safe_cell())
+    mines = np.flatnonzero((board.board == -1).ravel())
+    if rng.random() < 0.5:
+        board.flag_cells(mines[:1])
+
+    solver = ExactSolver(board)
+    assert solver.estimated_components == 0
+    np.testing.assert_allclose(solver.probabilities, enumerated_probabilities(board))
@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+from game.board import MinesweeperBoard
+from game.bitboard import BitboardMinesweeperBoard
+from solvers.hybrid import HybridSolver
+
+def test_subset_rule_forces_moves(one_two_one_board):
+    solver = HybridSolver(one_two_one_board)
+    assert solver.next_moves() == [(1, 1, 1.0)]
+    assert one_two_one_board.flags[1].tolist() == [True, False, True]
+    assert solver.model_calls == 0
+
+@pytest.mark.parametrize("board_class", [MinesweeperBoard, BitboardMinesweeperBoard])
+def test_forced_moves_are_never_mines(board_class):
+    for seed in range(5):
+        board = board_class(16, 16, 40, seed=seed)
+        solver = HybridSolver(board, 'intermediate')
+        while board.game_active and not board.game_won():
+            guessed = solver.model_calls
+            moves = solver.next_moves()
+            if solver.model_calls == guessed and not board.first_move:
+                assert all(board.board[y, x] != -1 for x, y, _ in moves)
+                assert not (board.flags & (board.board != -1)).any()
+            board.reveal_cells([(x, y) for x, y, _ in moves])
+        assert solver.forced_moves_played > solver.model_calls
+
+@pytest.mark.parametrize("board_class", [MinesweeperBoard, BitboardMinesweeperBoard])
+def test_reveal_cells_matches_single_reveals(board_class):
+    for seed in range(5):
+        board = board_class(30, 16, 99, seed=seed)
+        reference = MinesweeperBoard(30, 16, 99, seed=seed)
+        board.reveal_cells([(15, 8)])
+        reference.reveal_cell(15, 8)
+        safe = np.argwhere((reference.board != -1) & ~reference.visible)
+        cells = [(int(x), int(y)) for y, x in safe[np.random.default_rng(seed).permutation(len(safe))[:10]]]
+        assert board.reveal_cells(cells) is False
+        for x, y in cells:
+            reference.reveal_cell(x, y)
+        np.testing.assert_array_equal(board.visible, reference.visible)
+
+        mine_y, mine_x = np.argwhere(reference.board == -1)[0]
+        assert board.reveal_cells([(int(mine_x), int(mine_y))]) is True
+        assert not board.game_active
+
+@pytest.mark.parametrize("board_class", [MinesweeperBoard, BitboardMinesweeperBoard])
+def test_reveal_cells_accepts_an_array(board_class):
+    board = board_class(30, 16, 99, seed=0)
+    reference = MinesweeperBoard(30, 16, 99, seed=0)
+    board.reveal_cells(np.array([[15, 8]]))
+    reference.reveal_cell(15, 8)
+    cells = np.argwhere((reference.board != -1) & ~reference.visible)[:10, ::-1]
+    assert board.reveal_cells(cells) is False
+    assert board.reveal_cells(np.empty((0, 2), dtype=int)) is False
+    for x, y in cells:
+        reference.reveal_cell(x, y)
+    np.testing.assert_array_equal(board.visible, reference.visible)
@@ -1,7 +1,10 @@
+import copy
 import pytest
 import numpy as np
 from game.board import MinesweeperBoard
+from game.grid import clue_counts
 from solvers.probabilistic import ProbabilisticSolver
+from solvers.exact import ExactSolver
 
 @pytest.fixture
 def test_solver_board():
@@ -65,4 +68,117 @@ def test_probabilistic_tie_breaking(test_solver_board, monkeypatch):
     ])
     
     move = solver.next_move()
-    assert move in [(0,0), (0,1), (1,0)]
\ No newline at end of file
+    assert move in [(0,0), (0,1), (1,0)]
+
+def random_midgame_board(seed, width=16, height=16, num_mines=40):
+    rng = np.random.default_rng(seed)
+    board = MinesweeperBoard(width, height, num_mines)
+    board.first_move = False
+    mines = np.zeros(width * height, dtype=bool)
+    mines[rng.choice(width * height, num_mines, replace=False)] = True
+    board.board = clue_counts(mines.reshape(height, width))
+    for _ in range(rng.integers(1, 6)):
+        safe = np.argwhere((board.board != -1) & ~board.visible)
+        if len(safe) == 0:
+            break
+        y, x = safe[rng.integers(len(safe))]
+        board.reveal_cell(x, y)
+    hidden = np.argwhere(~board.visible)
+    for y, x in hidden[rng.choice(len(hidden), min(3, len(hidden)), replace=False)]:
+        board.flags[y, x] = True
+    return board
+
+@pytest.mark.parametrize("seed", range(20))
+def test_numpy_backend_matches_python(seed):
+    python_board = random_midgame_board(seed)
+    numpy_board = random_midgame_board(seed)
+
+    python_solver = ProbabilisticSolver(python_board, backend='python')
+    numpy_solver = ProbabilisticSolver(numpy_board, backend='numpy')
+
+    np.testing.assert_array_equal(numpy_solver.probabilities, python_solver.probabilities)
+    np.testing.assert_array_equal(numpy_board.flags, python_board.flags)
+    np.testing.assert_array_equal(numpy_solver.hidden, python_solver.hidden)
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_updates_match_full_recompute(seed):
+    incremental_board = random_midgame_board(seed, 30, 16, 99)
+    full_board = random_midgame_board(seed, 30, 16, 99)
+    incremental_solver = ProbabilisticSolver(incremental_board, incremental=True)
+    full_solver = ProbabilisticSolver(full_board, incremental=False)
+
+    while incremental_board.game_active and not incremental_board.game_won():
+        x, y = incremental_solver.next_move()
+        full_board.flags[:] = incremental_board.flags
+        incremental_board.reveal_cell(x, y)
+        full_board.reveal_cell(x, y)
+
+        incremental_solver.update_probabilities()
+        full_solver.update_probabilities()
+        np.testing.assert_array_equal(incremental_solver.probabilities, full_solver.probabilities)
+        np.testing.assert_array_equal(incremental_board.flags, full_board.flags)
+        np.testing.assert_array_equal(incremental_solver.hidden, full_solver.hidden)
+
+@pytest.mark.parametrize("solver_class", [ProbabilisticSolver, ExactSolver])
+def test_next_moves_returns_every_certain_move(solver_class):
+    found = 0
+    for seed in range(5):
+        board = MinesweeperBoard(30, 16, 99, seed=seed, safe_zone=True)
+        board.reveal_cell(15, 8)
+        solver = solver_class(board, rng=seed)
+        reveals, flags = solver.next_moves()
+        if len(reveals) > 1:
+            assert all(board.board[y, x] != -1 for x, y in reveals)
+            found += len(reveals)
+        assert all(board.board[y, x] == -1 and board.flags[y, x] for x, y in flags)
+    assert found > 5
+
+def test_incremental_solver_follows_toggled_flags():
+    incremental_board = random_midgame_board(4, 30, 16, 99)
+    full_board = random_midgame_board(4, 30, 16, 99)
+    incremental_solver = ProbabilisticSolver(incremental_board, incremental=True)
+    full_solver = ProbabilisticSolver(full_board, incremental=False)
+
+    flagged = np.argwhere(incremental_board.flags)[:2]
+    hidden = np.argwhere(~incremental_board.visible & ~incremental_board.flags)[:2]
+    for board in (incremental_board, full_board):
+        for y, x in [*flagged, *hidden]:
+            board.toggle_flag(x, y)
+
+    incremental_solver.update_probabilities()
+    full_solver.update_probabilities()
+    np.testing.assert_array_equal(incremental_solver.probabilities, full_solver.probabilities)
+    np.testing.assert_array_equal(incremental_board.flags, full_board.flags)
+
+@pytest.mark.parametrize("seed", [157, 239, 243, 262])
+def test_incremental_next_moves_match_full_recompute(seed):
+    # Seeds where the last mines are flagged during a call, leaving the whole interior safe
+    board = MinesweeperBoard(16, 16, 40, seed=seed)
+    solver = ProbabilisticSolver(board, incremental=True, rng=0)
+    while board.game_active and not board.game_won():
+        full_board = copy.deepcopy(board)
+        full_reveals, _ = ProbabilisticSolver(full_board, incremental=False, rng=0).next_moves()
+        reveals, _ = solver.next_moves()
+        np.testing.assert_array_equal(board.flags, full_board.flags)
+        if full_board.probabilities[full_reveals[0][1], full_reveals[0][0]] == 0.0:
+            assert set(reveals) == set(full_reveals)
+        board.reveal_cells(reveals)
+
+def test_incremental_solver_follows_assigned_arrays():
+    incremental_board = random_midgame_board(5, 30, 16, 99)
+    full_board = random_midgame_board(5, 30, 16, 99)
+    incremental_solver = ProbabilisticSolver(incremental_board, incremental=True)
+    full_solver = ProbabilisticSolver(full_board, incremental=False)
+
+    # Assigning whole arrays is not logged cell by cell, so the solver has to rebuild
+    safe = np.argwhere(~full_board.visible & (full_board.board != -1))[:3]
+    for board in (incremental_board, full_board):
+        visible = board.visible.copy()
+        visible[tuple(safe.T)] = True
+        board.visible = visible
+        board.flags = np.zeros_like(board.flags)
+
+    incremental_solver.update_probabilities()
+    full_solver.update_probabilities()
+    np.testing.assert_array_equal(incremental_solver.probabilities, full_solver.probabilities)
+    np.testing.assert_array_equal(incremental_board.flags, full_board.flags)
@@ -0,0 +1,54 @@
+import json
+import pytest
+import profiling
+from game.board import MinesweeperBoard
+from solvers.probabilistic import ProbabilisticSolver
+
+@pytest.fixture(autouse=True)
+def clean_profiler():
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+def play(seed=0):
+    board = MinesweeperBoard(16, 16, 40, seed=seed)
+    board.reveal_cell(8, 8)
+    solver = ProbabilisticSolver(board, rng=seed)
+    while board.game_active and not board.game_won():
+        x, y = solver.next_move()
+        board.reveal_cell(x, y)
+        solver.update_probabilities()
+
+def test_disabled_records_nothing():
+    play()
+    assert profiling.report() == {}
+
+def test_spans_recorded_when_enabled(tmp_path):
+    profiling.enable(trace=True)
+    play()
+    report = profiling.report()
+    for name in ("board.reveal_cell", "probabilistic.update_probabilities", "probabilistic.estimate"):
+        assert report[name]['count'] > 0
+        assert report[name]['p50_us'] <= report[name]['p95_us'] <= report[name]['p99_us'] <= report[name]['max_us']
+
+    profiling.save_json(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text()).keys() == report.keys()
+    profiling.save_chrome_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())['traceEvents']
+    assert sum(event['name'] == "board.reveal_cell" for event in events) == report["board.reveal_cell"]['count']
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+
+def test_histogram_percentiles():
+    stats = profiling.SpanStats()
+    for ns in range(1, 10001):
+        stats.add(ns * 1000)
+    # Buckets are at most 1/8 of their value wide
+    for q in (50, 95, 99):
+        assert stats.percentile(q) == pytest.approx(q * 100 * 1000, rel=0.07)
+    assert stats.percentile(100) <= stats.max_ns
+
+def test_bucket_bounds_contain_value():
+    for ns in list(range(100)) + [10 ** k + 7 for k in range(2, 12)]:
+        low, high = profiling._bucket_bounds(profiling._bucket(ns))
+        assert low <= ns < high
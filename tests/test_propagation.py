@@ -0,0 +1,56 @@
+import copy
+import numpy as np
+from game.board import MinesweeperBoard
+from solvers.propagation import ConstraintPropagator
+from solvers.probabilistic import ProbabilisticSolver
+
+def test_subset_reduction_resolves_one_two_one(one_two_one_board):
+    safe, mines = ConstraintPropagator(one_two_one_board).propagate()
+    assert safe[1].tolist() == [False, True, False]
+    assert mines[1].tolist() == [True, False, True]
+
+def test_propagation_is_sound_on_random_boards():
+    for seed in range(20):
+        board = MinesweeperBoard(30, 16, 99, seed=seed)
+        board.reveal_cell(15, 8)
+        safe, mines = ConstraintPropagator(board).propagate()
+        assert not (safe & (board.board == -1)).any()
+        assert not (mines & (board.board != -1)).any()
+        assert not ((safe | mines) & board.visible).any()
+
+def test_solver_uses_propagation(one_two_one_board):
+    untouched = copy.deepcopy(one_two_one_board)
+    solver = ProbabilisticSolver(one_two_one_board)
+    assert one_two_one_board.flags[1].tolist() == [True, False, True]
+    assert solver.next_move() == (1, 1)
+
+    plain = ProbabilisticSolver(untouched, propagation=False)
+    assert not plain.board.flags.any()
+
+def test_overlap_rule_settles_partly_shared_cells():
+    # The 3 and the 1 share two cells, which must hold exactly one mine between them
+    board = MinesweeperBoard(width=4, height=2, num_mines=3)
+    board.first_move = False
+    board.board = np.array([
+        [-1, 3, -1, 1],
+        [-1, 3, 1, 1]
+    ])
+    board.visible[1, 1:3] = True
+    safe, mines = ConstraintPropagator(board).propagate()
+    assert np.argwhere(safe).tolist() == [[0, 3], [1, 3]]
+    assert np.argwhere(mines).tolist() == [[0, 0], [1, 0]]
+
+def test_persistent_constraints_match_a_fresh_propagator():
+    for seed in range(10):
+        board = MinesweeperBoard(30, 16, 99, seed=seed, safe_zone=True)
+        board.reveal_cell(15, 8)
+        propagator = ConstraintPropagator(board)
+        while board.game_active and not board.game_won():
+            safe, mines = propagator.propagate()
+            fresh_safe, fresh_mines = ConstraintPropagator(board).propagate()
+            assert np.array_equal(safe, fresh_safe) and np.array_equal(mines, fresh_mines)
+            board.flag_cells(np.flatnonzero(mines))
+            if safe.any():
+                board.reveal_cells([(int(x), int(y)) for y, x in np.argwhere(safe)])
+            else:
+                board.reveal_cell(*board.get_random_safe_cell())
@@ -0,0 +1,44 @@
+import os
+import pytest
+import numpy as np
+from models.registry import get_model, get_tflite_model, resolve_model_path, resolve_tflite_path
+from solvers.cnn import CNNSolver
+from utils.batch_generation import generate_training_batch
+
+def test_models_are_loaded_once():
+    first = get_model('beginner')
+    second = get_model('Beginner', resolve_model_path('beginner'))
+    assert first is second
+    assert first.load_time > 0
+    assert first.warmup_time > 0
+
+def test_unknown_difficulty():
+    with pytest.raises(ValueError):
+        get_model('impossible')
+
+def test_tflite_models_are_loaded_once():
+    first = get_tflite_model('beginner', 'int8')
+    assert first is get_tflite_model('Beginner', 'int8', resolve_tflite_path('beginner', 'int8'))
+    assert first.input_shape == (9, 9, 11)
+    assert first.size_bytes < os.path.getsize(resolve_model_path('beginner'))
+
+def test_unknown_quantization():
+    with pytest.raises(ValueError):
+        get_tflite_model('beginner', 'int4')
+
+def test_tflite_solver_matches_keras():
+    inputs, _ = generate_training_batch(16, 9, 9, 10, rng=0)
+    keras_predictions = CNNSolver('beginner')._predict_batch(inputs)
+    tflite_solver = CNNSolver('beginner', inference='tflite', quantization='float32')
+    assert np.allclose(tflite_solver._predict_batch(inputs), keras_predictions, atol=1e-4)
+    assert np.allclose(tflite_solver._predict_single(inputs[:1]), keras_predictions[:1], atol=1e-4)
+
+def test_tflite_batches_share_padded_interpreters():
+    inputs, _ = generate_training_batch(13, 9, 9, 10, rng=1)
+    model = get_tflite_model('beginner', 'float32')
+    single = np.concatenate([model.infer_single(inputs[i:i + 1]) for i in range(len(inputs))])
+    for batch_size in (13, 3, 4, 5, 12, 1):
+        assert np.allclose(model.infer(inputs[:batch_size]), single[:batch_size], atol=1e-5)
+    # The model is shared process-wide, so other tests may have added capacities too
+    assert {1, 4, 8, 16} <= set(model._batches)
+    assert all(capacity & (capacity - 1) == 0 for capacity in model._batches)
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import pytest
+from game.board import MinesweeperBoard
+from solvers.cnn import CNNSolver
+from solvers.service import MoveService
+
+async def play_session(service, seed):
+    board = MinesweeperBoard(9, 9, 10, seed=seed)
+    moves = []
+    while board.game_active and not board.game_won() and len(moves) < 20:
+        x, y, _ = await service.get_move(board)
+        moves.append((x, y))
+        board.reveal_cell(x, y)
+    return moves
+
+def test_concurrent_sessions_get_their_own_moves():
+    solver = CNNSolver('beginner')
+
+    async def main():
+        async with MoveService(solver, max_batch_size=8, max_wait=0.01) as service:
+            played = await asyncio.gather(*(play_session(service, seed) for seed in range(12)))
+            return played, service.stats()
+
+    played, stats = asyncio.run(main())
+
+    # Replaying each game alone with direct calls makes the same moves
+    for seed, moves in enumerate(played):
+        board = MinesweeperBoard(9, 9, 10, seed=seed)
+        for x, y in moves:
+            assert solver.get_move(board)[:2] == (x, y)
+            board.reveal_cell(x, y)
+
+    assert stats['requests'] == sum(len(moves) for moves in played)
+    assert stats['batches'] < stats['requests']
+    assert stats['mean_batch_size'] <= 8
+    assert stats['p50_latency'] <= stats['p99_latency']
+
+def test_service_must_be_started():
+    service = MoveService(CNNSolver('beginner'))
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.get_move(MinesweeperBoard()))
+
+def test_solver_errors_reach_the_caller():
+    class FailingSolver:
+        def get_moves(self, boards):
+            raise ValueError("no model")
+
+    service = MoveService(FailingSolver(), max_wait=0)
+
+    async def main():
+        async with service:
+            await service.get_move(MinesweeperBoard())
+
+    with pytest.raises(ValueError, match="no model"):
+        asyncio.run(main())
+    # Failed batches still count as served, and their requests as errors
+    stats = service.stats()
+    assert (stats['requests'], stats['batches'], stats['errors']) == (1, 1, 1)
+
+def test_wait_counts_from_when_a_board_was_queued():
+    # A fake clock makes the test independent of real timing: the third board queues at
+    # t=0 while the first batch is held in the solver, and the clock has passed its
+    # deadline by the time that batch returns, so it must go out without another wait
+    now = [0.0]
+    released = threading.Event()
+
+    class HeldSolver:
+        def __init__(self):
+            self.calls = []
+
+        def get_moves(self, boards):
+            self.calls.append(len(boards))
+            if len(self.calls) == 1:
+                released.wait(timeout=5)
+            return [(0, 0, 0.0)] * len(boards)
+
+    solver = HeldSolver()
+
+    async def main():
+        async with MoveService(solver, max_batch_size=2, max_wait=60, clock=lambda: now[0]) as service:
+            full = [asyncio.create_task(service.get_move(MinesweeperBoard())) for _ in range(2)]
+            late = asyncio.create_task(service.get_move(MinesweeperBoard()))
+            await asyncio.sleep(0.01)
+            now[0] = 61.0
+            released.set()
+            # Timing from dequeue instead would hold the late board for 60 more seconds
+            await asyncio.wait_for(late, timeout=5)
+            await asyncio.gather(*full)
+
+    asyncio.run(main())
+    assert solver.calls == [2, 1]
+
+def test_stop_answers_queued_requests_and_refuses_new_ones():
+    service = MoveService(CNNSolver('beginner'), max_wait=60)
+
+    async def main():
+        await service.start()
+        queued = asyncio.create_task(service.get_move(MinesweeperBoard(seed=0)))
+        await asyncio.sleep(0)
+        stopping = asyncio.create_task(service.stop())
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError, match="service stopped"):
+            await service.get_move(MinesweeperBoard())
+        await stopping
+        return await queued
+
+    assert len(asyncio.run(main())) == 3
+
+def test_cancelled_worker_fails_pending_requests():
+    released = threading.Event()
+
+    class HeldSolver:
+        def get_moves(self, boards):
+            released.wait(timeout=5)
+            return [(0, 0, 0.0)] * len(boards)
+
+    service = MoveService(HeldSolver(), max_batch_size=1, max_wait=0)
+
+    async def main():
+        await service.start()
+        requests = [asyncio.create_task(service.get_move(MinesweeperBoard())) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        service._worker.cancel()
+        released.set()
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,32 @@
+import pytest
+from eval import aggregate_metrics
+from tournament import make_jobs, run_shard, run_tournament
+
+def shard_results(solver_type, iterations=8):
+    # The intermediate config, played in one shard
+    job = next(job for job in make_jobs([solver_type], iterations, iterations, 0, 64, "numpy")
+               if job['config_index'] == 1)
+    returned_job, metrics, timing = run_shard(job)
+    assert returned_job == job
+    assert timing['games'] == iterations
+    return aggregate_metrics(metrics)
+
+def test_hybrid_shards_play_the_hybrid_solver():
+    cnn = shard_results("cnn")
+    hybrid = shard_results("hybrid")
+    assert hybrid['total_games'] == cnn['total_games'] == 8
+    # The hybrid solver only asks the model when it has to guess
+    assert hybrid['model_calls_per_game'] < cnn['model_calls_per_game']
+
+def test_results_do_not_depend_on_worker_count():
+    reports = [run_tournament(["probabilistic"], iterations=4, workers=workers, shard_size=2, master_seed=3)
+               for workers in (1, 2)]
+    assert reports[0]['results'].keys() == reports[1]['results'].keys()
+    for key, metrics in reports[0]['results'].items():
+        other = reports[1]['results'][key]
+        for name in ('win_rate', 'moves_per_game', 'mine_accuracy'):
+            assert metrics[name] == other[name]
+
+def test_tournament_needs_games():
+    with pytest.raises(ValueError):
+        run_tournament(["probabilistic"], iterations=0)
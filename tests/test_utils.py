@@ -1,5 +1,6 @@
 import pytest
-from utils.metrics import SolverMetrics, calculate_metrics
+import numpy as np
+from utils.metrics import SolverMetrics, MetricsAggregator, calculate_metrics
 
 def test_metrics_calculation():
     metrics = SolverMetrics()
@@ -19,3 +20,36 @@ def test_metrics_calculation():
     assert results['mine_accuracy'] == 1.0
     assert pytest.approx(results['avg_decision_time']) == 0.15
     
+
+def test_aggregators_merge_like_one_stream():
+    rng = np.random.default_rng(0)
+    games = []
+    for _ in range(20):
+        metrics = SolverMetrics()
+        metrics.wins = int(rng.integers(2))
+        metrics.losses = 1 - metrics.wins
+        metrics.total_moves = int(rng.integers(1, 50))
+        metrics.decision_times = list(rng.exponential(1e-3, metrics.total_moves))
+        for _ in range(metrics.total_moves):
+            metrics.mine_predictions[tuple(rng.integers(9, size=2))].append(float(rng.random()))
+        metrics.actual_mines = {tuple(cell) for cell in rng.integers(9, size=(10, 2))}
+        games.append(metrics)
+
+    whole = MetricsAggregator()
+    for metrics in games:
+        whole.add_game(metrics)
+    first, second = MetricsAggregator(), MetricsAggregator()
+    for metrics in games[:7]:
+        first.add_game(metrics)
+    for metrics in games[7:]:
+        second.add_game(metrics)
+    merged = first.merge(second).summary()
+
+    for key, value in whole.summary().items():
+        assert merged[key] == pytest.approx(value)
+    times = np.concatenate([metrics.decision_times for metrics in games])
+    assert merged['avg_decision_time'] == pytest.approx(np.mean(times))
+    assert merged['moves_std'] == pytest.approx(np.std([metrics.total_moves for metrics in games]))
+    # Percentiles come from buckets 1/20 of a decade wide
+    assert merged['p95_decision_time'] == pytest.approx(np.percentile(times, 95), rel=0.15)
+    assert whole.calibration.counts.sum() == len(times)
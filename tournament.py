@@ -0,0 +1,155 @@
+import os
+import time
+import json
+import argparse
+import multiprocessing
+import numpy as np
+import tensorflow as tf
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from eval import STANDARD_CONFIGS, BOARD_BACKENDS, run_batched_simulation, run_headless_simulation, aggregate_metrics
+
+SOLVER_TYPES = ("cnn", "hybrid", "probabilistic", "exact")
+
+def init_worker(tf_threads):
+    # Runs before the worker touches TensorFlow, so the thread pools are still configurable
+    tf.config.threading.set_intra_op_parallelism_threads(tf_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(tf_threads)
+
+def derive_game_seeds(master_seed, config_index, start, end):
+    # Each game's seed depends only on its position, never on how the games were sharded
+    return [np.random.SeedSequence([master_seed, config_index, game_index]) for game_index in range(start, end)]
+
+def make_jobs(solver_types, iterations, shard_size, master_seed, batch_size, board_backend):
+    jobs = []
+    for config_index, config in enumerate(STANDARD_CONFIGS):
+        for solver_type in solver_types:
+            for start in range(0, iterations, shard_size):
+                end = min(start + shard_size, iterations)
+                jobs.append({
+                    'solver_type': solver_type,
+                    'config_index': config_index,
+                    'start': start,
+                    'end': end,
+                    'master_seed': master_seed,
+                    'batch_size': batch_size,
+                    'board_backend': board_backend,
+                })
+    return jobs
+
+def run_shard(job):
+    config = STANDARD_CONFIGS[job['config_index']]
+    # Boards and solvers draw only from generators derived from these seeds
+    seeds = derive_game_seeds(job['master_seed'], job['config_index'], job['start'], job['end'])
+
+    start_time = time.perf_counter()
+    if job['solver_type'] in ("cnn", "hybrid"):
+        metrics = run_batched_simulation(
+            job['solver_type'], config['width'], config['height'], config['mines'], len(seeds), config['name'],
+            job['batch_size'], job['board_backend'], seeds)
+    else:
+        metrics = run_headless_simulation(
+            job['solver_type'], config['width'], config['height'], config['mines'], len(seeds), config['name'],
+            job['board_backend'], seeds)
+    elapsed = time.perf_counter() - start_time
+
+    return job, metrics, {'pid': os.getpid(), 'seconds': elapsed, 'games': len(seeds)}
+
+def run_tournament(solver_types=SOLVER_TYPES, iterations=100, workers=None, shard_size=64, master_seed=0,
+                   batch_size=256, board_backend="numpy", tf_threads=1):
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+    workers = workers or os.cpu_count()
+    jobs = make_jobs(solver_types, iterations, shard_size, master_seed, batch_size, board_backend)
+
+    shard_metrics = defaultdict(dict)
+    worker_timing = defaultdict(lambda: {'jobs': 0, 'games': 0, 'seconds': 0.0})
+    start_time = time.perf_counter()
+    # Spawned workers start without the parent's TensorFlow runtime
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=init_worker, initargs=(tf_threads,)) as executor:
+        for job, metrics, timing in executor.map(run_shard, jobs):
+            shard_metrics[(job['solver_type'], job['config_index'])][job['start']] = metrics
+            worker = worker_timing[timing['pid']]
+            worker['jobs'] += 1
+            worker['games'] += timing['games']
+            worker['seconds'] += timing['seconds']
+    wall_time = time.perf_counter() - start_time
+
+    # Merge shard aggregators in game order so the report does not depend on scheduling
+    results = {}
+    for (solver_type, config_index), shards in shard_metrics.items():
+        ordered = [shards[start] for start in sorted(shards)]
+        results[(solver_type, STANDARD_CONFIGS[config_index]['name'])] = aggregate_metrics(*ordered)
+
+    return {
+        'results': results,
+        'workers': dict(worker_timing),
+        'wall_time': wall_time,
+        'settings': {
+            'solvers': list(solver_types),
+            'iterations': iterations,
+            'workers': workers,
+            'shard_size': shard_size,
+            'master_seed': master_seed,
+            'batch_size': batch_size,
+            'board_backend': board_backend,
+            'tf_threads': tf_threads,
+        },
+    }
+
+def print_report(report):
+    for config in STANDARD_CONFIGS:
+        print(f"\n=== {config['name']} ({config['width']}x{config['height']}, {config['mines']} mines) ===")
+        for solver_type in report['settings']['solvers']:
+            metrics = report['results'][(solver_type, config['name'])]
+            print(f"{solver_type}:")
+            print(f"  Win Rate: {metrics['win_rate']:.1%}")
+            print(f"  Mine Accuracy: {metrics['mine_accuracy']:.1%}")
+            print(f"  Avg Decision Time: {metrics['avg_decision_time']:.4f}s")
+            print(f"  Decision Time p50/p99: {metrics['p50_decision_time'] * 1e3:.2f}ms / {metrics['p99_decision_time'] * 1e3:.2f}ms")
+            print(f"  Calibration Error: {metrics['calibration_error']:.3f}")
+            print(f"  Moves/Game: {metrics['moves_per_game']:.1f}")
+
+    print(f"\nWall time: {report['wall_time']:.1f}s across {len(report['workers'])} workers")
+    for pid, timing in sorted(report['workers'].items()):
+        print(f"  worker {pid}: {timing['jobs']} shards, {timing['games']} games, {timing['seconds']:.1f}s busy")
+
+def save_report(report, path):
+    serialisable = dict(report)
+    serialisable['results'] = {
+        f"{solver_type}/{config_name}": {key: float(value) for key, value in metrics.items()}
+        for (solver_type, config_name), metrics in report['results'].items()
+    }
+    serialisable['workers'] = {str(pid): timing for pid, timing in report['workers'].items()}
+    with open(path, "w") as f:
+        json.dump(serialisable, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run solver comparisons in parallel worker processes')
+    parser.add_argument("--iterations", type=int, default=100,
+                       help="Number of games per solver and configuration")
+    parser.add_argument("--workers", type=int, default=None,
+                       help="Worker processes (defaults to the CPU count)")
+    parser.add_argument("--shard-size", type=int, default=64,
+                       help="Games per job; results depend on this but not on --workers")
+    parser.add_argument("--seed", type=int, default=0,
+                       help="Master seed every game seed is derived from")
+    parser.add_argument("--solvers", nargs="+", choices=SOLVER_TYPES, default=list(SOLVER_TYPES),
+                       help="Solvers to include")
+    parser.add_argument("--batch-size", type=int, default=256,
+                       help="Number of CNN games advanced together per forward pass")
+    parser.add_argument("--board-backend", choices=sorted(BOARD_BACKENDS), default="numpy",
+                       help="Board implementation used for simulated games")
+    parser.add_argument("--tf-threads", type=int, default=1,
+                       help="TensorFlow intra- and inter-op threads per worker")
+    parser.add_argument("--output", default=None,
+                       help="Optional path for a JSON copy of the report")
+    args = parser.parse_args()
+
+    report = run_tournament(args.solvers, args.iterations, args.workers, args.shard_size, args.seed,
+                            args.batch_size, args.board_backend, args.tf_threads)
+    print_report(report)
+    if args.output:
+        save_report(report, args.output)
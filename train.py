@@ -2,23 +2,62 @@ import os
 from tensorflow.keras.callbacks import EarlyStopping
 from configs import *
 from models.model import create_cnn
-from utils.dataset import generate_training_data
+from utils.dataset import generate_training_data_batched, make_streaming_dataset, make_mixed_size_dataset
+from utils.shards import make_shard_dataset
+
+def train_universal():
+    # Batches of different sizes can only be compared through the padded, weighted loss,
+    # so validation is a fixed-seed stream of the same mixture
+    model = create_cnn()
+    early_stopping = EarlyStopping(monitor='val_loss', patience=PATIENCE, restore_best_weights=True)
+    model.fit(
+        make_mixed_size_dataset(MIXED_SIZES, BATCH_SIZE),
+        steps_per_epoch=STEPS_PER_EPOCH,
+        validation_data=make_mixed_size_dataset(MIXED_SIZES, BATCH_SIZE, seed=0),
+        validation_steps=VALIDATION_STEPS,
+        epochs=EPOCHS,
+        callbacks=[early_stopping]
+    )
+
+    os.makedirs(os.path.dirname(UNIVERSAL_MODEL_SAVE_PATH), exist_ok=True)
+    model.save(UNIVERSAL_MODEL_SAVE_PATH)
 
 def main():
-    train_inputs, train_outputs = generate_training_data(WIDTH, HEIGHT, NUM_MINES, NUM_TRAIN_EXAMPLES)
-    test_inputs, test_outputs = generate_training_data(WIDTH, HEIGHT, NUM_MINES, NUM_TEST_EXAMPLES)
+    if UNIVERSAL:
+        train_universal()
+        return
+
+    # The validation set stays fixed so early stopping compares like with like
+    test_inputs, test_outputs = generate_training_data_batched(WIDTH, HEIGHT, NUM_MINES, NUM_TEST_EXAMPLES)
 
     model = create_cnn(HEIGHT, WIDTH)
 
     early_stopping = EarlyStopping(monitor='val_loss', patience=PATIENCE, restore_best_weights=True)
     
-    model.fit(
-        train_inputs, train_outputs,
-        validation_data=(test_inputs, test_outputs),
-        epochs=EPOCHS,
-        batch_size=BATCH_SIZE,
-        callbacks=[early_stopping]
-    )
+    if DATASET_DIR:
+        model.fit(
+            make_shard_dataset(DATASET_DIR, BATCH_SIZE),
+            validation_data=(test_inputs, test_outputs),
+            epochs=EPOCHS,
+            callbacks=[early_stopping]
+        )
+    elif STREAMING:
+        model.fit(
+            make_streaming_dataset(WIDTH, HEIGHT, NUM_MINES, BATCH_SIZE, DATA_WORKERS),
+            steps_per_epoch=STEPS_PER_EPOCH,
+            validation_data=(test_inputs, test_outputs),
+            epochs=EPOCHS,
+            callbacks=[early_stopping]
+        )
+    else:
+        train_inputs, train_outputs = generate_training_data_batched(WIDTH, HEIGHT, NUM_MINES, NUM_TRAIN_EXAMPLES)
+        model.fit(
+            train_inputs, train_outputs,
+            validation_data=(test_inputs, test_outputs),
+            epochs=EPOCHS,
+            batch_size=BATCH_SIZE,
+            callbacks=[early_stopping]
+        )
 
     os.makedirs(os.path.dirname(MODEL_SAVE_PATH), exist_ok=True)
     model.save(MODEL_SAVE_PATH)
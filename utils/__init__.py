@@ -1,3 +1,3 @@
 # Utility functions package
 from .dataset import generate_training_data
-from .metrics import SolverMetrics, calculate_metrics, track_mine_locations
\ No newline at end of file
+from .metrics import SolverMetrics, MetricsAggregator, calculate_metrics, track_mine_locations
\ No newline at end of file
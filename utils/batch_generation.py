@@ -0,0 +1,70 @@
+import numpy as np
+from scipy import ndimage
+from game.grid import neighbour_sum, neighbour_any
+from utils.encoding import encode_planes
+
+# Connect zero cells within a board but never across the batch axis
+BATCH_STRUCTURE = np.zeros((3, 3, 3), dtype=int)
+BATCH_STRUCTURE[1] = 1
+
+def place_mine_batch(rng, n, width, height, num_mines, first_clicks):
+    # Uniform mine layouts that avoid each board's first click: rank random keys per
+    # board with the click pinned last and keep the num_mines smallest
+    keys = rng.random((n, height * width))
+    keys[np.arange(n), first_clicks] = np.inf
+    chosen = np.argpartition(keys, num_mines - 1, axis=1)[:, :num_mines]
+    mines = np.zeros((n, height * width), dtype=bool)
+    np.put_along_axis(mines, chosen, True, axis=1)
+    return mines.reshape(n, height, width)
+
+def generate_board_batch(n, width, height, num_mines, rng=None, min_sweeps=5, max_sweeps=25):
+    # Batched equivalent of utils.dataset.create_random_field: every board gets a random
+    # number of sweeps in [min_sweeps, max_sweeps), each revealing a uniformly chosen
+    # hidden safe cell, with the first click placed before the mines.
+    rng = np.random.default_rng(rng)
+    cells = height * width
+    boards = np.arange(n)
+
+    first_clicks = rng.integers(cells, size=n)
+    mines = place_mine_batch(rng, n, width, height, num_mines, first_clicks)
+    clues = np.where(mines, -1, neighbour_sum(mines, dtype=np.int8)).astype(np.int8)
+    labels, num_labels = ndimage.label(clues == 0, structure=BATCH_STRUCTURE)
+    flat_labels = labels.reshape(n, cells)
+    opened = np.zeros(num_labels + 1, dtype=bool)
+
+    sweeps = rng.integers(min_sweeps, max_sweeps, size=n)
+    visible = np.zeros((n, height, width), dtype=bool)
+    flat_visible = visible.reshape(n, cells)
+    flat_mines = mines.reshape(n, cells)
+
+    for sweep in range(sweeps.max()):
+        if sweep == 0:
+            active, clicks = boards, first_clicks
+        else:
+            # Pick the r-th hidden safe cell of each board still sweeping, with r uniform
+            active = boards[sweeps > sweep]
+            candidates = ~flat_visible[active] & ~flat_mines[active]
+            ranks = np.cumsum(candidates, axis=1, dtype=np.int32)
+            counts = ranks[:, -1]
+            targets = (rng.random(active.size) * counts).astype(np.int32)
+            clicks = np.argmax(ranks > targets[:, np.newaxis], axis=1)
+            active, clicks = active[counts > 0], clicks[counts > 0]
+        if not active.size:
+            break
+
+        flat_visible[active, clicks] = True
+        # Zero clicks open their whole region plus its border in one step, and only
+        # the boards that hit a zero need the dilation
+        hit_labels = flat_labels[active, clicks]
+        hit_boards = active[hit_labels > 0]
+        if hit_boards.size:
+            opened[hit_labels[hit_labels > 0]] = True
+            opened[0] = False
+            visible[hit_boards] |= neighbour_any(opened[labels[hit_boards]])
+
+    return mines, clues, visible
+
+def generate_training_batch(n, width, height, num_mines, rng=None):
+    mines, clues, visible = generate_board_batch(n, width, height, num_mines, rng)
+    targets = mines[..., np.newaxis].astype(np.float32)
+    return encode_planes(clues, visible), targets
@@ -0,0 +1,187 @@
+import time
+import argparse
+import numpy as np
+from game.board import MinesweeperBoard
+from solvers.cnn import CNNSolver
+from solvers.hybrid import HybridSolver
+from utils.shards import record_dtype, encode_records, decode_records
+from eval import STANDARD_CONFIGS, BOARD_SOLVERS, run_batched_simulation
+
+# Positions recorded from real games, replayed so every solver is timed on exactly the
+# same decisions. Each position is a bit-packed shard record (see utils/shards.py) plus
+# the game it came from and how many moves had been played.
+FORMAT_VERSION = 1
+SOLVER_TYPES = ("cnn", "hybrid", "probabilistic", "exact")
+
+class PositionCorpus:
+    def __init__(self, width, height, num_mines, records=None, games=None, moves=None):
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        self._records = [] if records is None else [records]
+        self._games = [] if games is None else list(games)
+        self._moves = [] if moves is None else list(moves)
+
+    def __len__(self):
+        return len(self._games)
+
+    def record(self, game_index, board, move_number):
+        mines = board.board == -1
+        self._records.append(encode_records(mines[None], board.board[None], board.visible[None], board.flags[None]))
+        self._games.append(game_index)
+        self._moves.append(move_number)
+
+    @property
+    def records(self):
+        if not self._records:
+            return np.zeros(0, dtype=record_dtype(self.width, self.height))
+        if len(self._records) != 1:
+            self._records = [np.concatenate(self._records)]
+        return self._records[0]
+
+    @property
+    def moves(self):
+        return np.array(self._moves, dtype=np.uint16)
+
+    @property
+    def games(self):
+        return np.array(self._games, dtype=np.uint32)
+
+    def save(self, path):
+        np.savez_compressed(path, format_version=FORMAT_VERSION, width=self.width, height=self.height,
+                            num_mines=self.num_mines, records=self.records, games=self.games, moves=self.moves)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data['format_version']) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported corpus format version: {int(data['format_version'])}")
+            return cls(int(data['width']), int(data['height']), int(data['num_mines']),
+                       data['records'], data['games'], data['moves'])
+
+    def boards(self):
+        # A fresh, independent board per position; solvers may flag cells on them
+        _, clues, visible, flags = decode_records(self.records, self.width, self.height)
+        boards = []
+        for i in range(len(self)):
+            board = MinesweeperBoard(self.width, self.height, self.num_mines)
+            board.board = clues[i].astype(int)
+            board.visible = visible[i]
+            board.flags = flags[i]
+            board.first_move = False
+            boards.append(board)
+        return boards
+
+def record_corpus(solver_type, width, height, num_mines, games, difficulty="beginner", seed=0, min_move=0, every=1,
+                  batch_size=256):
+    # Plays seeded games and keeps every `every`-th position from move min_move on;
+    # a high min_move skips the openings that dominate whole-game timings
+    corpus = PositionCorpus(width, height, num_mines)
+
+    def keep(game_index, board, move_number):
+        if not board.first_move and move_number >= min_move and (move_number - min_move) % every == 0:
+            corpus.record(game_index, board, move_number)
+
+    seeds = np.random.SeedSequence(seed).spawn(games)
+    run_batched_simulation(solver_type, width, height, num_mines, games, difficulty, batch_size, seeds=seeds,
+                           on_position=keep)
+    return corpus
+
+def replay(corpus, solver_type, difficulty="beginner", batch_size=256, seed=0, inference="compiled", quantization="float16"):
+    # The cell each solver would reveal in every position, as (x, y) rows, and the
+    # time per decision. CNN and hybrid decide in batches; the time of a batch is split
+    # evenly over its positions. Every solver is timed on one analysis of the position:
+    # board solvers analyse in their constructor, so their moves are read off that.
+    boards = corpus.boards()
+    decisions = np.zeros((len(boards), 2), dtype=int)
+    timings = np.zeros(len(boards))
+
+    if solver_type in ("cnn", "hybrid"):
+        cnn_solver = CNNSolver(difficulty, inference=inference, quantization=quantization)
+        cnn_solver.get_moves(boards[:batch_size])
+        for start in range(0, len(boards), batch_size):
+            batch = boards[start:start + batch_size]
+            start_time = time.perf_counter()
+            if solver_type == "cnn":
+                moves = cnn_solver.get_moves(batch)
+            else:
+                moves = [game_moves[0] for game_moves in HybridSolver.next_moves_batch(
+                    [HybridSolver(board, cnn_solver=cnn_solver) for board in batch])]
+            timings[start:start + len(batch)] = (time.perf_counter() - start_time) / len(batch)
+            decisions[start:start + len(batch)] = [(x, y) for x, y, _ in moves]
+    else:
+        for i, board in enumerate(boards):
+            start_time = time.perf_counter()
+            reveals, _ = BOARD_SOLVERS[solver_type](board, rng=seed).next_moves(update=False)
+            timings[i] = time.perf_counter() - start_time
+            decisions[i] = reveals[0]
+    return decisions, timings
+
+def summarise(corpus, decisions, timings, reference=None):
+    if len(decisions) == 0:
+        # Nothing was decided, so there is no rate to report
+        return {'positions': 0, 'decisions_per_sec': 0, 'p50_decision_time': 0.0, 'p99_decision_time': 0.0,
+                'safe_rate': float('nan'), 'agreement': float('nan')}
+    mines, _, visible, flags = decode_records(corpus.records, corpus.width, corpus.height)
+    positions = np.arange(len(decisions))
+    decided = (positions, decisions[:, 1], decisions[:, 0])
+    if (visible[decided] | flags[decided]).any():
+        # Only reveals are scored; a revealed or flagged cell is not a decision
+        raise ValueError("Every decision must be a hidden, unflagged cell of its position")
+    hit = mines[decided]
+    return {
+        'positions': len(decisions),
+        'decisions_per_sec': len(decisions) / timings.sum() if timings.sum() > 0 else 0,
+        'p50_decision_time': float(np.percentile(timings, 50)),
+        'p99_decision_time': float(np.percentile(timings, 99)),
+        'safe_rate': float(1 - hit.mean()),
+        # Several cells are often equally good, so disagreement is not necessarily a mistake
+        'agreement': float(np.mean((decisions == reference).all(axis=1))) if reference is not None else 1.0,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Record mid-game positions and replay solvers against them')
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Play seeded games and store their positions")
+    record_parser.add_argument("--out", required=True, help="Output .npz file")
+    record_parser.add_argument("--difficulty", choices=[config['name'] for config in STANDARD_CONFIGS], default="expert")
+    record_parser.add_argument("--solver", choices=SOLVER_TYPES, default="probabilistic",
+                               help="Solver whose games provide the positions")
+    record_parser.add_argument("--games", type=int, default=100)
+    record_parser.add_argument("--min-move", type=int, default=20,
+                               help="Skip positions before this many moves have been played")
+    record_parser.add_argument("--every", type=int, default=1,
+                               help="Keep every n-th position from --min-move on")
+    record_parser.add_argument("--seed", type=int, default=0)
+
+    replay_parser = commands.add_parser("replay", help="Time solvers on a recorded corpus")
+    replay_parser.add_argument("corpus", help="Corpus .npz file")
+    replay_parser.add_argument("--difficulty", choices=[config['name'] for config in STANDARD_CONFIGS], default="expert",
+                               help="CNN model to use; the corpus board size must match it")
+    replay_parser.add_argument("--solvers", nargs="+", choices=SOLVER_TYPES, default=list(SOLVER_TYPES),
+                               help="Solvers to replay; agreement is measured against the first")
+    replay_parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        config = next(config for config in STANDARD_CONFIGS if config['name'] == args.difficulty)
+        corpus = record_corpus(args.solver, config['width'], config['height'], config['mines'], args.games,
+                               config['name'], args.seed, args.min_move, args.every)
+        corpus.save(args.out)
+        print(f"Recorded {len(corpus)} positions from {args.games} games to {args.out}")
+    else:
+        corpus = PositionCorpus.load(args.corpus)
+        if len(corpus) == 0:
+            parser.exit(message=f"{args.corpus} holds no positions to replay\n")
+        reference = None
+        for solver_type in args.solvers:
+            decisions, timings = replay(corpus, solver_type, args.difficulty, args.batch_size)
+            if reference is None:
+                reference = decisions
+            summary = summarise(corpus, decisions, timings, reference)
+            print(f"{solver_type:>14}: {summary['decisions_per_sec']:9.1f} decisions/s  "
+                  f"p50 {summary['p50_decision_time'] * 1e6:8.1f}us  "
+                  f"p99 {summary['p99_decision_time'] * 1e6:8.1f}us  "
+                  f"safe {summary['safe_rate']:6.1%}  "
+                  f"agree {summary['agreement']:6.1%}")
@@ -1,12 +1,19 @@
+import itertools
+import multiprocessing
 import numpy as np
-import random
 import tensorflow as tf
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from game.board import MinesweeperBoard
+from utils.batch_generation import generate_training_batch
+from utils.encoding import NUM_CHANNELS, PADDED_CHANNELS, encode_board, padded_shape, pad_encoded, pad_inputs
 
-def create_random_field(width: int, height: int, num_mines: int) -> MinesweeperBoard:
-    board = MinesweeperBoard(width, height, num_mines)
+def create_random_field(width: int, height: int, num_mines: int, rng=None) -> MinesweeperBoard:
+    # The board draws its mines and sweeps from the same generator as the sweep count
+    rng = np.random.default_rng(rng)
+    board = MinesweeperBoard(width, height, num_mines, seed=rng)
     
-    num_sweeps = random.randrange(5, 25)
+    num_sweeps = rng.integers(5, 25)
     for _ in range(num_sweeps):
         if not board.game_active:
             break
@@ -19,29 +26,94 @@ def create_random_field(width: int, height: int, num_mines: int) -> MinesweeperB
             break
     return board
 
-def create_probability_tensor(board: MinesweeperBoard) -> tf.Tensor:
+def create_probability_array(board: MinesweeperBoard) -> np.ndarray:
     tensor = np.zeros((board.height, board.width), np.float32)
     mine_locations = (board.board == -1)
     tensor[mine_locations] = 1.0
-    tensor = tensor.reshape(board.height, board.width, 1)
-    return tf.convert_to_tensor(tensor, dtype=tf.float32)
-
-def create_input_tensor(board: MinesweeperBoard) -> tf.Tensor:
-    channels = np.zeros((board.height, board.width, 11), dtype=np.float32)
+    return tensor.reshape(board.height, board.width, 1)
 
-    channels[:, :, 0] = board.visible.astype(float)
-    channels[:, :, 1] = board.flags.astype(float)
+def create_probability_tensor(board: MinesweeperBoard) -> tf.Tensor:
+    return tf.convert_to_tensor(create_probability_array(board), dtype=tf.float32)
 
-    for i in range(9):
-        channels[:, :, 2 + i] = (board.board == i).astype(float)
+def create_input_array(board: MinesweeperBoard) -> np.ndarray:
+    return encode_board(board)
 
-    return tf.convert_to_tensor(channels, dtype=tf.float32)
+def create_input_tensor(board: MinesweeperBoard) -> tf.Tensor:
+    return tf.convert_to_tensor(create_input_array(board), dtype=tf.float32)
 
-def generate_training_data(width: int, height: int, num_mines: int, num_examples: int):
+def generate_training_data(width: int, height: int, num_mines: int, num_examples: int, rng=None):
+    rng = np.random.default_rng(rng)
     input_tensors = []
     output_tensors = []
     for _ in range(num_examples):
-        board = create_random_field(width, height, num_mines)
+        board = create_random_field(width, height, num_mines, rng)
         input_tensors.append(create_input_tensor(board))
         output_tensors.append(create_probability_tensor(board))
     return tf.stack(input_tensors, axis=0), tf.stack(output_tensors, axis=0)
+
+def generate_training_data_batched(width: int, height: int, num_mines: int, num_examples: int, rng=None):
+    inputs, targets = generate_training_batch(num_examples, width, height, num_mines, rng)
+    return tf.convert_to_tensor(inputs), tf.convert_to_tensor(targets)
+
+def generate_example_chunks(width: int, height: int, num_mines: int, seed=None, chunk_size: int = 256,
+                            num_workers: int = 4):
+    # Endless (inputs, targets) chunks of fresh positions, generated by num_workers
+    # processes so that board generation runs in parallel and outside the trainer's GIL.
+    # Chunk i always comes from child i of the seed and chunks are yielded in order, so a
+    # seeded stream is the same for any number of workers.
+    if num_workers < 1:
+        raise ValueError("num_workers must be at least 1")
+    root = np.random.SeedSequence(seed)
+    # Spawned workers start without the parent's TensorFlow runtime
+    executor = ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context("spawn"))
+    pending = deque()
+    try:
+        for index in itertools.count():
+            child = np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (index,))
+            pending.append(executor.submit(generate_training_batch, chunk_size, width, height, num_mines, child))
+            # Keep every worker busy with one chunk in hand, without running ahead unboundedly
+            if len(pending) > 2 * num_workers:
+                yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def make_streaming_dataset(width: int, height: int, num_mines: int, batch_size: int, num_workers: int = 4,
+                           seed=None) -> tf.data.Dataset:
+    # Boards are generated by worker processes while the model trains rather than up
+    # front; a seeded dataset reproduces exactly
+    output_signature = (
+        tf.TensorSpec(shape=(None, height, width, NUM_CHANNELS), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, height, width, 1), dtype=tf.float32),
+    )
+    return (
+        tf.data.Dataset.from_generator(
+            lambda: generate_example_chunks(width, height, num_mines, seed, num_workers=num_workers),
+            output_signature=output_signature,
+        )
+        .unbatch()
+        .batch(batch_size)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+def generate_mixed_size_batches(sizes, batch_size: int, seed=None):
+    # Endless batches for a size-agnostic model. Each batch uses one (width, height,
+    # num_mines) entry of sizes, padded to its bucket with the in-board channel; the
+    # sample weights are zero on the padding so only real cells contribute to the loss.
+    rng = np.random.default_rng(seed)
+    while True:
+        width, height, num_mines = sizes[rng.integers(len(sizes))]
+        inputs, targets = generate_training_batch(batch_size, width, height, num_mines, rng)
+        shape = padded_shape(height, width)
+        weights = np.zeros((batch_size,) + shape, dtype=np.float32)
+        weights[:, :height, :width] = 1.0
+        yield pad_inputs(inputs, shape), pad_encoded(targets, shape), weights
+
+def make_mixed_size_dataset(sizes, batch_size: int, seed=None) -> tf.data.Dataset:
+    output_signature = (
+        tf.TensorSpec(shape=(None, None, None, PADDED_CHANNELS), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, None, None, 1), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, None, None), dtype=tf.float32),
+    )
+    return tf.data.Dataset.from_generator(
+        lambda: generate_mixed_size_batches(sizes, batch_size, seed), output_signature=output_signature
+    ).prefetch(tf.data.AUTOTUNE)
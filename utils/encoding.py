@@ -0,0 +1,81 @@
+import numpy as np
+import profiling
+
+# Channel 0: visible, channel 1: flags, channels 2-10: one-hot clue value 0-8
+NUM_CHANNELS = 11
+# Padded canvases add channel 11: 1 on board cells, 0 on padding. Without it padding
+# would read as hidden, unflagged cells with no clue, which is exactly a hidden mine.
+PADDED_CHANNELS = NUM_CHANNELS + 1
+
+# Row c is the full channel vector of a hidden, unflagged cell with clue c: the one-hot
+# in channels 2-10. A mine (-1) wraps round to the all-zero last row, so it gets no clue
+# channel. Gathering whole rows into a contiguous output beats scattering into it.
+CLUE_CHANNELS = np.zeros((10, NUM_CHANNELS), dtype=np.float32)
+CLUE_CHANNELS[np.arange(9), 2 + np.arange(9)] = 1.0
+
+def _output(out, shape, channels=NUM_CHANNELS):
+    # A fresh (shape, channels) array, or the leading rows of a batch buffer that may
+    # hold more boards than the batch. Every channel gets written, so neither is cleared.
+    if out is None:
+        return np.empty(shape + (channels,), dtype=np.float32)
+    if len(shape) == 3:
+        out = out[:shape[0]]
+    if out.shape != shape + (channels,) or not out.flags.c_contiguous:
+        raise ValueError(f"Encoding buffer must be C-contiguous with shape {shape + (channels,)}")
+    return out
+
+def _write_planes(out, clues, visible, flags):
+    np.take(CLUE_CHANNELS, clues, axis=0, out=out, mode='wrap')
+    out[..., 0] = visible
+    if flags is not None:
+        out[..., 1] = flags
+
+@profiling.profiled("encode.planes")
+def encode_planes(clues, visible, flags=None, out=None):
+    # Encode (H, W) or (N, H, W) clue/visibility/flag planes as float32 channels; the
+    # one-hot is a single table lookup per cell written straight into the output
+    out = _output(out, clues.shape)
+    _write_planes(out, clues, visible, flags)
+    return out
+
+def encode_board(board, out=None):
+    return encode_planes(board.board, board.visible, board.flags, out)
+
+def encode_boards(boards, out=None):
+    # All boards must share a shape; each board is written straight into its row, so
+    # no stacked copies of the planes are built on the way
+    out = _output(out, (len(boards),) + boards[0].board.shape)
+    for board, row in zip(boards, out):
+        _write_planes(row, board.board, board.visible, board.flags)
+    return out
+
+# Size-agnostic models run boards padded up to a multiple of this, so a handful of
+# canvas shapes cover every board size and mixed sizes can share one forward pass
+BUCKET_SIZE = 8
+
+def padded_shape(height, width, bucket=BUCKET_SIZE):
+    return (-(-height // bucket) * bucket, -(-width // bucket) * bucket)
+
+def pad_encoded(inputs, shape):
+    # Zero-pad (..., H, W, C) arrays to shape; targets are padded this way
+    height, width = inputs.shape[-3:-1]
+    padding = [(0, 0)] * (inputs.ndim - 3) + [(0, shape[0] - height), (0, shape[1] - width), (0, 0)]
+    return np.pad(inputs, padding)
+
+def pad_inputs(inputs, shape):
+    # Encoded boards laid out as encode_boards_padded does: zero-padded, plus the in-board channel
+    board_channel = np.ones(inputs.shape[:-1] + (1,), dtype=inputs.dtype)
+    return pad_encoded(np.concatenate([inputs, board_channel], axis=-1), shape)
+
+@profiling.profiled("encode.boards_padded")
+def encode_boards_padded(boards, out=None, bucket=BUCKET_SIZE):
+    # Boards of any size, each in the top-left corner of one shared bucketed canvas,
+    # with the in-board channel marking which cells are real
+    shape = padded_shape(max(board.height for board in boards), max(board.width for board in boards), bucket)
+    out = _output(out, (len(boards),) + shape, PADDED_CHANNELS)
+    for board, row in zip(boards, out):
+        _write_planes(row[:board.height, :board.width, :NUM_CHANNELS], board.board, board.visible, board.flags)
+        row[:board.height, :board.width, NUM_CHANNELS] = 1.0
+        row[board.height:] = 0.0
+        row[:board.height, board.width:] = 0.0
+    return out
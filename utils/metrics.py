@@ -1,10 +1,17 @@
 import numpy as np
 from collections import defaultdict
 
+# Decision-time histogram: 1us to 100s with 20 log-spaced buckets per decade, plus an
+# underflow and an overflow bucket. Fixed edges make histograms from any worker mergeable.
+LATENCY_EDGES = np.logspace(-6, 2, 8 * 20 + 1)
+CALIBRATION_BINS = 10
+
 class SolverMetrics:
+    # What one game recorded; bounded by the board size and folded into a
+    # MetricsAggregator once the game ends
     def __init__(self):
         self.reset()
-        
+
     def reset(self):
         self.wins = 0
         self.losses = 0
@@ -12,25 +19,193 @@ class SolverMetrics:
         self.decision_times = []
         self.mine_predictions = defaultdict(list)
         self.actual_mines = set()
+        self.model_calls = 0
+
+class RunningMoments:
+    # Count, mean and variance of a stream (Welford), mergeable with Chan's update
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        batch = RunningMoments()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+class LatencyHistogram:
+    def __init__(self, edges=LATENCY_EDGES):
+        self.edges = edges
+        self.counts = np.zeros(len(edges) + 1, dtype=np.int64)
+        self.moments = RunningMoments()
+
+    def add(self, seconds):
+        seconds = np.asarray(seconds, dtype=np.float64).ravel()
+        self.counts += np.bincount(np.searchsorted(self.edges, seconds, side='right'), minlength=len(self.counts))
+        self.moments.add(seconds)
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge latency histograms with different bucket edges")
+        self.counts += other.counts
+        self.moments.merge(other.moments)
+        return self
+
+    @property
+    def mean(self):
+        return self.moments.mean
+
+    def percentile(self, q):
+        # Geometric middle of the bucket holding the q-th percentile, within the observed range
+        if self.moments.count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q / 100 * self.moments.count))
+        low = self.edges[index - 1] if index > 0 else self.moments.min
+        high = self.edges[index] if index < len(self.edges) else self.moments.max
+        return float(np.clip(np.sqrt(low * high), self.moments.min, self.moments.max))
+
+class CalibrationBins:
+    # Online reliability diagram: for each predicted mine probability bin, how many
+    # predictions fell in it, their summed probability and how many were mines
+    def __init__(self, bins=CALIBRATION_BINS):
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.predicted = np.zeros(bins)
+        self.mines = np.zeros(bins, dtype=np.int64)
+
+    def add(self, predictions, is_mine):
+        predictions = np.asarray(predictions, dtype=np.float64).ravel()
+        is_mine = np.broadcast_to(np.asarray(is_mine, dtype=bool), predictions.shape)
+        bins = len(self.counts)
+        index = np.clip((predictions * bins).astype(int), 0, bins - 1)
+        self.counts += np.bincount(index, minlength=bins)
+        self.predicted += np.bincount(index, weights=predictions, minlength=bins)
+        self.mines += np.bincount(index, weights=is_mine.astype(np.float64), minlength=bins).astype(np.int64)
+
+    def merge(self, other):
+        if len(self.counts) != len(other.counts):
+            raise ValueError("Cannot merge calibration bins of different sizes")
+        self.counts += other.counts
+        self.predicted += other.predicted
+        self.mines += other.mines
+        return self
+
+    def reliability(self):
+        # (mean predicted probability, observed mine rate, predictions) per non-empty bin
+        filled = self.counts > 0
+        return list(zip(self.predicted[filled] / self.counts[filled],
+                        self.mines[filled] / self.counts[filled],
+                        self.counts[filled]))
+
+    def expected_calibration_error(self):
+        total = self.counts.sum()
+        return float(np.abs(self.predicted - self.mines).sum() / total) if total else 0.0
+
+class MetricsAggregator:
+    # Constant-memory totals over any number of finished games. Aggregators filled by
+    # separate workers merge into the same totals as one that saw every game.
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.losses = 0
+        self.model_calls = 0
+        self.moves = RunningMoments()
+        self.decision_times = LatencyHistogram()
+        self.calibration = CalibrationBins()
+        self.cells_correct = 0
+        self.cells_predicted = 0
+
+    def add_game(self, metrics):
+        self.games += 1
+        self.wins += metrics.wins
+        self.losses += metrics.losses
+        self.model_calls += metrics.model_calls
+        self.moves.add([metrics.total_moves])
+        self.decision_times.add(metrics.decision_times)
+
+        # A cell counts as predicted correctly when its mean prediction in this game
+        # lands on the right side of 0.5
+        predictions, labels = [], []
+        for (x, y), preds in metrics.mine_predictions.items():
+            is_mine = (y, x) in metrics.actual_mines
+            avg_pred = np.mean(preds) if preds else 0
+            self.cells_correct += int((avg_pred > 0.5) == is_mine)
+            self.cells_predicted += 1
+            predictions.extend(preds)
+            labels.extend([is_mine] * len(preds))
+        self.calibration.add(predictions, labels)
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins += other.wins
+        self.losses += other.losses
+        self.model_calls += other.model_calls
+        self.moves.merge(other.moves)
+        self.decision_times.merge(other.decision_times)
+        self.calibration.merge(other.calibration)
+        self.cells_correct += other.cells_correct
+        self.cells_predicted += other.cells_predicted
+        return self
+
+    @property
+    def mine_accuracy(self):
+        return self.cells_correct / self.cells_predicted if self.cells_predicted > 0 else 0
+
+    def summary(self):
+        games = self.games
+        return {
+            'win_rate': self.wins / games if games > 0 else 0,
+            'mine_accuracy': self.mine_accuracy,
+            'avg_decision_time': self.decision_times.mean,
+            'p50_decision_time': self.decision_times.percentile(50),
+            'p95_decision_time': self.decision_times.percentile(95),
+            'p99_decision_time': self.decision_times.percentile(99),
+            'moves_per_game': self.moves.mean,
+            'moves_std': self.moves.std,
+            'total_games': games,
+            'model_calls_per_game': self.model_calls / games if games > 0 else 0,
+            'calibration_error': self.calibration.expected_calibration_error(),
+        }
 
 def calculate_metrics(metrics, board_history):
-    win_rate = metrics.wins / (metrics.wins + metrics.losses) if (metrics.wins + metrics.losses) > 0 else 0
-    
-    correct = 0
-    total = 0
-    for (x,y), preds in metrics.mine_predictions.items():
-        is_mine = (y, x) in metrics.actual_mines
-        avg_pred = np.mean(preds)
-        if (avg_pred > 0.5 and is_mine) or (avg_pred <= 0.5 and not is_mine):
-            correct += 1
-        total += 1
-    
+    aggregator = MetricsAggregator()
+    aggregator.add_game(metrics)
+    finished = metrics.wins + metrics.losses
+
     return {
-        'win_rate': win_rate,
-        'mine_accuracy': correct / total if total > 0 else 0,
-        'avg_decision_time': np.mean(metrics.decision_times) if metrics.decision_times else 0,
-        'moves_per_game': metrics.total_moves / (metrics.wins + metrics.losses) if (metrics.wins + metrics.losses) > 0 else 0,
-        'total_games': metrics.wins + metrics.losses
+        'win_rate': metrics.wins / finished if finished > 0 else 0,
+        'mine_accuracy': aggregator.mine_accuracy,
+        'avg_decision_time': aggregator.decision_times.mean,
+        'moves_per_game': metrics.total_moves / finished if finished > 0 else 0,
+        'total_games': finished
     }
 
 def track_mine_locations(board):
@@ -0,0 +1,133 @@
+import os
+import json
+import argparse
+import numpy as np
+import tensorflow as tf
+from utils.batch_generation import generate_board_batch
+from utils.encoding import NUM_CHANNELS, encode_planes
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+def record_dtype(width, height):
+    # One fixed-size record per position: three bit-packed masks plus a byte per clue.
+    # Mines are only stored in the mine bitmap; their clue byte is zero.
+    packed = (width * height + 7) // 8
+    return np.dtype([
+        ('visible', np.uint8, (packed,)),
+        ('flags', np.uint8, (packed,)),
+        ('mines', np.uint8, (packed,)),
+        ('clues', np.uint8, (width * height,)),
+    ])
+
+def encode_records(mines, clues, visible, flags=None):
+    n, height, width = mines.shape
+    records = np.zeros(n, dtype=record_dtype(width, height))
+    records['visible'] = np.packbits(visible.reshape(n, -1), axis=1)
+    if flags is not None:
+        records['flags'] = np.packbits(flags.reshape(n, -1), axis=1)
+    records['mines'] = np.packbits(mines.reshape(n, -1), axis=1)
+    records['clues'] = np.where(mines, 0, clues).reshape(n, -1)
+    return records
+
+def decode_records(records, width, height):
+    n = len(records)
+    cells = width * height
+
+    def unpack(field):
+        return np.unpackbits(records[field], axis=1, count=cells).reshape(n, height, width).astype(bool)
+
+    mines = unpack('mines')
+    clues = np.where(mines, -1, records['clues'].reshape(n, height, width).astype(np.int8))
+    return mines, clues, unpack('visible'), unpack('flags')
+
+def write_dataset(out_dir, width, height, num_mines, num_examples, shard_size=100_000, seed=0, chunk_size=65_536):
+    os.makedirs(out_dir, exist_ok=True)
+    num_shards = (num_examples + shard_size - 1) // shard_size
+    # Independent child seeds make each shard reproducible on its own
+    shard_seeds = np.random.SeedSequence(seed).spawn(num_shards)
+
+    shards = []
+    for index, shard_seed in enumerate(shard_seeds):
+        count = min(shard_size, num_examples - index * shard_size)
+        name = f"shard_{index:05d}.bin"
+        records = np.memmap(os.path.join(out_dir, name), dtype=record_dtype(width, height), mode='w+', shape=(count,))
+        rng = np.random.default_rng(shard_seed)
+        for start in range(0, count, chunk_size):
+            end = min(start + chunk_size, count)
+            mines, clues, visible = generate_board_batch(end - start, width, height, num_mines, rng)
+            records[start:end] = encode_records(mines, clues, visible)
+        records.flush()
+        del records
+        shards.append({'file': name, 'count': count})
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'width': width,
+        'height': height,
+        'num_mines': num_mines,
+        'num_examples': num_examples,
+        'shard_size': shard_size,
+        'seed': seed,
+        'generator': 'utils.batch_generation.generate_board_batch',
+        'shards': shards,
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def load_manifest(data_dir):
+    with open(os.path.join(data_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest['format_version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset format version: {manifest['format_version']}")
+    return manifest
+
+def open_shards(data_dir):
+    manifest = load_manifest(data_dir)
+    dtype = record_dtype(manifest['width'], manifest['height'])
+    return manifest, [
+        np.memmap(os.path.join(data_dir, shard['file']), dtype=dtype, mode='r', shape=(shard['count'],))
+        for shard in manifest['shards']
+    ]
+
+def make_shard_dataset(data_dir, batch_size, shuffle=True, seed=None):
+    manifest, shards = open_shards(data_dir)
+    width, height = manifest['width'], manifest['height']
+    # Created once, so every epoch (each restart of batches()) continues the same stream
+    # and shuffles differently, while the same seed still reproduces all of them
+    rng = np.random.default_rng(seed)
+
+    def batches():
+        order = rng.permutation(len(shards)) if shuffle else range(len(shards))
+        for shard_index in order:
+            records = shards[shard_index]
+            indices = rng.permutation(len(records)) if shuffle else np.arange(len(records))
+            for start in range(0, len(indices), batch_size):
+                # Sorted reads keep the page cache access pattern mostly sequential
+                batch = records[np.sort(indices[start:start + batch_size])]
+                mines, clues, visible, flags = decode_records(batch, width, height)
+                yield encode_planes(clues, visible, flags), mines[..., np.newaxis].astype(np.float32)
+
+    output_signature = (
+        tf.TensorSpec(shape=(None, height, width, NUM_CHANNELS), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, height, width, 1), dtype=tf.float32),
+    )
+    return tf.data.Dataset.from_generator(batches, output_signature=output_signature).prefetch(tf.data.AUTOTUNE)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export generated training positions as bit-packed shards')
+    parser.add_argument("--out", required=True, help="Output directory for shards and manifest")
+    parser.add_argument("--width", type=int, default=9)
+    parser.add_argument("--height", type=int, default=9)
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--examples", type=int, default=1_000_000,
+                       help="Total number of positions to write")
+    parser.add_argument("--shard-size", type=int, default=100_000,
+                       help="Positions per shard file")
+    parser.add_argument("--seed", type=int, default=0,
+                       help="Master seed; each shard derives its own child seed")
+    args = parser.parse_args()
+
+    manifest = write_dataset(args.out, args.width, args.height, args.mines, args.examples, args.shard_size, args.seed)
+    print(f"Wrote {manifest['num_examples']} positions in {len(manifest['shards'])} shards to {args.out}")